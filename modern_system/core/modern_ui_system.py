@@ -205,6 +205,23 @@ class ModernFoodServiceSystem:
         user_label = tk.Label(user_frame, text="👤 Admin", font=self.fonts['body'],
                              bg=self.colors['surface'], fg=self.colors['text_secondary'])
         user_label.pack(side="right", pady=15)
+        
+        # Today's key figures (read from the data manager's aggregates)
+        self.stats_label = tk.Label(user_frame, text="", font=self.fonts['small'],
+                                    bg=self.colors['surface'], fg=self.colors['text_secondary'])
+        self.stats_label.pack(side="right", padx=(0, 20), pady=15)
+        self.update_top_stats()
+
+    def update_top_stats(self):
+        """Refresh today's figures in the top navigation bar"""
+        try:
+            stats = data_manager.get_dashboard_stats()
+            self.stats_label.config(
+                text=f"Today: ¥{stats.get('today_sales', 0):,.2f} · {stats.get('order_count', 0)} orders"
+                     f" · {stats.get('low_stock_count', 0)} low stock")
+        except Exception as e:
+            print(f"Failed to update top navigation stats: {e}")
+        self.root.after(10000, self.update_top_stats)
 
     def create_sidebar_navigation(self):
         """Create sidebar navigation"""
@@ -303,6 +320,9 @@ class ModernFoodServiceSystem:
             data_manager.register_module('finance', self.module_instances["finance"])
             data_manager.register_module('charts', self.module_instances["charts"])
             print("✅ All modules registered with data manager.")
+            # Data change events are delivered on this main loop, only to the visible module
+            if hasattr(data_manager, 'attach_ui'):
+                data_manager.attach_ui(self.root, lambda module_type: module_type == self.current_module)
         except Exception as e:
             print(f"⚠️ Failed to register modules with data manager: {e}")
         
@@ -326,6 +346,10 @@ class ModernFoodServiceSystem:
         except Exception as e:
             messagebox.showerror("Runtime Error", f"An unexpected error occurred: {e}")
             print(f"Runtime error: {e}")
+        finally:
+            # 退出前写完所有待保存的数据
+            if hasattr(data_manager, 'close'):
+                data_manager.close()
 
 def main():
     """Main function to run the application"""
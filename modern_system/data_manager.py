@@ -3,8 +3,7 @@
 """
 Proxy module to expose the DataManager from modules.
 """
-from modern_system.modules.data_manager import DataManager
+from modern_system.modules.data_manager import DataManager, data_manager
 
-# Instantiate global DataManager
+# Re-export the global DataManager instead of building a second one
 # Use this singleton across the application
-data_manager = DataManager()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Binary Snapshots
+Fast-loading binary copies of the JSON data files, written next to them
+The JSON files stay the interchange format; a snapshot is only used while it
+matches the JSON file it was written with
+
+Layout: fixed header followed by the marshal-encoded, already normalized records
+    magic(8) format(2) marshal(2) json_mtime_ns(8) json_size(8) json_hash(16) crc32(4) length(8)
+"""
+
+import marshal
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, List, Optional, Tuple
+
+MAGIC = b'POSSNAP\x00'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHqq16sIQ')
+
+
+def snapshot_path(json_file: str) -> str:
+    """Binary snapshot file belonging to a JSON data file"""
+    return os.path.splitext(json_file)[0] + '.snap'
+
+
+def write_snapshot(json_file: str, records: List[Any], json_state: Tuple[tuple, bytes], fsync: bool = False):
+    """Write records with the (signature, content hash) of the JSON file they were saved to"""
+    signature, digest = json_state
+    payload = marshal.dumps(records)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, signature[0], signature[1],
+                         digest, zlib.crc32(payload), len(payload))
+    path = snapshot_path(json_file)
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+
+def read_snapshot(json_file: str, signature: tuple) -> Optional[Tuple[List[Any], bytes]]:
+    """(records, JSON content hash) if the snapshot matches the JSON file's signature, else None
+
+    signature is (mtime_ns, size, inode) of the JSON file as it is now.
+    """
+    path = snapshot_path(json_file)
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, version, marshal_version, mtime_ns, json_size, digest, crc, length = HEADER.unpack_from(mapped)
+                if magic != MAGIC or version != FORMAT_VERSION or marshal_version != marshal.version:
+                    return None
+                if (mtime_ns, json_size) != signature[:2] or HEADER.size + length != size:
+                    # JSON文件已被其他程序修改，快照过期
+                    return None
+                with memoryview(mapped) as view, view[HEADER.size:] as payload:
+                    if zlib.crc32(payload) != crc:
+                        print(f"⚠️ Binary snapshot {os.path.basename(path)} is corrupt, using JSON")
+                        return None
+                    records = marshal.loads(payload)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, TypeError) as e:
+        print(f"⚠️ Cannot read binary snapshot {os.path.basename(path)}: {e}")
+        return None
+    return (records, digest) if isinstance(records, list) else None
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar Store
+In-memory column buffers mirroring orders and financial records for analytics
+Timestamps are epoch seconds, money is integer cents and text fields are
+dictionary-encoded, all kept in `array` buffers. Queries are vectorized with
+NumPy when it is installed and fall back to plain loops otherwise
+"""
+
+import datetime
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EPOCH = datetime.datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+DAY_SECONDS = 86400
+
+
+def to_epoch(value: Any) -> Optional[int]:
+    """Epoch seconds of an ISO date/time string (local time kept as is), None if unparseable"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value or '').replace(' ', 'T')[:19]
+    if len(text) < 10:
+        return None
+    try:
+        return int((datetime.datetime.fromisoformat(text) - EPOCH).total_seconds())
+    except ValueError:
+        return None
+
+
+def to_cents(value: Any) -> int:
+    """Money amount as integer cents"""
+    try:
+        return int(round(float(value or 0) * 100))
+    except (ValueError, TypeError):
+        return 0
+
+
+def to_int(value: Any) -> int:
+    """Integer value of a count field, 0 if not numeric"""
+    try:
+        return int(value or 0)
+    except (ValueError, TypeError):
+        return 0
+
+
+def day_key(day: int) -> str:
+    """YYYY-MM-DD of a day number (epoch seconds // 86400)"""
+    return datetime.date.fromordinal(EPOCH_ORDINAL + day).isoformat()
+
+
+class ColumnarTable:
+    """Column buffers for one collection, one row per record
+
+    Removed rows are tombstoned and dropped by compact(), updates are a
+    remove followed by an append.
+    """
+
+    def __init__(self, name: str, numeric: Iterable[str], categorical: Iterable[str],
+                 extract: Callable[[Dict], Optional[Dict]]):
+        self.name = name
+        self.numeric = tuple(numeric)
+        self.categorical = tuple(categorical)
+        self.extract = extract
+        self.clear()
+
+    def clear(self):
+        """Drop all rows"""
+        self.columns = {column: array('q') for column in self.numeric + self.categorical}
+        self.alive = bytearray()
+        self.rows = {}                  # id(记录) -> 行号
+        self.dead = 0
+        # 字典编码：列 -> {值: 编码}，以及编码 -> 值
+        self.codes = {column: {} for column in self.categorical}
+        self.values = {column: [] for column in self.categorical}
+
+    def __len__(self) -> int:
+        return len(self.alive) - self.dead
+
+    def encode(self, column: str, value: Any) -> int:
+        """Dictionary code of a categorical value, assigned on first use"""
+        codes = self.codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.values[column])
+            self.values[column].append(value)
+        return code
+
+    def append(self, record: Dict):
+        """Add a record's row, records the extractor rejects are skipped"""
+        row = self.extract(record)
+        if row is None:
+            return
+        self.rows[id(record)] = len(self.alive)
+        for column in self.numeric:
+            self.columns[column].append(row[column])
+        for column in self.categorical:
+            self.columns[column].append(self.encode(column, row[column]))
+        self.alive.append(1)
+
+    def remove(self, record: Dict):
+        """Tombstone a record's row"""
+        index = self.rows.pop(id(record), None)
+        if index is None:
+            return
+        self.alive[index] = 0
+        self.dead += 1
+        if self.dead > 1024 and self.dead * 2 > len(self.alive):
+            self.compact()
+
+    def rebuild(self, records: Iterable[Dict]):
+        """Rebuild all columns from the records"""
+        self.clear()
+        for record in records:
+            if isinstance(record, dict):
+                self.append(record)
+
+    def compact(self):
+        """Drop tombstoned rows"""
+        keep = [index for index, flag in enumerate(self.alive) if flag]
+        remap = {old: new for new, old in enumerate(keep)}
+        for column, values in self.columns.items():
+            self.columns[column] = array('q', (values[index] for index in keep))
+        self.alive = bytearray(b'\x01' * len(keep))
+        self.rows = {key: remap[index] for key, index in self.rows.items()}
+        self.dead = 0
+
+    # ==================== 查询 ====================
+    def selection(self, start: Any = None, end: Any = None, **where):
+        """Rows with start <= ts < end and categorical columns equal to the given values
+
+        Returns a boolean NumPy mask, or a list of row numbers without NumPy.
+        None when a where value never occurs.
+        """
+        start_ts = to_epoch(start) if start is not None else None
+        end_ts = to_epoch(end) if end is not None else None
+        filters = []
+        for column, value in where.items():
+            code = self.codes[column].get(value)
+            if code is None:
+                return None
+            filters.append((column, code))
+
+        if np is not None:
+            if not self.alive:
+                return np.zeros(0, dtype=bool)
+            mask = np.frombuffer(self.alive, dtype=np.uint8).astype(bool)
+            if start_ts is not None or end_ts is not None:
+                ts = self.array('ts')
+                if start_ts is not None:
+                    mask &= ts >= start_ts
+                if end_ts is not None:
+                    mask &= ts < end_ts
+            for column, code in filters:
+                mask &= self.array(column) == code
+            return mask
+
+        ts = self.columns['ts'] if 'ts' in self.columns else None
+        rows = []
+        for index, flag in enumerate(self.alive):
+            if not flag:
+                continue
+            if start_ts is not None and ts[index] < start_ts:
+                continue
+            if end_ts is not None and ts[index] >= end_ts:
+                continue
+            if any(self.columns[column][index] != code for column, code in filters):
+                continue
+            rows.append(index)
+        return rows
+
+    def array(self, column: str):
+        """Zero-copy NumPy view of a column buffer (do not keep it past the query)"""
+        return np.frombuffer(self.columns[column], dtype=np.int64) if len(self.columns[column]) else np.zeros(0, dtype=np.int64)
+
+    def count(self, start: Any = None, end: Any = None, **where) -> int:
+        """Number of selected rows"""
+        selected = self.selection(start, end, **where)
+        if selected is None:
+            return 0
+        return int(selected.sum()) if np is not None else len(selected)
+
+    def sum(self, column: str, start: Any = None, end: Any = None, **where) -> int:
+        """Sum of a numeric column over the selected rows"""
+        selected = self.selection(start, end, **where)
+        if selected is None:
+            return 0
+        if np is not None:
+            return int(self.array(column)[selected].sum())
+        values = self.columns[column]
+        return sum(values[index] for index in selected)
+
+    def group_by_day(self, column: str, start: Any = None, end: Any = None, **where) -> Dict[str, int]:
+        """{YYYY-MM-DD: sum of column} over the selected rows"""
+        selected = self.selection(start, end, **where)
+        if selected is None:
+            return {}
+        if np is not None:
+            days = self.array('ts')[selected] // DAY_SECONDS
+            if not len(days):
+                return {}
+            unique, inverse = np.unique(days, return_inverse=True)
+            totals = np.bincount(inverse, weights=self.array(column)[selected])
+            return {day_key(int(day)): int(total) for day, total in zip(unique, totals)}
+        ts, values = self.columns['ts'], self.columns[column]
+        result = {}
+        for index in selected:
+            day = day_key(ts[index] // DAY_SECONDS)
+            result[day] = result.get(day, 0) + values[index]
+        return result
+
+    def group_by(self, key: str, column: Optional[str] = None, start: Any = None, end: Any = None,
+                 **where) -> Dict[Any, int]:
+        """{categorical value: sum of column (row count if None)} over the selected rows"""
+        selected = self.selection(start, end, **where)
+        if selected is None:
+            return {}
+        labels = self.values[key]
+        if np is not None:
+            codes = self.array(key)[selected]
+            weights = self.array(column)[selected] if column else None
+            totals = np.bincount(codes, weights=weights, minlength=len(labels))
+            return {labels[code]: int(total) for code, total in enumerate(totals) if total}
+        codes = self.columns[key]
+        values = self.columns[column] if column else None
+        result = {}
+        for index in selected:
+            label = labels[codes[index]]
+            result[label] = result.get(label, 0) + (values[index] if values is not None else 1)
+        return result
+
+    def percentile(self, column: str, q: Any, start: Any = None, end: Any = None, **where) -> Any:
+        """Percentile(s) 0-100 of a numeric column with linear interpolation, None if nothing selected"""
+        selected = self.selection(start, end, **where)
+        if selected is None:
+            return None
+        if np is not None:
+            values = self.array(column)[selected]
+            if not len(values):
+                return None
+            result = np.percentile(values, q)
+            return result.tolist() if np.ndim(result) else float(result)
+        values = sorted(self.columns[column][index] for index in selected)
+        if not values:
+            return None
+
+        def interpolate(p):
+            rank = (len(values) - 1) * p / 100
+            low = int(rank)
+            high = min(low + 1, len(values) - 1)
+            return values[low] + (values[high] - values[low]) * (rank - low)
+
+        return [interpolate(p) for p in q] if isinstance(q, (list, tuple)) else interpolate(q)
+
+
+def order_row(record: Dict) -> Optional[Dict]:
+    """Column values of an order"""
+    ts = to_epoch(record.get('order_date') or record.get('create_time'))
+    if ts is None:
+        return None
+    return {
+        'ts': ts,
+        'amount': to_cents(record.get('total_amount', record.get('total', 0))),
+        'quantity': to_int(record.get('quantity', 1)),
+        'meal': record.get('meal_id'),
+        'status': record.get('status')
+    }
+
+
+def finance_row(record: Dict) -> Optional[Dict]:
+    """Column values of a financial record, amounts as positive cents per kind"""
+    record_type = record.get('type')
+    if record_type in ('revenue', 'Income'):
+        kind = 'revenue'
+    elif record_type in ('cost', 'Expense'):
+        kind = 'cost'
+    else:
+        return None
+    ts = to_epoch(record.get('date'))
+    if ts is None:
+        return None
+    return {'ts': ts, 'amount': abs(to_cents(record.get('amount'))), 'kind': kind}
+
+
+def create_tables() -> Dict[str, ColumnarTable]:
+    """Column tables DataManager keeps for its collections"""
+    return {
+        'orders': ColumnarTable('orders', ('ts', 'amount', 'quantity'), ('meal', 'status'), order_row),
+        'finance': ColumnarTable('finance', ('ts', 'amount'), ('kind',), finance_row)
+    }
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Data Journal
+Append-only operation log for the journal storage mode of DataManager
+New orders, financial records and stock movements are appended as single
+JSON lines instead of rewriting whole collection files
+Background threads fold the journal and coalesced saves into the snapshots
+"""
+
+import json
+import os
+import datetime
+import threading
+from typing import Dict, List, Callable, Optional
+from threading import Lock
+
+
+class DataJournal:
+    """Append-only JSON-lines journal
+
+    Every line is one entry: {"seq": n, "ts": "...", "ops": [op, ...]}
+    Supported ops:
+        {"op": "insert", "collection": c, "record": {...}}
+        {"op": "update", "collection": c, "id": record_id, "fields": {...}, "deltas": {...}}
+        {"op": "delete", "collection": c, "id": record_id}
+        {"op": "checkpoint", "collection": c, "upto": seq}
+    Updates always carry absolute field values so replaying an entry that is
+    already contained in the snapshot is harmless. The optional deltas hold
+    the numeric change behind some of those values, used to merge an update
+    onto data written by another terminal.
+    """
+
+    def __init__(self, journal_file: str, fsync: bool = True):
+        self.journal_file = journal_file
+        self.fsync = fsync
+        self.seq = 0
+        self._lock = Lock()
+        self._file = None
+
+    def _open(self):
+        """Open the journal file for appending"""
+        if self._file is None:
+            self._file = open(self.journal_file, 'ab')
+        return self._file
+
+    def append(self, ops: List[Dict]) -> int:
+        """Append one entry and return its sequence number"""
+        with self._lock:
+            self.seq += 1
+            entry = {
+                'seq': self.seq,
+                'ts': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+                'ops': ops
+            }
+            line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+            f = self._open()
+            f.write(line.encode('utf-8'))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            return self.seq
+
+    def read_entries(self) -> List[Dict]:
+        """Read all complete entries, a torn last line from a crash is ignored"""
+        entries = []
+        if not os.path.exists(self.journal_file):
+            return entries
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    print(f"⚠️ Skipping damaged journal line in {self.journal_file}")
+                    continue
+                entries.append(entry)
+                self.seq = max(self.seq, entry.get('seq', 0))
+        return entries
+
+    def size(self) -> int:
+        """Current journal size in bytes"""
+        try:
+            return os.path.getsize(self.journal_file)
+        except OSError:
+            return 0
+
+    def truncate(self):
+        """Drop all entries once they have been folded into the snapshots"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            with open(self.journal_file, 'wb') as f:
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self.seq = 0
+
+    def close(self):
+        """Close the underlying file handle"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class JournalCompactor(threading.Thread):
+    """Background thread that periodically folds the journal into the snapshots"""
+
+    def __init__(self, compact: Callable[[], None], interval: float = 30.0):
+        super().__init__(name='JournalCompactor', daemon=True)
+        self.compact = compact
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"⚠️ Journal compaction failed: {e}")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the compactor thread"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+class SnapshotWriter(threading.Thread):
+    """Write-behind thread that coalesces bursts of saves into one flush per interval"""
+
+    def __init__(self, flush: Callable[[], None], interval: float = 0.05):
+        super().__init__(name='SnapshotWriter', daemon=True)
+        self.flush = flush
+        self.interval = interval
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+
+    def notify(self):
+        """Signal that a collection was marked dirty"""
+        self._wake_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._wake_event.wait()
+            # 等待一个周期，把期间的多次保存合并为一次写入
+            self._stop_event.wait(self.interval)
+            self._wake_event.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Write-behind flush failed: {e}")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the writer after its current flush"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+def replay_entries(entries: List[Dict], collections: Dict[str, List[Dict]],
+                   normalize: Optional[Callable[[str, Dict], Dict]] = None, rebase: bool = False) -> int:
+    """Apply journal entries on top of loaded snapshot collections
+
+    With rebase, update deltas are added to the current values instead of
+    setting the absolute ones, for merging onto newer data.
+    Returns the number of operations applied.
+    """
+    # Checkpoints mark ops already folded into a snapshot written by a full save
+    checkpoints = {}
+    for entry in entries:
+        for op in entry.get('ops', []):
+            if op.get('op') == 'checkpoint':
+                checkpoints[op['collection']] = max(checkpoints.get(op['collection'], 0), op.get('upto', 0))
+
+    # Temporary id maps so replay stays linear in the journal length
+    id_maps = {}
+
+    def get_id_map(name):
+        if name not in id_maps:
+            id_maps[name] = {r.get('id'): r for r in collections.get(name, []) if isinstance(r, dict)}
+        return id_maps[name]
+
+    applied = 0
+    for entry in entries:
+        seq = entry.get('seq', 0)
+        for op in entry.get('ops', []):
+            name = op.get('collection')
+            kind = op.get('op')
+            if name not in collections or kind == 'checkpoint':
+                continue
+            if seq <= checkpoints.get(name, 0):
+                continue
+
+            records = collections[name]
+            id_map = get_id_map(name)
+            if kind == 'insert':
+                record = dict(op.get('record', {}))
+                if normalize:
+                    record = normalize(name, record)
+                if record.get('id') in id_map:
+                    continue
+                records.append(record)
+                id_map[record.get('id')] = record
+            elif kind == 'update':
+                record = id_map.get(op.get('id'))
+                if record is not None:
+                    apply_update(record, op, rebase)
+            elif kind == 'delete':
+                record = id_map.pop(op.get('id'), None)
+                if record is not None:
+                    records.remove(record)
+            else:
+                continue
+            applied += 1
+    return applied
+
+
+def apply_update(record: Dict, op: Dict, rebase: bool = False):
+    """Apply an update op to a record, as deltas on the current values when rebasing"""
+    deltas = op.get('deltas') if rebase else None
+    if not deltas:
+        record.update(op.get('fields', {}))
+        return
+    for field, value in op.get('fields', {}).items():
+        if field not in deltas:
+            record[field] = value
+    for field, delta in deltas.items():
+        try:
+            record[field] = (record.get(field) or 0) + delta
+        except TypeError:
+            record[field] = op.get('fields', {}).get(field, record.get(field))
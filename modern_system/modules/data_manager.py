@@ -9,28 +9,233 @@ Stores data using JSON files
 import json
 import os
 import datetime
-from typing import Dict, List, Any, Optional
-from threading import Lock
-from tkinter import TclError
+import hashlib
+import heapq
+import itertools
+from bisect import bisect_left, insort
+from contextlib import contextmanager, ExitStack
+from typing import Dict, Iterator, List, Any, Optional
+from threading import Lock, RLock
+
+try:
+    from .data_journal import DataJournal, JournalCompactor, SnapshotWriter, replay_entries
+    from .sqlite_storage import SqliteStorage, migrate_json_to_sqlite
+    from .id_generator import IdGenerator, allocate_node_id
+    from .event_bus import EventBus
+    from .file_lock import FileLock
+    from .rw_lock import ReadWriteLock
+    from .snapshot_view import SnapshotView, FrozenRecord, freeze, thaw
+    from .columnar_store import create_tables
+    from . import binary_snapshot
+    from .partition_store import PartitionStore, partition_of, current_month, shift_month, in_month_range, UNDATED
+    from .json_stream import iter_json_array
+    from .recipe_engine import RecipeBook, ServingsTable
+except ImportError:
+    from data_journal import DataJournal, JournalCompactor, SnapshotWriter, replay_entries
+    from sqlite_storage import SqliteStorage, migrate_json_to_sqlite
+    from id_generator import IdGenerator, allocate_node_id
+    from event_bus import EventBus
+    from file_lock import FileLock
+    from rw_lock import ReadWriteLock
+    from snapshot_view import SnapshotView, FrozenRecord, freeze, thaw
+    from columnar_store import create_tables
+    import binary_snapshot
+    from partition_store import PartitionStore, partition_of, current_month, shift_month, in_month_range, UNDATED
+    from json_stream import iter_json_array
+    from recipe_engine import RecipeBook, ServingsTable
+
+# 存储配置默认值，可通过 data/storage_config.json 覆盖
+DEFAULT_STORAGE_CONFIG = {
+    'backend': 'json',          # 'json' or 'sqlite'
+    'sqlite_file': 'foodservice.db',
+    'journal': False,           # Defer JSON snapshot rewrites to the background compactor
+    'journal_fsync': True,      # fsync every journal entry (one per transaction)
+    'compact_interval': 30,     # Seconds between background compactions
+    'write_behind': True,       # Coalesce save_* calls on a background writer thread
+    'flush_interval': 0.05,     # Seconds the writer waits to batch a burst of saves
+    'node_id': None,            # Fixed ID node number for this terminal, allocated automatically if None
+    'shared': False,            # Several terminals share the data directory (JSON backend, file locks + versions)
+    'columnar': True,           # Keep column buffers of orders and finance for fast analytics
+    'binary_snapshots': True,   # Write <name>.snap next to each JSON file and load it while it is fresh
+    'partitioned': False,       # Store orders and finance as one JSON file per month (JSON backend, single terminal)
+    'hot_months': 1,            # Months loaded at startup when partitioned, older ones load when a query needs them
+    'archive_after_months': 6   # Partitions older than this many months are gzip-compressed into <collection>/archive/
+}
+
+# 撤销日志中表示"字段原本不存在"
+_MISSING = object()
+
+def collection_property(name: str) -> property:
+    """Attribute backed by a collection that is loaded on first access"""
+    def getter(self):
+        return self.ensure_loaded(name)
+
+    def setter(self, records):
+        self.loaded_collections[name] = records
+
+    return property(getter, setter, doc=f"{name} records (loaded on first access)")
+
 
 class DataManager:
-    def __init__(self):
-        self.data_lock = Lock()
+    # 集合名称 -> (属性名, 数据文件)
+    COLLECTIONS = {
+        'orders': ('orders', 'orders.json'),
+        'inventory': ('inventory', 'inventory.json'),
+        'customers': ('customers', 'customers.json'),
+        'meals': ('meals', 'meals.json'),
+        'employees': ('employees', 'employees.json'),
+        'finance': ('financial_records', 'finance.json')
+    }
+    # 需要按名称（忽略大小写）建立索引的集合
+    NAME_INDEXED = ('inventory', 'meals')
+    # 订单二级索引（日期、状态、客户）依赖的字段
+    ORDER_INDEXED_FIELDS = ('order_date', 'create_time', 'status', 'customer_id')
+    # 集合 -> 由其增量维护的仪表盘聚合字段
+    AGGREGATE_FIELDS = {
+        'finance': 'today_sales',
+        'orders': 'order_count',
+        'inventory': 'low_stock_count',
+        'customers': 'customer_count'
+    }
+    # 按月分区存储的集合 -> 决定所属月份的日期字段（依次尝试）
+    PARTITION_FIELDS = {
+        'orders': ('order_date', 'create_time'),
+        'finance': ('date', 'create_time')
+    }
+    # 收支汇总粒度 -> 日期字符串前缀长度（YYYY-MM / YYYY-MM-DD / YYYY-MM-DDTHH）
+    ROLLUP_GRANULARITIES = {'month': 7, 'day': 10, 'hour': 13}
+    # 模块类型 -> (订阅的事件, 刷新方法)
+    MODULE_REFRESH = {
+        'finance': (('order_created',), 'refresh_data'),
+        'inventory': (('order_created',), 'refresh_data'),
+        'sales': (('availability_changed',), 'refresh_availability'),
+        'charts': (('order_created',), 'refresh_charts')
+    }
+    # 刷新方法接收事件列表、只处理payload中变更部分的模块
+    MODULE_REFRESH_WITH_EVENTS = ('sales',)
+
+    # 集合数据在首次访问时才从存储加载
+    orders = collection_property('orders')
+    inventory = collection_property('inventory')
+    customers = collection_property('customers')
+    meals = collection_property('meals')
+    employees = collection_property('employees')
+    financial_records = collection_property('finance')
+
+    def __init__(self, data_path: Optional[str] = None):
+        # 读写锁：读者共享访问内存数据，写者只在修改内存时独占，磁盘I/O不持有该锁
+        # write_lock 保证同一时刻只有一个写者（事务提交、快照写入、合并journal）
+        self.data_lock = ReadWriteLock()
+        self.write_lock = RLock()
         self.modules = {}
-        self.data_path = os.path.join(os.path.dirname(__file__), '..', 'data')
+        # 数据变更事件在界面主循环中合并分发
+        self.event_bus = EventBus()
+        self.module_subscriptions = {}
+        self.module_visible = None
+        self.data_path = data_path or os.path.join(os.path.dirname(__file__), '..', 'data')
         self.ensure_data_directory()
+        self.storage_config = self.load_storage_config()
+        self.id_generator = IdGenerator(self.get_node_id())
         
-        # 使用JSON文件存储
-        print("✅ Using JSON file storage")
-        # 数据存储（JSON模式）
-        self.orders = self.load_orders()
-        self.inventory = self.load_inventory()
-        self.customers = self.load_customers()
-        self.meals = self.load_meals()
-        self.employees = self.load_employees()
-        self.financial_records = self.load_financial_records()
+        # JSON模式下所有事务先写入journal（预写日志），再更新JSON快照
+        # 日志模式下快照改由后台线程定期合并
+        self.storage = None
+        self.journal = None
+        self.compactor = None
+        self.journal_mode = bool(self.storage_config.get('journal'))
+        self.journal_collections = set()   # 在journal中有未合并操作的集合
+        self.journal_dirty = set()         # 快照落后于journal的集合
+        self.snapshot_unsynced = set()     # 快照已重写但尚未fsync的集合
+        self.pending_saves = set()         # 等待后台写入的整表保存
+        self.pending_snapshots = set()     # 等待后台重写的快照（已记录在journal中）
+        self.writer = None
+        self._transaction = None
+        # 主键索引：集合 -> {id: 记录}，名称索引：集合 -> {规范化名称: 记录}
+        self.id_indexes = {}
+        self.name_indexes = {}
+        # 被索引中先到记录遮蔽的同键记录：集合 -> {(字段, 键): [记录, ...]}，按插入顺序接替
+        self.index_duplicates = {}
+        # 订单二级索引：按日期排序的键列表、状态 -> 订单（及按日期排序的键）、客户 -> 订单
+        self.order_date_keys = []
+        self.orders_by_date_key = {}
+        self.order_keys = {}
+        self.orders_by_status = {}
+        self.order_status_keys = {}
+        self.orders_by_customer = {}
+        self.order_key_counter = itertools.count()
+        # 仪表盘聚合，随每次记录变更增量更新，跨天时重新计算
+        self.aggregate_day = datetime.datetime.now().strftime('%Y-%m-%d')
+        self.aggregates = {field: 0 for field in self.AGGREGATE_FIELDS.values()}
+        # 收支汇总：粒度 -> {时间桶: {'revenue': x, 'cost': y}}，持久化到 rollups.json
+        self.rollups = {granularity: {} for granularity in self.ROLLUP_GRANULARITIES}
+        self.rollups_dirty = False
+        # 列式镜像：订单和财务记录的列缓冲，随记录变更增量维护
+        self.columns = create_tables() if self.storage_config.get('columnar', True) else {}
+        # 已加载的集合，以及尚未回放到未加载集合的journal条目
+        self.loaded_collections = {}
+        self.journal_entries = []
+        # 变更检测：集合 -> ((mtime, size, inode), 内容哈希)，SQLite模式下记录data_version
+        self.file_states = {}
+        self.storage_version = None
+        # JSON旁的二进制快照，JSON未被外部修改时优先加载
+        self.binary_snapshots = bool(self.storage_config.get('binary_snapshots', True))
+        # 多终端共享数据目录：集合 -> 文件锁（锁文件中保存版本号），以及已读取的版本
+        self.shared = bool(self.storage_config.get('shared')) and self.storage_config.get('backend') != 'sqlite'
+        self.collection_locks = {}
+        self.versions = {}
+        # 共享提交先把整组操作写入 shared_commit.json，中断的提交由任一终端补全
+        self.commit_lock = None
+        self.shared_commit_file = os.path.join(self.data_path, 'shared_commit.json')
+        # 按月分区：集合 -> PartitionStore，已加载的月份、待写入的月份，以及已读写文件的状态
+        self.partitions = {}
+        self.loaded_months = {}
+        self.dirty_months = {}
+        self.partition_states = {}
+        # 编译后的配方：菜品 -> 库存列用量向量，库存条目、菜品或 recipes.json 变化时重新编译
+        self.recipe_book = None
+        self.recipe_state = None
+        self.recipe_generation = 0
+        # 可制作份数缓存，只为库存变化的食材所在的菜品重新计算
+        self.servings_table = ServingsTable()
+        self.servings_lock = Lock()
+        # 不可变快照：集合 -> 已发布的SnapshotView，过期集合在下次读取时重新发布
+        # 冻结记录按 id(记录) 缓存，只有变更过的记录需要重新复制
+        self.snapshots = {}
+        self.stale_snapshots = set()
+        self.frozen_records = {}
+        self.snapshot_lock = Lock()
+        if self.storage_config.get('backend') == 'sqlite':
+            self.storage = self.open_sqlite_storage()
+            print("✅ Using SQLite storage")
+        else:
+            self.journal = DataJournal(os.path.join(self.data_path, 'journal.jsonl'),
+                                       fsync=self.storage_config.get('journal_fsync', True))
+            if self.shared:
+                print("✅ Using shared JSON file storage (multi-terminal)")
+            elif self.journal_mode:
+                print("✅ Using JSON file storage with append-only journal")
+            else:
+                print("✅ Using JSON file storage")
+            if self.storage_config.get('partitioned'):
+                if self.shared:
+                    print("ℹ️ Monthly partitions are not used in shared mode, keeping whole files")
+                else:
+                    self.open_partitions()
+        # 集合按需加载，这里只读取journal
+        self.load_all_collections()
+        if self.shared:
+            # 共享模式下每次提交直接写快照，先补全中断的共享提交，再合并单机运行遗留的journal
+            self.recover_shared_commit()
+            self.fold_journal_into_shared()
+        if self.journal:
+            self.compactor = JournalCompactor(self.compact_journal,
+                                              self.storage_config.get('compact_interval', 30))
+            self.compactor.start()
+        if self.storage_config.get('write_behind', True):
+            self.writer = SnapshotWriter(self.flush, self.storage_config.get('flush_interval', 0.05))
+            self.writer.start()
         
-        # 初始化仪表盘统计
+        # 初始化仪表盘统计（首次读取时计算）
         self.dashboard_stats = {
             'today_sales': 0,
             'order_count': 0,
@@ -44,22 +249,562 @@ class DataManager:
         if not os.path.exists(self.data_path):
             os.makedirs(self.data_path)
     
+    def load_storage_config(self) -> Dict:
+        """Load storage settings from storage_config.json"""
+        config = dict(DEFAULT_STORAGE_CONFIG)
+        config_file = os.path.join(self.data_path, 'storage_config.json')
+        if os.path.exists(config_file):
+            try:
+                with open(config_file, 'r', encoding='utf-8') as f:
+                    config.update(json.load(f))
+            except Exception as e:
+                print(f"Error loading storage config: {e}")
+        return config
+
+    def get_node_id(self) -> int:
+        """ID node number of this process, unique among running terminals"""
+        node_id = self.storage_config.get('node_id')
+        if node_id is not None:
+            return int(node_id)
+        return allocate_node_id(os.path.join(self.data_path, 'id_node.json'))
+
+    def new_id(self, prefix: str) -> str:
+        """Generate a unique, time-ordered record id"""
+        return self.id_generator.next_id(prefix)
+
+    def open_sqlite_storage(self) -> SqliteStorage:
+        """Open the SQLite database, importing the JSON files on first use"""
+        db_file = os.path.join(self.data_path, self.storage_config.get('sqlite_file', 'foodservice.db'))
+        storage = SqliteStorage(db_file)
+        if storage.is_empty():
+            print("ℹ️ SQLite database is empty, importing JSON data files")
+            migrate_json_to_sqlite(self.data_path, db_file, storage)
+        return storage
+
     def register_module(self, module_type: str, instance):
-        """注册模块实例"""
+        """注册模块实例，并订阅其关心的数据变更事件"""
         self.modules[module_type] = instance
+        if module_type in self.module_subscriptions:
+            self.event_bus.unsubscribe(self.module_subscriptions.pop(module_type))
+        event_types, method_name = self.MODULE_REFRESH.get(module_type, ((), None))
+        refresh = getattr(instance, method_name, None) if method_name else None
+        if refresh:
+            if module_type in self.MODULE_REFRESH_WITH_EVENTS:
+                callback = refresh
+            else:
+                callback = lambda events, refresh=refresh: refresh()
+            self.module_subscriptions[module_type] = self.event_bus.subscribe(
+                event_types,
+                callback,
+                visible=lambda module_type=module_type: self.is_module_visible(module_type),
+                name=f"{module_type} module")
+
+    def attach_ui(self, root, is_visible=None):
+        """Deliver data change events on the Tk main loop, only to visible modules"""
+        self.module_visible = is_visible
+        self.event_bus.attach(root)
+
+    def is_module_visible(self, module_type: str) -> bool:
+        """Whether a module is currently shown (always True without a UI)"""
+        if self.module_visible is None:
+            return True
+        return self.module_visible(module_type)
         
     def get_module(self, module_type: str):
         """获取模块实例"""
         return self.modules.get(module_type)
 
     # ==================== 数据加载方法 ====================
+    def load_all_collections(self):
+        """Drop loaded collections so they are reloaded from storage on next access"""
+        with self.write_lock:
+            with self.data_lock.write():
+                self.loaded_collections = {}
+            self.loaded_months = {}
+            self.journal_entries = []
+            if self.journal:
+                self.read_journal()
+
+    def ensure_loaded(self, name: str) -> List[Dict]:
+        """Load a collection on first access and build its indexes and aggregates"""
+        records = self.loaded_collections.get(name)
+        if records is not None:
+            return records
+        with self.write_lock:
+            records = self.loaded_collections.get(name)
+            if records is not None:
+                return records
+            records = self.read_collection(name)
+            with self.data_lock.write():
+                self.install_collection(name, records)
+            return records
+
+    def read_collection(self, name: str) -> List[Dict]:
+        """Read a collection from storage (holds no data lock, readers keep going)"""
+        if self.storage:
+            self.storage_version = self.storage.data_version()
+            return [self.normalize_record(name, r) for r in self.storage.load(name)]
+        if name in self.partitions:
+            return self.read_partitions(name)
+        if self.shared:
+            self.recover_shared_commit()
+            # 共享锁下读取版本号和文件，保证二者一致
+            with self.collection_lock(name).shared() as lock:
+                self.versions[name] = lock.read_version()
+                return self.load_collection_file(name)
+        return self.load_collection_file(name)
+
+    def load_collection_file(self, name: str) -> List[Dict]:
+        """Load a collection from its binary snapshot if fresh, otherwise from JSON"""
+        records = self.read_binary_snapshot(name)
+        if records is not None:
+            return records
+        state = self.file_states.get(name)
+        records = getattr(self, 'load_' + self.COLLECTIONS[name][0])()
+        if self.file_states.get(name) is not state:
+            # JSON刚被读取（首次启动或被外部修改），生成快照供下次冷启动使用
+            self.write_binary_snapshot(name, records)
+        return records
+
+    def install_collection(self, name: str, records: List[Dict]):
+        """Make loaded records current and build their indexes and aggregates (hold the write lock)"""
+        self.loaded_collections[name] = records
+        self.replay_journal(name)
+        self.rebuild_indexes(name)
+        if name == 'finance' and not self.load_rollups():
+            self.rebuild_rollups()
+        self.rebuild_columns(name)
+        self.rebuild_aggregates(name)
+
+    def read_collection_file(self, name: str) -> Any:
+        """Parse a collection's JSON file and remember its signature and content hash"""
+        file_path = os.path.join(self.data_path, self.COLLECTIONS[name][1])
+        with open(file_path, 'rb') as f:
+            signature = self.file_signature(os.fstat(f.fileno()))
+            raw = f.read()
+        self.file_states[name] = (signature, hashlib.blake2b(raw, digest_size=16).digest())
+        return json.loads(raw.decode('utf-8'))
+
+    def read_binary_snapshot(self, name: str) -> Optional[List[Dict]]:
+        """Normalized records from a collection's binary snapshot, None if missing or stale"""
+        if not self.binary_snapshots:
+            return None
+        file_path = os.path.join(self.data_path, self.COLLECTIONS[name][1])
+        try:
+            signature = self.file_signature(os.stat(file_path))
+        except OSError:
+            return None
+        result = binary_snapshot.read_snapshot(file_path, signature)
+        if result is None:
+            return None
+        records, digest = result
+        self.file_states[name] = (signature, digest)
+        return records
+
+    def write_binary_snapshot(self, name: str, records: List[Dict], fsync: bool = False):
+        """Write the binary snapshot matching the JSON file just written"""
+        if not self.binary_snapshots:
+            return
+        file_path = os.path.join(self.data_path, self.COLLECTIONS[name][1])
+        try:
+            binary_snapshot.write_snapshot(file_path, records, self.file_states[name], fsync)
+        except Exception as e:
+            # 快照与新JSON不匹配，下次加载自动回退到JSON
+            print(f"⚠️ Binary snapshot of {name} not written: {e}")
+
+    @staticmethod
+    def file_signature(stat: os.stat_result) -> tuple:
+        """(mtime, size, inode) of a file, changes whenever the file is rewritten"""
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def collection_changed(self, name: str) -> bool:
+        """Whether the stored copy of a loaded collection differs from what was last read or written"""
+        if self.storage:
+            return self.storage.data_version() != self.storage_version
+        if self.shared:
+            self.recover_shared_commit()
+            with self.collection_lock(name).shared() as lock:
+                return lock.read_version() != self.versions.get(name)
+        if name in self.partitions:
+            store, states = self.partitions[name], self.partition_states.get(name, {})
+            return any(store.signature(month) != states.get(month) for month in self.loaded_months.get(name, ()))
+        file_path = os.path.join(self.data_path, self.COLLECTIONS[name][1])
+        state = self.file_states.get(name)
+        try:
+            with open(file_path, 'rb') as f:
+                signature = self.file_signature(os.fstat(f.fileno()))
+                if state and state[0] == signature:
+                    return False
+                digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+        except FileNotFoundError:
+            return state is not None
+        if state and state[1] == digest:
+            # 文件被改写但内容相同（例如touch或重复保存）
+            self.file_states[name] = (signature, digest)
+            return False
+        return True
+
+    def reload_collection(self, name: str) -> List[Dict]:
+        """Re-read a collection and rebuild its indexes and aggregates, keeping the list object"""
+        with self.write_lock:
+            records = self.read_collection(name)
+            with self.data_lock.write():
+                old_records = self.loaded_collections.get(name)
+                if old_records is not None:
+                    # 模块可能持有旧列表的引用，原地替换内容
+                    old_records[:] = records
+                    records = old_records
+                self.install_collection(name, records)
+            return records
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a collection has been loaded into memory"""
+        return name in self.loaded_collections
+
+    def read_journal(self):
+        """Read journal entries left from the last run, replayed as collections load"""
+        entries = self.journal.read_entries()
+        if not entries:
+            return
+        self.journal_entries = entries
+        for entry in entries:
+            for op in entry.get('ops', []):
+                if op.get('collection') in self.COLLECTIONS:
+                    self.journal_collections.add(op['collection'])
+                    self.journal_dirty.add(op['collection'])
+
+    def replay_journal(self, name: str):
+        """Apply journal entries that have not been compacted yet to a freshly loaded collection"""
+        if not self.journal_entries or name not in self.journal_collections:
+            return
+        records = self.loaded_collections[name]
+        months = self.journal_months(name, records) if name in self.partitions else None
+        applied = replay_entries(self.journal_entries, {name: records}, self.normalize_record)
+        if applied:
+            print(f"✅ Replayed {applied} journal operations on {name}")
+        if months is not None:
+            # 回放后的月份与磁盘不一致，需要重写
+            changed_ids = {op.get('id') for entry in self.journal_entries for op in entry.get('ops', [])
+                           if op.get('collection') == name and op.get('op') == 'update'}
+            months.update(self.record_month(name, r) for r in records if r.get('id') in changed_ids)
+            self.dirty_months.setdefault(name, set()).update(months)
+
+    def normalize_record(self, collection: str, record: Dict) -> Dict:
+        """Apply the same fixups a record gets when loaded from its JSON file"""
+        if collection == 'finance':
+            return self.normalize_financial_record(record)
+        return record
+
+    def get_collection(self, name: str) -> List[Dict]:
+        """Get the in-memory list backing a collection"""
+        return self.ensure_loaded(name)
+
+    def snapshot(self, name: str, start: Optional[str] = None, end: Optional[str] = None) -> SnapshotView:
+        """Current immutable view of a collection, O(1) unless it changed since the last call
+
+        With start/end the view holds the orders or financial records dated
+        start <= date < end, and only the months the range touches are loaded.
+        """
+        records = self.ensure_partitions(name, start, end)
+        view = self.publish_snapshot(name, records)
+        if start or end:
+            return view.filter(lambda record: self.in_date_range(name, record, start, end))
+        return view
+
+    def publish_snapshot(self, name: str, records: List[Dict]) -> SnapshotView:
+        """Cached view of the loaded records, rebuilt if the collection changed"""
+        with self.data_lock.read():
+            view = self.snapshots.get(name)
+            if view is not None and name not in self.stale_snapshots:
+                return view
+            with self.snapshot_lock:
+                view = self.snapshots.get(name)
+                if view is not None and name not in self.stale_snapshots:
+                    return view
+                frozen = self.frozen_records.setdefault(name, {})
+                items = []
+                for record in records:
+                    item = frozen.get(id(record))
+                    if item is None:
+                        item = frozen[id(record)] = freeze(record)
+                    items.append(item)
+                view = SnapshotView(tuple(items), view.version + 1 if view else 1, name)
+                # 整体替换引用即原子发布，持有旧版本的读者不受影响
+                self.snapshots[name] = view
+                self.stale_snapshots.discard(name)
+                return view
+
+    def in_date_range(self, name: str, record: Dict, start: Optional[str], end: Optional[str]) -> bool:
+        """Whether a record's date lies in start <= date < end"""
+        date = next((record.get(field) for field in self.PARTITION_FIELDS.get(name, ()) if record.get(field)), '')
+        date = self.order_date_key(date)
+        if start and date < self.order_date_key(start):
+            return False
+        return not (end and date >= self.order_date_key(end))
+
+    def invalidate_snapshot(self, name: str, record: Optional[Dict] = None):
+        """Mark a collection's snapshot stale and drop frozen copies of changed records (hold the write lock)"""
+        self.stale_snapshots.add(name)
+        frozen = self.frozen_records.get(name)
+        if frozen is None:
+            return
+        if record is None:
+            frozen.clear()
+        else:
+            frozen.pop(id(record), None)
+
+    # ==================== 索引 ====================
+    @staticmethod
+    def normalize_name(name: Any) -> str:
+        """Normalize a name for case-insensitive lookups"""
+        return str(name or '').strip().lower()
+
+    def index_keys(self, collection: str, record: Dict) -> List[tuple]:
+        """(field, index, key) triples a record is stored under"""
+        keys = [('id', self.id_indexes[collection], record.get('id'))]
+        if collection in self.NAME_INDEXED:
+            keys.append(('name', self.name_indexes[collection], self.normalize_name(record.get('name'))))
+        return keys
+
+    def rebuild_views(self, collection: Optional[str] = None):
+        """Rebuild indexes and aggregates derived from one or all loaded collections"""
+        with self.data_lock.write():
+            self.rebuild_indexes(collection)
+            if collection == 'finance' or (collection is None and self.is_loaded('finance')):
+                self.rebuild_rollups(self.loaded_months.get('finance'))
+            self.rebuild_columns(collection)
+            self.rebuild_aggregates(collection)
+
+    def rebuild_indexes(self, collection: Optional[str] = None):
+        """Rebuild the id and name indexes of one or all loaded collections"""
+        with self.data_lock.write():
+            names = [collection] if collection else [n for n in self.COLLECTIONS if self.is_loaded(n)]
+            for name in names:
+                self.invalidate_snapshot(name)
+                self.id_indexes[name] = {}
+                self.index_duplicates[name] = {}
+                if name in self.NAME_INDEXED:
+                    self.name_indexes[name] = {}
+                if name == 'orders':
+                    self.order_date_keys = []
+                    self.orders_by_date_key = {}
+                    self.order_keys = {}
+                    self.orders_by_status = {}
+                    self.order_status_keys = {}
+                    self.orders_by_customer = {}
+                for record in self.get_collection(name):
+                    if isinstance(record, dict):
+                        self.index_record(name, record)
+
+    def index_record(self, collection: str, record: Dict, tie_break: Optional[int] = None):
+        """Add a record to the indexes, the first record with a key wins"""
+        duplicates = self.index_duplicates.setdefault(collection, {})
+        for field, index, key in self.index_keys(collection, record):
+            if index.setdefault(key, record) is not record:
+                duplicates.setdefault((field, key), []).append(record)
+        self.invalidate_recipes(collection)
+        if collection == 'orders':
+            self.index_order(record, tie_break)
+
+    def unindex_record(self, collection: str, record: Dict):
+        """Remove a record from the indexes"""
+        if collection == 'orders':
+            self.unindex_order(record)
+        self.invalidate_recipes(collection)
+        duplicates = self.index_duplicates.setdefault(collection, {})
+        for field, index, key in self.index_keys(collection, record):
+            waiting = duplicates.get((field, key))
+            if index.get(key) is record:
+                # 历史数据中存在重复编号，由下一条同键记录接替
+                if waiting:
+                    index[key] = waiting.pop(0)
+                else:
+                    del index[key]
+            elif waiting:
+                for position, other in enumerate(waiting):
+                    if other is record:
+                        del waiting[position]
+                        break
+            if duplicates.get((field, key)) == []:
+                del duplicates[(field, key)]
+
+    @staticmethod
+    def order_date_key(value: Any) -> str:
+        """ISO timestamp used as sort key of the order date index"""
+        return str(value or '').replace(' ', 'T')
+
+    def index_order(self, order: Dict, tie_break: Optional[int] = None):
+        """Add an order to the date, status and customer indexes
+
+        tie_break orders records with the same date; pass the old one when
+        reindexing so that an updated order keeps its place.
+        """
+        date = self.order_date_key(order.get('order_date') or order.get('create_time'))
+        key = (date, next(self.order_key_counter) if tie_break is None else tie_break)
+        insort(self.order_date_keys, key)
+        self.orders_by_date_key[key] = order
+        self.order_keys[id(order)] = key
+        self.orders_by_status.setdefault(order.get('status'), {})[id(order)] = order
+        insort(self.order_status_keys.setdefault(order.get('status'), []), key)
+        self.orders_by_customer.setdefault(order.get('customer_id'), {})[id(order)] = order
+
+    def unindex_order(self, order: Dict):
+        """Remove an order from the date, status and customer indexes"""
+        key = self.order_keys.pop(id(order), None)
+        if key is None:
+            return
+        position = bisect_left(self.order_date_keys, key)
+        if position < len(self.order_date_keys) and self.order_date_keys[position] == key:
+            del self.order_date_keys[position]
+        self.orders_by_date_key.pop(key, None)
+        status_orders = self.orders_by_status.get(order.get('status'), {})
+        status_orders.pop(id(order), None)
+        if not status_orders:
+            self.orders_by_status.pop(order.get('status'), None)
+        status_keys = self.order_status_keys.get(order.get('status'), [])
+        position = bisect_left(status_keys, key)
+        if position < len(status_keys) and status_keys[position] == key:
+            del status_keys[position]
+        if not status_keys:
+            self.order_status_keys.pop(order.get('status'), None)
+        customer_orders = self.orders_by_customer.get(order.get('customer_id'), {})
+        customer_orders.pop(id(order), None)
+        if not customer_orders:
+            self.orders_by_customer.pop(order.get('customer_id'), None)
+
+    def query_storage(self, name: str) -> bool:
+        """Whether queries on a collection go to the SQLite indexes (it is not loaded into memory)"""
+        return self.storage is not None and not self.is_loaded(name)
+
+    def query_orders(self, start: Optional[str] = None, end: Optional[str] = None,
+                     status: Any = None, customer_id: Optional[str] = None) -> List[Dict]:
+        """Orders with start <= order_date < end, matching status (one or several) and customer, by date"""
+        if self.query_storage('orders'):
+            return self.storage.query_orders(start, end, status, customer_id)
+        self.ensure_partitions('orders', start, end)
+        with self.data_lock.read():
+            statuses = [status] if isinstance(status, str) else status
+            # 从最小的候选集合开始，其余条件逐条过滤
+            candidates, sorted_by_date = None, False
+            if start or end:
+                low = bisect_left(self.order_date_keys, (self.order_date_key(start),)) if start else 0
+                high = bisect_left(self.order_date_keys, (self.order_date_key(end),)) if end else len(self.order_date_keys)
+                candidates = [self.orders_by_date_key[key] for key in self.order_date_keys[low:high]]
+                sorted_by_date = True
+            if statuses is not None:
+                status_count = sum(len(self.orders_by_status.get(s, {})) for s in statuses)
+                if candidates is None or status_count < len(candidates):
+                    candidates = [o for s in statuses for o in self.orders_by_status.get(s, {}).values()]
+                    sorted_by_date = False
+            if customer_id is not None:
+                customer_orders = self.orders_by_customer.get(customer_id, {})
+                if candidates is None or len(customer_orders) < len(candidates):
+                    candidates = list(customer_orders.values())
+                    sorted_by_date = False
+            if candidates is None:
+                candidates = [self.orders_by_date_key[key] for key in self.order_date_keys]
+                sorted_by_date = True
+
+            start_key = self.order_date_key(start) if start else None
+            end_key = self.order_date_key(end) if end else None
+            result = []
+            for order in candidates:
+                date = self.order_keys[id(order)][0]
+                if start_key and date < start_key:
+                    continue
+                if end_key and date >= end_key:
+                    continue
+                if statuses is not None and order.get('status') not in statuses:
+                    continue
+                if customer_id is not None and order.get('customer_id') != customer_id:
+                    continue
+                result.append(order)
+            if not sorted_by_date:
+                result.sort(key=lambda o: self.order_keys[id(o)])
+            return result
+
+    def query_orders_page(self, offset: int = 0, limit: int = 50, status: Any = None,
+                          newest_first: bool = True, search: Optional[str] = None) -> tuple:
+        """(orders offset..offset+limit by date, number of matching orders) for paged list views
+
+        status may be one status or several; search keeps orders whose id, customer
+        or phone contains it (ignoring case). Only the requested page is materialized.
+        """
+        if self.query_storage('orders'):
+            return self.storage.query_orders_page(offset, limit, status, newest_first, search)
+        self.ensure_partitions('orders')
+        with self.data_lock.read():
+            if status is None:
+                key_lists = [self.order_date_keys]
+            else:
+                statuses = [status] if isinstance(status, str) else status
+                key_lists = [self.order_status_keys.get(s, []) for s in dict.fromkeys(statuses)]
+            if search:
+                # 搜索需要遍历候选键才能得到总数，但只有匹配的键被保留
+                keyword = search.lower()
+                ordered = heapq.merge(*(reversed(keys) if newest_first else keys for keys in key_lists),
+                                      reverse=newest_first)
+                matches = [key for key in ordered if self.order_matches(self.orders_by_date_key[key], keyword)]
+                return [self.orders_by_date_key[key] for key in matches[offset:offset + limit]], len(matches)
+            total = sum(len(keys) for keys in key_lists)
+            if len(key_lists) == 1:
+                keys = key_lists[0]
+                if newest_first:
+                    page = keys[max(0, len(keys) - offset - limit):max(0, len(keys) - offset)][::-1]
+                else:
+                    page = keys[offset:offset + limit]
+            else:
+                # 多个状态的有序键列表按日期归并，只取到所需页为止
+                merged = heapq.merge(*(reversed(keys) if newest_first else keys for keys in key_lists),
+                                     reverse=newest_first)
+                page = list(itertools.islice(merged, offset, offset + limit))
+            return [self.orders_by_date_key[key] for key in page], total
+
+    @staticmethod
+    def order_matches(order: Dict, keyword: str) -> bool:
+        """Whether an order's id, customer or phone contains a lowercase search keyword"""
+        fields = (order.get('id'), order.get('customer_name', order.get('table_number')),
+                  order.get('customer_phone', order.get('phone')))
+        return any(keyword in str(value).lower() for value in fields if value is not None)
+
+    def get_orders_by_date(self, date: Optional[str] = None) -> List[Dict]:
+        """Orders placed on a day (YYYY-MM-DD), today by default"""
+        day = datetime.datetime.strptime(date, '%Y-%m-%d') if date else datetime.datetime.now()
+        next_day = day + datetime.timedelta(days=1)
+        return self.query_orders(start=day.strftime('%Y-%m-%d'), end=next_day.strftime('%Y-%m-%d'))
+
+    def count_orders_by_status(self) -> Dict[str, int]:
+        """Number of orders per status"""
+        if self.query_storage('orders'):
+            return self.storage.count_orders_by_status()
+        self.ensure_partitions('orders')
+        with self.data_lock.read():
+            return {status: len(orders) for status, orders in self.orders_by_status.items()}
+
+    def get_record(self, collection: str, record_id: Any) -> Optional[Dict]:
+        """Look up a record by id"""
+        self.ensure_loaded(collection)
+        with self.data_lock.read():
+            record = self.id_indexes.get(collection, {}).get(record_id)
+        if record is None and self.has_unloaded_partitions(collection):
+            # 可能在尚未加载的旧月份中
+            self.ensure_partitions(collection)
+            with self.data_lock.read():
+                record = self.id_indexes.get(collection, {}).get(record_id)
+        return record
+
+    def find_record_by_name(self, collection: str, name: str) -> Optional[Dict]:
+        """Look up an inventory item or meal by name, ignoring case"""
+        self.ensure_loaded(collection)
+        with self.data_lock.read():
+            return self.name_indexes.get(collection, {}).get(self.normalize_name(name))
+
     def load_orders(self) -> List[Dict]:
         """Load orders data"""
         orders_file = os.path.join(self.data_path, 'orders.json')
         if os.path.exists(orders_file):
             try:
-                with open(orders_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return self.read_collection_file('orders')
             except Exception as e:
                 print(f"Error loading orders data: {e}")
         return []
@@ -69,8 +814,7 @@ class DataManager:
         inventory_file = os.path.join(self.data_path, 'inventory.json')
         if os.path.exists(inventory_file):
             try:
-                with open(inventory_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return self.read_collection_file('inventory')
             except Exception as e:
                 print(f"Error loading inventory data: {e}")
         return []
@@ -80,8 +824,7 @@ class DataManager:
         customers_file = os.path.join(self.data_path, 'customers.json')
         if os.path.exists(customers_file):
             try:
-                with open(customers_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return self.read_collection_file('customers')
             except Exception as e:
                 print(f"Error loading customers data: {e}")
         return []
@@ -91,8 +834,7 @@ class DataManager:
         meals_file = os.path.join(self.data_path, 'meals.json')
         if os.path.exists(meals_file):
             try:
-                with open(meals_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return self.read_collection_file('meals')
             except Exception as e:
                 print(f"Error loading meals data: {e}")
         return []
@@ -102,8 +844,7 @@ class DataManager:
         employees_file = os.path.join(self.data_path, 'employees.json')
         if os.path.exists(employees_file):
             try:
-                with open(employees_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return self.read_collection_file('employees')
             except Exception as e:
                 print(f"Error loading employees data: {e}")
         return []
@@ -113,61 +854,127 @@ class DataManager:
         finance_file = os.path.join(self.data_path, 'finance.json')
         if os.path.exists(finance_file):
             try:
-                with open(finance_file, 'r', encoding='utf-8') as f:
-                    records = json.load(f)
-                    # 确保记录格式正确
-                    processed_records = []
-                    for record in records:
-                        # 兼容不同的数据格式
-                        if isinstance(record, dict):
-                            # 数据类型转换
-                            if record.get('type') == 'revenue':
-                                record['type'] = 'Income'
-                            elif record.get('type') == 'cost':
-                                record['type'] = 'Expense'
-                            
-                            # 确保金额是数字类型
-                            if 'amount' in record:
-                                try:
-                                    record['amount'] = float(record['amount'])
-                                except (ValueError, TypeError):
-                                    record['amount'] = 0.0
-                            
-                            # 确保有正确的时间字段
-                            if 'date' in record and 'create_time' not in record:
-                                record['create_time'] = record['date']
-                                
-                            processed_records.append(record)
-                    return processed_records
+                records = self.read_collection_file('finance')
+                # 确保记录格式正确
+                processed_records = []
+                for record in records:
+                    # 兼容不同的数据格式
+                    if isinstance(record, dict):
+                        processed_records.append(self.normalize_financial_record(record))
+                return processed_records
             except Exception as e:
                 print(f"Error loading financial records: {e}")
         return []
+
+    def normalize_financial_record(self, record: Dict) -> Dict:
+        """Normalize type, amount and time fields of a financial record"""
+        # 数据类型转换
+        if record.get('type') == 'revenue':
+            record['type'] = 'Income'
+        elif record.get('type') == 'cost':
+            record['type'] = 'Expense'
+        
+        # 确保金额是数字类型
+        if 'amount' in record:
+            try:
+                record['amount'] = float(record['amount'])
+            except (ValueError, TypeError):
+                record['amount'] = 0.0
+        
+        # 确保有正确的时间字段
+        if 'date' in record and 'create_time' not in record:
+            record['create_time'] = record['date']
+        return record
     
     def save_financial_records(self):
         """Save financial records"""
-        finance_file = os.path.join(self.data_path, 'finance.json')
-        try:
-            # 处理浮点数精度问题
-            records_to_save = []
-            for record in self.financial_records:
-                record_copy = record.copy()
-                if 'amount' in record_copy:
-                    record_copy['amount'] = round(float(record_copy['amount']), 2)
-                records_to_save.append(record_copy)
-            
-            with open(finance_file, 'w', encoding='utf-8') as f:
-                json.dump(records_to_save, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving financial records: {e}")
+        self.save_collection('finance')
     
     # ==================== 财务管理 ====================
-    def get_financial_records(self) -> List[Dict]:
-        """Get financial records"""
-        return self.financial_records.copy()
+    def get_financial_records(self, start: Optional[str] = None, end: Optional[str] = None) -> SnapshotView:
+        """Get financial records, optionally only those dated start <= date < end"""
+        return self.snapshot('finance', start, end)
     
-    def get_finance_records(self) -> List[Dict]:
+    def get_finance_records(self, start: Optional[str] = None, end: Optional[str] = None) -> SnapshotView:
         """获取财务记录（别名方法，兼容财务模块）"""
-        return self.get_financial_records()
+        return self.get_financial_records(start, end)
+
+    def add_finance_record(self, record_data: Dict) -> bool:
+        """添加财务记录"""
+        with self.write_lock:
+            try:
+                record = dict(record_data)
+                record['id'] = self.new_id('FIN')
+                record.setdefault('date', datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S'))
+                self.insert_record('finance', self.normalize_financial_record(record))
+                return True
+            except Exception as e:
+                print(f"❌ 添加财务记录失败: {e}")
+                return False
+
+    def update_finance_record(self, record_id: str, record_data: Dict) -> bool:
+        """更新财务记录"""
+        with self.write_lock:
+            record = self.get_record('finance', record_id)
+            if not record:
+                return False
+            try:
+                fields = self.normalize_financial_record(dict(record_data))
+                self.update_record('finance', record, fields)
+                return True
+            except Exception as e:
+                print(f"❌ 更新财务记录失败: {e}")
+                return False
+
+    def delete_finance_record(self, record_id: str) -> bool:
+        """删除财务记录"""
+        with self.write_lock:
+            record = self.get_record('finance', record_id)
+            if not record:
+                return False
+            try:
+                return self.delete_record('finance', record)
+            except Exception as e:
+                print(f"❌ 删除财务记录失败: {e}")
+                return False
+
+    # ==================== 客户管理 ====================
+    def add_customer(self, customer_data: Dict) -> bool:
+        """添加客户"""
+        with self.write_lock:
+            try:
+                customer = dict(customer_data)
+                customer['id'] = self.new_id('CUST')
+                self.insert_record('customers', customer)
+                return True
+            except Exception as e:
+                print(f"❌ 添加客户失败: {e}")
+                return False
+
+    def update_customer(self, customer_id: str, customer_data: Dict) -> bool:
+        """更新客户信息"""
+        with self.write_lock:
+            customer = self.get_record('customers', customer_id)
+            if not customer:
+                return False
+            try:
+                self.update_record('customers', customer, dict(customer_data))
+                return True
+            except Exception as e:
+                print(f"❌ 更新客户失败: {e}")
+                return False
+
+    def delete_customer(self, customer_id: str) -> bool:
+        """删除客户"""
+        with self.write_lock:
+            customer = self.get_record('customers', customer_id)
+            if not customer:
+                return False
+            try:
+                return self.delete_record('customers', customer)
+            except Exception as e:
+                print(f"❌ 删除客户失败: {e}")
+                return False
 
     # ==================== 数据获取方法 ====================
     def load_data(self, data_type: str):
@@ -185,84 +992,794 @@ class DataManager:
         elif data_type == 'finance':
             return self.get_financial_records()
         elif data_type == 'recipes':
-             # Load recipe data from recipes.json
-            recipes_file = os.path.join(self.data_path, 'recipes.json')
-            if os.path.exists(recipes_file):
-                try:
-                    with open(recipes_file, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                except Exception as e:
-                    print(f"Error loading recipes data: {e}")
-            return []
+            return self.load_recipes()
         else:
             print(f"Warning: Unsupported data type: {data_type}")
             return []
     
-    def get_orders(self) -> List[Dict]:
-        """获取订单数据"""
-        return self.orders.copy()
+    def get_orders(self, start: Optional[str] = None, end: Optional[str] = None) -> SnapshotView:
+        """获取订单数据（可按 start <= 下单时间 < end 过滤）"""
+        return self.snapshot('orders', start, end)
     
-    def get_inventory(self) -> List[Dict]:
+    def get_inventory(self) -> SnapshotView:
         """获取库存数据"""
-        return self.inventory.copy()
+        return self.snapshot('inventory')
     
-    def get_customers(self) -> List[Dict]:
+    def get_customers(self) -> SnapshotView:
         """获取客户数据"""
-        return self.customers.copy()
+        return self.snapshot('customers')
     
-    def get_meals(self) -> List[Dict]:
+    def get_meals(self) -> SnapshotView:
         """获取菜品数据"""
-        return self.meals.copy()
+        return self.snapshot('meals')
     
-    def get_employees(self) -> List[Dict]:
+    def get_employees(self) -> SnapshotView:
         """获取员工数据"""
-        return self.employees.copy()
+        return self.snapshot('employees')
+
+    # ==================== 流式读取 ====================
+    def iter_records(self, name: str, since: Optional[str] = None, until: Optional[str] = None,
+                     **where) -> Iterator[Dict]:
+        """Yield records dated since <= date < until whose fields match where, one at a time
+
+        A where value may be a list of accepted values. Data already in memory is
+        read from there (unsaved changes included), everything else is streamed
+        from storage: month by month when partitioned, record by record from a
+        single JSON file or SQLite. Treat the records as read-only.
+        """
+        # 先写出待保存的修改，磁盘上的数据与内存一致
+        self.flush()
+        if self.storage:
+            records = (self.normalize_record(name, r) for r in self.storage.iter_records(name))
+        elif name in self.partitions:
+            records = self.iter_partitions(name, since, until)
+        elif self.is_loaded(name) or name in self.journal_collections:
+            records = iter(self.publish_snapshot(name, self.ensure_loaded(name)))
+        else:
+            records = self.iter_collection_file(name)
+        for record in records:
+            if (since or until) and not self.in_date_range(name, record, since, until):
+                continue
+            if all(self.field_matches(record.get(key), value) for key, value in where.items()):
+                yield record
+
+    @staticmethod
+    def field_matches(value: Any, expected: Any) -> bool:
+        """Whether a field value equals the expected value, or one of them if it is a list"""
+        if isinstance(expected, (list, tuple, set, frozenset)):
+            return value in expected
+        return value == expected
+
+    def iter_collection_file(self, name: str) -> Iterator[Dict]:
+        """Stream a collection's JSON file record by record"""
+        file_path = os.path.join(self.data_path, self.COLLECTIONS[name][1])
+        if not os.path.exists(file_path):
+            return
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for record in iter_json_array(f):
+                if isinstance(record, dict):
+                    yield self.normalize_record(name, record)
+
+    def iter_partitions(self, name: str, since: Optional[str], until: Optional[str]) -> Iterator[Dict]:
+        """Months of a partitioned collection in order: loaded ones from memory, others streamed from disk"""
+        store = self.partitions[name]
+        records = self.ensure_loaded(name)
+        # 记录移入了未加载月份但尚未写出时（日志模式），该月以内存为准
+        pending = [m for m in self.dirty_months.get(name, ()) if m not in self.loaded_months.get(name, ())]
+        if pending:
+            self.load_months(name, pending)
+        loaded = set(self.loaded_months.get(name, ()))
+        months = set(store.months(since, until)) | {m for m in loaded if in_month_range(m, since, until)}
+        in_memory = None
+        for month in sorted(months):
+            if month in loaded:
+                if in_memory is None:
+                    in_memory = self.group_by_partition(name, self.publish_snapshot(name, records))
+                yield from in_memory.get(month, ())
+            else:
+                for record in store.iter_records(month):
+                    yield self.normalize_record(name, record)
+
+    def iter_orders(self, since: Optional[str] = None, until: Optional[str] = None,
+                    status: Any = None, customer_id: Optional[str] = None) -> Iterator[Dict]:
+        """Stream orders placed since <= order_date < until, optionally with a status (or list of them) and customer"""
+        where = {}
+        if status is not None:
+            where['status'] = status
+        if customer_id is not None:
+            where['customer_id'] = customer_id
+        return self.iter_records('orders', since, until, **where)
+
+    def iter_financial_records(self, since: Optional[str] = None, until: Optional[str] = None,
+                               record_type: Optional[str] = None) -> Iterator[Dict]:
+        """Stream financial records dated since <= date < until, optionally of one type ('Income'/'Expense')"""
+        where = {'type': record_type} if record_type else {}
+        return self.iter_records('finance', since, until, **where)
 
     # ==================== 数据保存方法 ====================
     def save_inventory(self):
         """Save inventory data"""
-        inventory_file = os.path.join(self.data_path, 'inventory.json')
-        try:
-            with open(inventory_file, 'w', encoding='utf-8') as f:
-                json.dump(self.inventory, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving inventory data: {e}")
+        self.save_collection('inventory')
     
     def save_customers(self):
         """Save customers data"""
-        customers_file = os.path.join(self.data_path, 'customers.json')
-        try:
-            with open(customers_file, 'w', encoding='utf-8') as f:
-                json.dump(self.customers, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving customers data: {e}")
+        self.save_collection('customers')
     
     def save_meals(self):
         """Save meals data"""
-        meals_file = os.path.join(self.data_path, 'meals.json')
-        try:
-            with open(meals_file, 'w', encoding='utf-8') as f:
-                json.dump(self.meals, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving meals data: {e}")
+        self.save_collection('meals')
     
     def save_employees(self):
         """Save employees data"""
-        employees_file = os.path.join(self.data_path, 'employees.json')
-        try:
-            with open(employees_file, 'w', encoding='utf-8') as f:
-                json.dump(self.employees, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving employees data: {e}")
+        self.save_collection('employees')
 
     def save_orders(self):
         """Save orders data (JSON mode)"""
+        self.save_collection('orders')
+
+    def save_data(self, data_type: str, data: List[Dict]) -> bool:
+        """Replace a collection with the given records and save it (legacy interface compatibility)"""
+        if data_type not in self.COLLECTIONS:
+            print(f"Warning: Unsupported data type: {data_type}")
+            return False
+        with self.write_lock:
+            # 整体替换集合，分区存储时先加载全部月份
+            records = self.ensure_partitions(data_type)
+            if data is not records:
+                # 快照中的只读记录先转换为可修改的副本
+                normalized = [self.normalize_record(data_type, thaw(r) if isinstance(r, FrozenRecord) else r)
+                              for r in data if isinstance(r, dict)]
+                with self.data_lock.write():
+                    records[:] = normalized
+            self.save_collection(data_type)
+        return True
+
+    def save_collection(self, name: str):
+        """Save a collection, deferred to the writer thread in write-behind mode"""
+        with self.write_lock:
+            # 调用方可能直接修改了列表，保存时重建索引和聚合
+            self.rebuild_views(name)
+            self.mark_partitions_dirty(name)
+            if name in ('inventory', 'meals'):
+                self.update_availability()
+            if self.writer:
+                self.pending_saves.add(name)
+                self.writer.notify()
+                return
+            self.write_collection(name)
+
+    def write_collection(self, name: str):
+        """Rewrite the stored copy of a collection now"""
+        with self.write_lock:
+            try:
+                if self.storage:
+                    self.storage.replace_all(name, self.get_collection(name))
+                    return
+                if self.shared:
+                    self.write_shared(name)
+                    return
+                if not (self.journal and name in self.journal_collections):
+                    self.write_snapshot(name)
+                    return
+                # 快照已包含该集合的全部日志操作，先落盘再标记
+                self.write_snapshot(name, fsync=self.journal.fsync)
+            except Exception as e:
+                print(f"Error saving {name} data: {e}")
+                return
+            self.journal_collections.discard(name)
+            self.journal_dirty.discard(name)
+            self.snapshot_unsynced.discard(name)
+            if self.journal_collections:
+                self.journal.append([{'op': 'checkpoint', 'collection': name, 'upto': self.journal.seq}])
+            else:
+                self.journal.truncate()
+                self.journal_entries = []
+
+    def write_snapshot(self, name: str, fsync: bool = False, records: Optional[List[Dict]] = None):
+        """Atomically write the current (or given) records of a collection to its JSON file"""
+        if name in self.partitions:
+            self.write_partitions(name, fsync)
+            return
+        if records is None:
+            records = self.get_collection(name)
+        records = self.records_for_file(name, records)
+        file_path = os.path.join(self.data_path, self.COLLECTIONS[name][1])
+        # 记录自己写入的文件状态，刷新时不会误判为外部修改
+        self.file_states[name] = self.write_json_atomic(file_path, records, fsync)
+        self.write_binary_snapshot(name, records, fsync)
+
+    def records_for_file(self, name: str, records: List[Dict]) -> List[Dict]:
+        """Records as they are written to disk"""
+        if name != 'finance':
+            return records
+        # 处理浮点数精度问题
+        records_to_save = []
+        for record in records:
+            record_copy = record.copy()
+            if 'amount' in record_copy:
+                record_copy['amount'] = round(float(record_copy['amount']), 2)
+            records_to_save.append(record_copy)
+        return records_to_save
+
+    def write_json_atomic(self, file_path: str, data: Any, fsync: bool = False) -> tuple:
+        """Write JSON to a temp file and rename it over the target; returns (signature, content hash)"""
+        temp_file = f"{file_path}.tmp"
+        raw = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        with open(temp_file, 'wb') as f:
+            f.write(raw)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+            signature = self.file_signature(os.fstat(f.fileno()))
+        os.replace(temp_file, file_path)
+        return signature, hashlib.blake2b(raw, digest_size=16).digest()
+
+    # ==================== 事务 ====================
+    @contextmanager
+    def transaction(self):
+        """Group record changes into one atomic commit, rolled back in memory on failure
+
+        The data lock is taken at the first in-memory change and released before
+        the commit, so loading collections ahead of the changes and the journal
+        fsync never block readers.
+        """
+        with self.write_lock:
+            if self._transaction is not None:
+                # 嵌套事务并入外层事务
+                yield self._transaction
+                return
+            tx = {'ops': [], 'undo': [], 'locked': False}
+            self._transaction = tx
+            try:
+                try:
+                    yield tx
+                finally:
+                    self._transaction = None
+                # 从第一次内存修改到这里独占读写锁，读者看到的要么是事务前、要么是事务后的状态
+                self.release_data_lock(tx)
+                if tx['ops']:
+                    # 提交（journal写入与fsync）只持有write_lock，读者无需等待磁盘I/O
+                    self.commit_ops(tx['ops'])
+                    if any(op.get('collection') in ('inventory', 'meals') for op in tx['ops']):
+                        self.update_availability()
+            except BaseException:
+                with self.data_lock.write():
+                    self.release_data_lock(tx)
+                    self.rollback_changes(tx['undo'])
+                raise
+
+    def hold_data_lock(self):
+        """Take the data write lock for the rest of the open transaction, before its first in-memory change"""
+        tx = self._transaction
+        if tx is not None and not tx['locked']:
+            self.data_lock.acquire_write()
+            tx['locked'] = True
+
+    def release_data_lock(self, tx: Dict):
+        """Release the data write lock taken by hold_data_lock"""
+        if tx['locked']:
+            tx['locked'] = False
+            self.data_lock.release_write()
+
+    def insert_record(self, collection: str, record: Dict) -> Dict:
+        """Append a record to a collection and persist the insert"""
+        with self.transaction():
+            records = self.get_collection(collection)
+            self.hold_data_lock()
+            records.append(record)
+            self.invalidate_snapshot(collection, record)
+            self.mark_partition_dirty(collection, record)
+            self.index_record(collection, record)
+            self.apply_aggregate(collection, record, 1)
+            self.record_undo(('insert', collection, record, None))
+            self.persist_ops([{'op': 'insert', 'collection': collection, 'record': record}])
+            return record
+
+    def update_record(self, collection: str, record: Dict, fields: Dict,
+                      deltas: Optional[Dict] = None) -> Dict:
+        """Set fields on a record and persist the update
+
+        deltas maps numeric fields to the change behind their new value, used to
+        merge the update onto newer data written by another terminal.
+        """
+        with self.transaction():
+            self.hold_data_lock()
+            old_values = {key: record.get(key, _MISSING) for key in fields}
+            self.apply_aggregate(collection, record, -1)
+            reindex = 'id' in fields or 'name' in fields
+            reindex_order = collection == 'orders' and any(f in fields for f in self.ORDER_INDEXED_FIELDS)
+            # 重建索引时沿用原来的同日期排序值，更新后的订单不会跳到最新
+            order_key = self.order_keys.get(id(record)) if collection == 'orders' else None
+            tie_break = order_key[1] if order_key else None
+            if reindex:
+                self.unindex_record(collection, record)
+            elif reindex_order:
+                self.unindex_order(record)
+            self.mark_partition_dirty(collection, record)
+            record.update(fields)
+            self.invalidate_snapshot(collection, record)
+            self.mark_partition_dirty(collection, record)
+            if reindex:
+                self.index_record(collection, record, tie_break)
+            elif reindex_order:
+                self.index_order(record, tie_break)
+            if collection == 'meals':
+                self.invalidate_recipes(collection)
+            self.apply_aggregate(collection, record, 1)
+            self.record_undo(('update', collection, record, old_values))
+            op = {'op': 'update', 'collection': collection, 'id': record.get('id'), 'fields': dict(fields)}
+            if deltas:
+                op['deltas'] = dict(deltas)
+            self.persist_ops([op])
+            return record
+
+    def delete_record(self, collection: str, record: Dict) -> bool:
+        """Remove a record from a collection and persist the delete"""
+        with self.transaction():
+            records = self.get_collection(collection)
+            self.hold_data_lock()
+            for index, existing in enumerate(records):
+                if existing is record:
+                    del records[index]
+                    self.invalidate_snapshot(collection, record)
+                    self.mark_partition_dirty(collection, record)
+                    self.unindex_record(collection, record)
+                    self.apply_aggregate(collection, record, -1)
+                    self.record_undo(('delete', collection, record, index))
+                    self.persist_ops([{'op': 'delete', 'collection': collection, 'id': record.get('id')}])
+                    return True
+            return False
+
+    def record_undo(self, change: tuple):
+        """Remember how to revert an in-memory change of the open transaction"""
+        if self._transaction is not None:
+            self._transaction['undo'].append(change)
+
+    def rollback_changes(self, undo_log: List[tuple]):
+        """Revert in-memory changes in reverse order"""
+        for kind, collection, record, extra in reversed(undo_log):
+            records = self.get_collection(collection)
+            if kind == 'insert':
+                for index in range(len(records) - 1, -1, -1):
+                    if records[index] is record:
+                        del records[index]
+                        break
+            elif kind == 'update':
+                for key, value in extra.items():
+                    if value is _MISSING:
+                        record.pop(key, None)
+                    else:
+                        record[key] = value
+            elif kind == 'delete':
+                records.insert(extra, record)
+        for collection in dict.fromkeys(change[1] for change in undo_log):
+            self.rebuild_views(collection)
+        if undo_log:
+            print(f"⚠️ Transaction rolled back ({len(undo_log)} changes reverted)")
+
+    # ==================== 日志存储 ====================
+    def persist_ops(self, ops: List[Dict]):
+        """Queue ops on the open transaction, or commit them right away"""
+        with self.write_lock:
+            if self._transaction is not None:
+                self._transaction['ops'].extend(ops)
+                return
+            self.commit_ops(ops)
+
+    def commit_ops(self, ops: List[Dict]):
+        """Durably commit ops: one SQLite transaction, or one journal entry with one fsync"""
+        with self.write_lock:
+            if self.storage:
+                self.storage.apply_ops(ops)
+                return
+            if self.shared:
+                self.commit_shared(ops)
+                return
+            # 写入journal即为提交点，之后的快照重写失败可由journal恢复
+            self.journal.append(ops)
+            touched = list(dict.fromkeys(op['collection'] for op in ops))
+            self.journal_collections.update(touched)
+            if self.journal_mode:
+                self.journal_dirty.update(touched)
+                return
+            if self.writer:
+                self.pending_snapshots.update(touched)
+                self.writer.notify()
+                return
+            for name in touched:
+                self.refresh_snapshot(name)
+
+    # ==================== 多终端共享 ====================
+    def collection_lock(self, name: str) -> FileLock:
+        """Cross-process lock of a collection, its lock file also holds the collection version"""
+        lock = self.collection_locks.get(name)
+        if lock is None:
+            lock_file = os.path.join(self.data_path, self.COLLECTIONS[name][1] + '.lock')
+            lock = FileLock(lock_file, fsync=self.storage_config.get('journal_fsync', True))
+            self.collection_locks[name] = lock
+        return lock
+
+    def shared_commit_lock(self) -> FileLock:
+        """Cross-process lock serializing shared commits and the completion of an interrupted one"""
+        if self.commit_lock is None:
+            self.commit_lock = FileLock(os.path.join(self.data_path, 'shared_commit.lock'),
+                                        fsync=self.storage_config.get('journal_fsync', True))
+        return self.commit_lock
+
+    def commit_shared(self, ops: List[Dict]):
+        """Compare-and-swap commit of all touched collections as one unit, merging onto newer data first
+
+        The op set and the versions it applies to are written to shared_commit.json
+        before any collection file. A commit interrupted part-way is finished from
+        that file by the next terminal that opens, reads or commits, so other
+        terminals never keep only part of a transaction.
+        """
+        touched = sorted(dict.fromkeys(op['collection'] for op in ops))
+        fsync = self.storage_config.get('journal_fsync', True)
+        merged, versions, records = {}, {}, {}
+        with self.shared_commit_lock().exclusive(), ExitStack() as stack:
+            self.replay_shared_commit()
+            # 按固定顺序加锁，避免多终端之间死锁
+            locks = {name: stack.enter_context(self.collection_lock(name).exclusive()) for name in touched}
+            for name in touched:
+                versions[name] = locks[name].read_version()
+                records[name] = self.get_collection(name)
+                if versions[name] != self.versions.get(name):
+                    records[name] = merged[name] = self.rebase_collection(name, ops)
+            # 提交点：整组操作落盘之后，各集合的写入失败可由它补全
+            self.write_json_atomic(self.shared_commit_file, {'versions': versions, 'ops': ops}, fsync)
+            try:
+                for name in touched:
+                    self.write_snapshot(name, fsync=fsync, records=records[name])
+                    locks[name].write_version(versions[name] + 1)
+                    self.versions[name] = versions[name] + 1
+                os.remove(self.shared_commit_file)
+            except Exception as e:
+                # 提交已记录，内存保持提交后的状态；未写出的集合补全后在下次刷新时重新读取
+                for name in touched:
+                    if self.versions.get(name) != versions[name] + 1:
+                        self.versions[name] = None
+                print(f"⚠️ Shared commit interrupted, it will be completed from shared_commit.json: {e}")
+        for name, collection in merged.items():
+            with self.data_lock.write():
+                self.get_collection(name)[:] = collection
+                self.rebuild_views(name)
+            print(f"ℹ️ {name} was changed by another terminal, merged this commit onto it")
+
+    def recover_shared_commit(self):
+        """Finish a shared commit left incomplete by this or another terminal, if there is one"""
+        if not os.path.exists(self.shared_commit_file):
+            return
+        with self.shared_commit_lock().exclusive():
+            self.replay_shared_commit()
+
+    def replay_shared_commit(self):
+        """Write the collections an interrupted shared commit did not reach (hold the commit lock)"""
+        if not os.path.exists(self.shared_commit_file):
+            return
         try:
-            orders_file = os.path.join(self.data_path, 'orders.json')
-            with open(orders_file, 'w', encoding='utf-8') as f:
-                json.dump(self.orders, f, ensure_ascii=False, indent=2)
+            with open(self.shared_commit_file, 'r', encoding='utf-8') as f:
+                commit = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot read interrupted shared commit, discarding it: {e}")
+            os.remove(self.shared_commit_file)
+            return
+        ops, versions = commit.get('ops', []), commit.get('versions', {})
+        fsync = self.storage_config.get('journal_fsync', True)
+        completed = []
+        with ExitStack() as stack:
+            for name in sorted(versions):
+                if name not in self.COLLECTIONS:
+                    continue
+                lock = stack.enter_context(self.collection_lock(name).exclusive())
+                if lock.read_version() != versions[name]:
+                    # 该集合在中断前已写出
+                    continue
+                self.write_snapshot(name, fsync=fsync, records=self.rebase_collection(name, ops))
+                lock.write_version(versions[name] + 1)
+                completed.append(name)
+        os.remove(self.shared_commit_file)
+        if completed:
+            print(f"✅ Completed interrupted shared commit: {', '.join(completed)}")
+
+    def rebase_collection(self, name: str, ops: List[Dict]) -> List[Dict]:
+        """Re-read a collection written by another terminal and re-apply ops on top (hold its lock)"""
+        records = self.read_binary_snapshot(name)
+        if records is None:
+            file_path = os.path.join(self.data_path, self.COLLECTIONS[name][1])
+            records = self.read_collection_file(name) if os.path.exists(file_path) else []
+            records = [self.normalize_record(name, r) for r in records if isinstance(r, dict)]
+        replay_entries([{'seq': 1, 'ops': ops}], {name: records}, self.normalize_record, rebase=True)
+        return records
+
+    def write_shared(self, name: str):
+        """Write a whole collection in shared mode, bumping its version"""
+        records = self.get_collection(name)
+        with self.shared_commit_lock().exclusive(), self.collection_lock(name).exclusive() as lock:
+            self.replay_shared_commit()
+            version = lock.read_version()
+            if version != self.versions.get(name):
+                print(f"⚠️ {name} was changed by another terminal, overwriting with a full save")
+            self.write_snapshot(name, fsync=self.storage_config.get('journal_fsync', True))
+            lock.write_version(version + 1)
+            self.versions[name] = version + 1
+
+    def fold_journal_into_shared(self):
+        """Write out journal operations left by a single-terminal run, then stop using the journal"""
+        if not self.journal:
+            return
+        for name in sorted(self.journal_dirty):
+            self.write_shared(name)
+        self.journal.truncate()
+        self.journal.close()
+        self.journal = None
+        self.journal_entries = []
+        self.journal_collections.clear()
+        self.journal_dirty.clear()
+        self.snapshot_unsynced.clear()
+
+    # ==================== 按月分区 ====================
+    def open_partitions(self):
+        """Store orders and finance by month, splitting their JSON files on first use, and archive old months"""
+        archive_after = int(self.storage_config.get('archive_after_months', 6))
+        for name in self.PARTITION_FIELDS:
+            file_path = os.path.join(self.data_path, self.COLLECTIONS[name][1])
+            store = PartitionStore(os.path.splitext(file_path)[0])
+            try:
+                if not store.exists():
+                    self.split_into_partitions(name, store, file_path)
+                if archive_after > 0:
+                    archived = store.archive(shift_month(current_month(), -archive_after))
+                    if archived:
+                        print(f"✅ Archived {len(archived)} {name} partitions ({archived[0]} to {archived[-1]})")
+            except Exception as e:
+                print(f"❌ Cannot use monthly partitions for {name}, keeping {os.path.basename(file_path)}: {e}")
+                continue
+            self.partitions[name] = store
+
+    def split_into_partitions(self, name: str, store: PartitionStore, file_path: str):
+        """One-off migration of a collection's JSON file into monthly partitions"""
+        records = []
+        if os.path.exists(file_path):
+            records = [self.normalize_record(name, r) for r in self.read_collection_file(name) if isinstance(r, dict)]
+        groups = self.group_by_partition(name, records)
+        for month, rows in groups.items():
+            store.write(month, self.records_for_file(name, rows), fsync=True)
+        os.makedirs(store.directory, exist_ok=True)
+        if os.path.exists(file_path):
+            # 原文件保留为备份，旁边的二进制快照已无用
+            os.replace(file_path, file_path + '.bak')
+            if os.path.exists(binary_snapshot.snapshot_path(file_path)):
+                os.remove(binary_snapshot.snapshot_path(file_path))
+        self.file_states.pop(name, None)
+        print(f"✅ Split {len(records)} {name} records into {len(groups)} monthly partitions")
+
+    def record_month(self, name: str, record: Dict) -> str:
+        """Partition (YYYY-MM or 'undated') a record of a partitioned collection belongs to"""
+        return partition_of(record, self.PARTITION_FIELDS[name])
+
+    def group_by_partition(self, name: str, records: List[Dict]) -> Dict[str, List[Dict]]:
+        """Records grouped by month, keeping their order"""
+        groups = {}
+        for record in records:
+            if isinstance(record, dict):
+                groups.setdefault(self.record_month(name, record), []).append(record)
+        return groups
+
+    def hot_months(self) -> set:
+        """Months loaded at startup: the current one and hot_months - 1 before it"""
+        count = max(1, int(self.storage_config.get('hot_months', 1)))
+        month = current_month()
+        return {shift_month(month, -offset) for offset in range(count)} | {UNDATED}
+
+    def read_partitions(self, name: str) -> List[Dict]:
+        """Read the loaded months of a partitioned collection, the hot ones on first load"""
+        store = self.partitions[name]
+        if self.journal_entries and name in self.journal_collections:
+            # journal中的操作可能涉及任意月份，全部加载后再回放
+            months = set(store.months()) | self.hot_months()
+        else:
+            months = self.loaded_months.get(name) or self.hot_months()
+        records, states = self.read_months(name, months)
+        self.loaded_months[name] = set(months)
+        self.partition_states[name] = states
+        return records
+
+    def read_months(self, name: str, months) -> tuple:
+        """(records, {month: file signature}) of some months (holds no data lock)"""
+        store = self.partitions[name]
+        records, states = [], {}
+        for month in sorted(months):
+            rows, states[month] = store.read(month)
+            records.extend(self.normalize_record(name, r) for r in rows)
+        return records, states
+
+    def is_partitioned(self, name: str) -> bool:
+        """Whether a collection is stored as monthly partitions"""
+        return name in self.partitions
+
+    def has_unloaded_partitions(self, name: str) -> bool:
+        """Whether some stored months of a collection are not in memory"""
+        store = self.partitions.get(name)
+        if store is None:
+            return False
+        loaded = self.loaded_months.get(name, ())
+        return any(month not in loaded for month in store.months())
+
+    def ensure_partitions(self, name: str, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        """Load a collection and the stored months a date range touches (all of them without a range)"""
+        records = self.ensure_loaded(name)
+        store = self.partitions.get(name)
+        if store is None:
+            return records
+        loaded = self.loaded_months.get(name, ())
+        missing = [month for month in store.months(start, end) if month not in loaded]
+        if missing:
+            self.load_months(name, missing)
+        return records
+
+    def load_months(self, name: str, months: List[str]):
+        """Add older months to a loaded partitioned collection and its indexes"""
+        with self.write_lock:
+            loaded = self.loaded_months.setdefault(name, set())
+            months = [month for month in months if month not in loaded]
+            if not months:
+                return
+            new_records, states = self.read_months(name, months)
+            with self.data_lock.write():
+                records = self.loaded_collections[name]
+                # 保持按月份排列，同月内保持原有顺序
+                records[:] = sorted(records + new_records, key=lambda r: self.record_month(name, r))
+                for record in new_records:
+                    self.index_record(name, record)
+                table = self.columns.get(name)
+                if table is not None:
+                    for record in new_records:
+                        table.append(record)
+                self.stale_snapshots.add(name)
+                loaded.update(months)
+                self.partition_states.setdefault(name, {}).update(states)
+            print(f"ℹ️ Loaded {len(new_records)} {name} records from {len(months)} older partitions")
+
+    def mark_partition_dirty(self, name: str, record: Dict):
+        """Remember that the month of a changed record must be rewritten (hold the write lock)"""
+        if name in self.partitions and isinstance(record, dict):
+            self.dirty_months.setdefault(name, set()).add(self.record_month(name, record))
+
+    def mark_partitions_dirty(self, name: str):
+        """Rewrite every loaded month on the next save, for changes made to the list directly"""
+        if name not in self.partitions:
+            return
+        dirty = self.dirty_months.setdefault(name, set())
+        dirty.update(self.loaded_months.get(name, ()))
+        dirty.update(self.group_by_partition(name, self.get_collection(name)))
+
+    def journal_months(self, name: str, records: List[Dict]) -> set:
+        """Months the journal operations on a collection touch, before they are replayed"""
+        months_by_id = {r.get('id'): self.record_month(name, r) for r in records if isinstance(r, dict)}
+        months = set()
+        for entry in self.journal_entries:
+            for op in entry.get('ops', []):
+                if op.get('collection') != name:
+                    continue
+                if op.get('op') == 'insert' and isinstance(op.get('record'), dict):
+                    months.add(self.record_month(name, op['record']))
+                elif op.get('op') in ('update', 'delete') and op.get('id') in months_by_id:
+                    months.add(months_by_id[op['id']])
+        return months
+
+    def write_partitions(self, name: str, fsync: bool = False):
+        """Rewrite the months of a partitioned collection changed since they were last written"""
+        store = self.partitions[name]
+        dirty = self.dirty_months.get(name)
+        if not dirty:
+            return
+        # 记录移入了未加载的月份时，先合并该月磁盘上的记录再写，避免覆盖
+        loaded = self.loaded_months.get(name, ())
+        unloaded = [month for month in dirty if month not in loaded and month in store.files()]
+        if unloaded:
+            self.load_months(name, unloaded)
+        with self.data_lock.read():
+            groups = self.group_by_partition(name, self.get_collection(name))
+            months = {month: self.records_for_file(name, groups.get(month, [])) for month in dirty}
+        states = self.partition_states.setdefault(name, {})
+        for month in sorted(months):
+            if months[month]:
+                states[month] = store.write(month, months[month], fsync)
+            else:
+                store.remove(month)
+                states.pop(month, None)
+            dirty.discard(month)
+        if name == 'finance':
+            # 汇总指纹包含分区文件的修改时间
+            self.rollups_dirty = True
+
+    def refresh_snapshot(self, name: str):
+        """Rewrite a snapshot whose changes are already in the journal"""
+        try:
+            self.write_snapshot(name)
+            self.snapshot_unsynced.add(name)
         except Exception as e:
-            print(f"Error saving orders data: {e}")
+            print(f"⚠️ Snapshot of {name} deferred to compaction: {e}")
+            self.journal_dirty.add(name)
+
+    def flush(self):
+        """Write all pending saves and snapshots now"""
+        with self.write_lock:
+            saves, snapshots = self.pending_saves, self.pending_snapshots
+            self.pending_saves, self.pending_snapshots = set(), set()
+            for name in saves:
+                self.write_collection(name)
+            for name in snapshots - saves:
+                self.refresh_snapshot(name)
+            # 汇总在数据文件之后保存，分区模式下其指纹取自刚写入的文件
+            if self.rollups_dirty:
+                self.save_rollups()
+
+    def sync(self):
+        """Flush pending writes and make every snapshot durable on disk"""
+        with self.write_lock:
+            self.flush()
+            self.compact_journal()
+
+    def compact_journal(self):
+        """Fold the journal into the JSON snapshots and truncate it"""
+        if not self.journal:
+            return
+        with self.write_lock:
+            self.flush()
+            if not self.journal_collections and self.journal.size() == 0:
+                return
+            fsync = self.journal.fsync
+            for name in list(self.journal_dirty):
+                self.write_snapshot(name, fsync=fsync)
+            if fsync:
+                for name in self.snapshot_unsynced - self.journal_dirty:
+                    self.fsync_snapshot(name)
+            self.journal.truncate()
+            self.journal_entries = []
+            self.journal_collections.clear()
+            self.journal_dirty.clear()
+            self.snapshot_unsynced.clear()
+            if self.rollups_dirty:
+                self.save_rollups()
+            print("✅ Journal compacted into JSON snapshots")
+
+    def fsync_snapshot(self, name: str):
+        """Flush an already written JSON snapshot to disk"""
+        if name in self.partitions:
+            store = self.partitions[name]
+            paths = [store.files()[m] for m in self.loaded_months.get(name, ()) if m in store.files()]
+        else:
+            paths = [os.path.join(self.data_path, self.COLLECTIONS[name][1])]
+        for file_path in paths:
+            with open(file_path, 'rb') as f:
+                os.fsync(f.fileno())
+
+    def close(self):
+        """Stop background work, drain pending writes and fold the journal into the snapshots"""
+        self.event_bus.detach()
+        if self.writer:
+            self.writer.stop()
+            self.writer = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️ Final flush failed: {e}")
+        if self.compactor:
+            self.compactor.stop()
+            self.compactor = None
+        if self.journal:
+            try:
+                self.compact_journal()
+            except Exception as e:
+                print(f"⚠️ Final journal compaction failed: {e}")
+            self.journal.close()
+        if self.storage:
+            self.storage.close()
+            self.storage = None
+        for lock in self.collection_locks.values():
+            lock.close()
 
     # ==================== 订单管理 ====================
     def add_order(self, order_data: Dict) -> str:
@@ -271,264 +1788,569 @@ class DataManager:
 
     def create_order(self, order_data: Dict) -> Any:
         """创建新订单"""
-        with self.data_lock:
+        with self.write_lock:
             try:
-                # 生成订单ID
-                order_id = f"ORD{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-                
-                # 获取菜品信息
-                meal = None
-                for m in self.meals:
-                    if m['id'] == order_data.get('meal_id'):
-                        meal = m
-                        break
-                
-                if not meal:
-                    print(f"⚠️ 菜品不存在: {order_data.get('meal_id')}")
-                    return None
-                
-                # 计算总金额
-                quantity = order_data.get('quantity', 1)
-                total_amount = meal['price'] * quantity
-                
-                # 创建订单记录
-                new_order = {
-                    'id': order_id,
-                    'meal_id': order_data.get('meal_id'),
-                    'meal_name': meal['name'],
-                    'customer_id': order_data.get('customer_id', 'GUEST'),
-                    'quantity': quantity,
-                    'price': meal['price'],
-                    'total_amount': total_amount,
-                    'status': order_data.get('status', 'Received'),
-                    'note': order_data.get('note', ''),
-                    'order_date': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
-                    'delivery_date': order_data.get('delivery_date', ''),
-                    'created_at': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
-                    'updated_at': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
-                }                
-                self.orders.append(new_order)
-                self.save_orders()
-                
-                # 添加财务记录
-                financial_record = {
-                    'id': f"FIN{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}",
-                    'type': 'revenue',
-                    'amount': round(total_amount, 2),
-                    'description': f"Order Income - {meal['name']} x{quantity}",
-                    'order_id': order_id,
-                    'date': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
-                    'create_time': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
-                }
-                self.financial_records.append(financial_record)
-                self.save_financial_records()
-                
-                # 扣减库存（基于菜品的食材需求）
-                self.reduce_inventory_for_meal(meal, quantity)
-                
-                # 更新仪表盘统计
-                self.update_dashboard_stats()
-                
-                # 通知各模块有新订单创建
-                self.notify_modules_order_created(order_id)
-                
-                print(f"✅ 订单创建成功: {order_id}")
-                return order_id
-                
+                self.prepare_order_records()
+                # 订单、收入、库存扣减和成本记录作为一个事务提交
+                with self.transaction():
+                    order_id = self.create_order_records(order_data)
+            except LookupError as e:
+                print(f"⚠️ {e}")
+                return None
             except Exception as e:
                 print(f"❌ 创建订单失败: {e}")
                 return None
-
-    # ==================== 模块通知和刷新 ====================
-    def update_dashboard_stats(self):
-        """更新仪表盘统计数据"""
-        try:
-            # 计算今日销售额
-            today = datetime.datetime.now().strftime('%Y-%m-%d')
-            today_sales = 0
-            order_count = 0
             
-            for record in self.financial_records:
-                record_date = record.get('date', '')
-                if record_date.startswith(today) and record.get('type') in ['revenue', 'Income']:
-                    today_sales += record.get('amount', 0)
-                    
-            for order in self.orders:
-                order_date = order.get('order_date', '')
-                if order_date.startswith(today):
-                    order_count += 1
+            # 更新仪表盘统计
+            self.update_dashboard_stats()
             
-            # 计算低库存项目
-            low_stock_count = 0
-            for item in self.inventory:
-                current_stock = item.get('current_stock', 0)
-                min_stock = item.get('min_stock', 10)  # 默认最小库存为10
-                if current_stock < min_stock:
-                    low_stock_count += 1
+            # 通知各模块有新订单创建
+            self.notify_modules_order_created(order_id)
             
-            # 客户数量
-            customer_count = len(self.customers)
+            print(f"✅ 订单创建成功: {order_id}")
+            return order_id
+
+    def create_orders_batch(self, orders_data: List[Dict]) -> List[str]:
+        """一次结账创建多个订单：同一事务提交，只更新统计和通知一次"""
+        if not orders_data:
+            return []
+        with self.write_lock:
+            try:
+                self.prepare_order_records()
+                with self.transaction():
+                    order_ids = [self.create_order_records(order_data, deduct_inventory=False)
+                                 for order_data in orders_data]
+                    # 整单的食材一次性扣减
+                    basket = [(self.get_record('meals', order_data.get('meal_id')), order_data.get('quantity', 1))
+                              for order_data in orders_data]
+                    if not self.reduce_inventory_for_basket(basket):
+                        raise RuntimeError("库存扣减失败")
+            except Exception as e:
+                print(f"❌ 批量创建订单失败，已全部回滚: {e}")
+                return []
             
-            # 保存统计数据
-            self.dashboard_stats = {
-                'today_sales': today_sales,
-                'order_count': order_count,
-                'low_stock_count': low_stock_count,
-                'customer_count': customer_count,
-                'last_update': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+            self.update_dashboard_stats()
+            self.notify_modules_order_created(", ".join(order_ids))
             
-            print(f"✅ Dashboard statistics updated")
-        except Exception as e:
-            print(f"❌ 更新仪表盘统计失败: {e}")
-            # 提供默认统计数据
+            print(f"✅ 批量创建订单成功: {len(order_ids)} 个订单")
+            return order_ids
+
+    def prepare_order_records(self):
+        """Load what creating orders touches, so the transaction does no file reads under the data lock"""
+        for name in ('meals', 'inventory', 'orders', 'finance'):
+            self.ensure_loaded(name)
+        self.get_recipe_book()
+
+    def create_order_records(self, order_data: Dict, deduct_inventory: bool = True) -> str:
+        """Insert one order with its income, stock deduction and cost records (call inside a transaction)
+
+        deduct_inventory=False leaves the deduction to the caller, which batches a whole basket.
+        """
+        # 获取菜品信息
+        meal = self.get_record('meals', order_data.get('meal_id'))
+        if not meal:
+            raise LookupError(f"菜品不存在: {order_data.get('meal_id')}")
+        
+        # 生成订单ID
+        order_id = self.new_id('ORD')
+        
+        # 计算总金额
+        quantity = order_data.get('quantity', 1)
+        total_amount = meal['price'] * quantity
+        
+        # 创建订单记录
+        new_order = {
+            'id': order_id,
+            'meal_id': order_data.get('meal_id'),
+            'meal_name': meal['name'],
+            'customer_id': order_data.get('customer_id', 'GUEST'),
+            'quantity': quantity,
+            'price': meal['price'],
+            'total_amount': total_amount,
+            'status': order_data.get('status', 'Received'),
+            'note': order_data.get('note', ''),
+            'order_date': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+            'delivery_date': order_data.get('delivery_date', ''),
+            'created_at': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+            'updated_at': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        self.insert_record('orders', new_order)
+        
+        # 添加财务记录
+        financial_record = {
+            'id': self.new_id('FIN'),
+            'type': 'revenue',
+            'amount': round(total_amount, 2),
+            'description': f"Order Income - {meal['name']} x{quantity}",
+            'order_id': order_id,
+            'date': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+            'create_time': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        self.insert_record('finance', financial_record)
+        
+        # 扣减库存（基于菜品的食材需求）
+        if deduct_inventory and not self.reduce_inventory_for_meal(meal, quantity):
+            raise RuntimeError(f"库存扣减失败: {meal['name']}")
+        return order_id
+
+    def update_order_status(self, order_id: str, new_status: str) -> bool:
+        """更新订单状态"""
+        with self.write_lock:
+            order = self.get_record('orders', order_id)
+            if not order:
+                return False
+            self.update_record('orders', order, {
+                'status': new_status,
+                'updated_at': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+            })
+        self.event_bus.publish('order_updated', {'order_id': order_id, 'status': new_status})
+        return True
+
+    # ==================== 模块通知和刷新 ====================
+    def get_daily_revenue(self, date: Optional[str] = None) -> float:
+        """Total order amount of a day (YYYY-MM-DD), today by default"""
+        return sum(o.get('total_amount', 0) for o in self.get_orders_by_date(date))
+
+    def get_dashboard_stats(self) -> Dict:
+        """获取仪表盘统计数据"""
+        self.update_dashboard_stats()
+        return self.dashboard_stats.copy()
+
+    def update_dashboard_stats(self):
+        """更新仪表盘统计数据（读取增量维护的聚合值）"""
+        for name in self.AGGREGATE_FIELDS:
+            self.ensure_loaded(name)
+        if datetime.datetime.now().strftime('%Y-%m-%d') != self.aggregate_day:
+            with self.write_lock:
+                self.roll_over_aggregates()
+        with self.data_lock.read():
             self.dashboard_stats = {
-                'today_sales': 0,
-                'order_count': 0,
-                'low_stock_count': 0,
-                'customer_count': 0,
+                'today_sales': round(self.aggregates['today_sales'], 2),
+                'order_count': self.aggregates['order_count'],
+                'low_stock_count': self.aggregates['low_stock_count'],
+                'customer_count': self.aggregates['customer_count'],
                 'last_update': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
 
-    def refresh_data(self):
-        """刷新所有数据"""
+    # ==================== 仪表盘聚合 ====================
+    def aggregate_value(self, collection: str, record: Dict) -> float:
+        """Contribution of one record to its dashboard aggregate"""
+        if collection == 'finance':
+            if record.get('type') in ('revenue', 'Income') and \
+                    str(record.get('date', '')).startswith(self.aggregate_day):
+                try:
+                    return float(record.get('amount', 0) or 0)
+                except (ValueError, TypeError):
+                    return 0
+            return 0
+        if collection == 'orders':
+            date = self.order_date_key(record.get('order_date') or record.get('create_time'))
+            return 1 if date.startswith(self.aggregate_day) else 0
+        if collection == 'inventory':
+            # 默认最小库存为10
+            try:
+                return 1 if float(record.get('current_stock', 0)) < float(record.get('min_stock', 10)) else 0
+            except (ValueError, TypeError):
+                return 0
+        if collection == 'customers':
+            return 1
+        return 0
+
+    def apply_aggregate(self, collection: str, record: Dict, sign: int):
+        """Add (sign=1) or remove (sign=-1) a record's contribution to the aggregates"""
+        field = self.AGGREGATE_FIELDS.get(collection)
+        if not field or not isinstance(record, dict):
+            return
+        self.roll_over_aggregates()
+        self.aggregates[field] += sign * self.aggregate_value(collection, record)
+        if collection == 'finance':
+            self.apply_rollup(record, sign)
+        table = self.columns.get(collection)
+        if table is not None:
+            if sign > 0:
+                table.append(record)
+            else:
+                table.remove(record)
+
+    def rebuild_aggregates(self, collection: Optional[str] = None):
+        """Recompute aggregates of one or all loaded collections from scratch"""
+        with self.data_lock.write():
+            names = [collection] if collection else [n for n in self.AGGREGATE_FIELDS if self.is_loaded(n)]
+            for name in names:
+                field = self.AGGREGATE_FIELDS.get(name)
+                if not field:
+                    continue
+                if name == 'orders':
+                    # 今日订单数直接由日期索引得到
+                    self.aggregates[field] = len(self.get_orders_by_date(self.aggregate_day))
+                    continue
+                if name == 'finance':
+                    # 今日销售额即当日收入汇总
+                    self.aggregates[field] = self.rollups['day'].get(self.aggregate_day, {}).get('revenue', 0)
+                    continue
+                self.aggregates[field] = sum(self.aggregate_value(name, r)
+                                             for r in self.get_collection(name) if isinstance(r, dict))
+
+    def roll_over_aggregates(self):
+        """Start a new day's aggregates after midnight"""
+        today = datetime.datetime.now().strftime('%Y-%m-%d')
+        if today == self.aggregate_day:
+            return
+        with self.data_lock.write():
+            self.aggregate_day = today
+            for name in ('finance', 'orders'):
+                if self.is_loaded(name):
+                    self.rebuild_aggregates(name)
+        print(f"ℹ️ Dashboard aggregates rolled over to {today}")
+
+    # ==================== 列式分析 ====================
+    def rebuild_columns(self, collection: Optional[str] = None):
+        """Rebuild the column buffers of one or all loaded collections"""
+        with self.data_lock.write():
+            for name, table in self.columns.items():
+                if collection in (None, name) and self.is_loaded(name):
+                    table.rebuild(self.get_collection(name))
+
+    def column_query(self, collection: str, query: str, *args, **kwargs) -> Any:
+        """Run a columnar query under the read lock, None if the collection has no columns
+
+        e.g. column_query('orders', 'group_by_day', 'amount', start='2025-01-01'),
+        column_query('orders', 'group_by', 'meal', 'quantity'),
+        column_query('orders', 'percentile', 'amount', [50, 90]).
+        Amounts are integer cents. Pass start/end as keywords so that only the
+        partitions they touch are loaded.
+        """
+        table = self.columns.get(collection)
+        if table is None:
+            return None
+        # 只加载查询日期范围涉及的月份
+        self.ensure_partitions(collection, kwargs.get('start'), kwargs.get('end'))
+        with self.data_lock.read():
+            return getattr(table, query)(*args, **kwargs)
+
+    # ==================== 收支汇总 ====================
+    def rollup_entry(self, record: Dict) -> Optional[tuple]:
+        """(kind, amount, date) of a financial record for the rollups, None if not counted"""
+        record_type = record.get('type')
+        if record_type in ('revenue', 'Income'):
+            kind = 'revenue'
+        elif record_type in ('cost', 'Expense'):
+            kind = 'cost'
+        else:
+            return None
+        date = str(record.get('date') or '').replace(' ', 'T')
+        if len(date) < 10:
+            return None
+        try:
+            amount = float(record.get('amount', 0) or 0)
+        except (ValueError, TypeError):
+            return None
+        # 成本记录金额为负数，支出记录为正数，统一按绝对值累计
+        return kind, abs(amount) if kind == 'cost' else amount, date
+
+    def apply_rollup(self, record: Dict, sign: int):
+        """Add (sign=1) or remove (sign=-1) a financial record from the time buckets"""
+        entry = self.rollup_entry(record)
+        if not entry:
+            return
+        kind, amount, date = entry
+        for granularity, length in self.ROLLUP_GRANULARITIES.items():
+            if len(date) < length:
+                continue
+            bucket = self.rollups[granularity].setdefault(date[:length], {'revenue': 0.0, 'cost': 0.0})
+            bucket[kind] += sign * amount
+        self.rollups_dirty = True
+
+    def rebuild_rollups(self, months: Optional[set] = None):
+        """Recompute the revenue/cost buckets from the financial records, only those of the given months if set"""
+        with self.data_lock.write():
+            if months is None:
+                self.rollups = {granularity: {} for granularity in self.ROLLUP_GRANULARITIES}
+                self.rollup_unloaded_partitions()
+            else:
+                # 桶不会跨月，未加载月份的汇总保持不变
+                for buckets in self.rollups.values():
+                    for key in [key for key in buckets if key[:7] in months]:
+                        del buckets[key]
+            for record in self.financial_records:
+                if isinstance(record, dict) and (months is None or str(record.get('date') or '')[:7] in months):
+                    self.apply_rollup(record, 1)
+            self.rollups_dirty = True
+
+    def rollup_unloaded_partitions(self):
+        """Add the finance months not in memory to the rollups, streaming each partition file without loading it"""
+        store = self.partitions.get('finance')
+        if store is None:
+            return
+        loaded = self.loaded_months.get('finance', ())
+        # 移入未加载月份的记录已在内存中汇总，文件中的同一记录跳过
+        in_memory = {r.get('id') for r in self.financial_records
+                     if isinstance(r, dict) and self.record_month('finance', r) not in loaded}
+        for month in store.months():
+            if month in loaded:
+                continue
+            for record in store.iter_records(month):
+                if record.get('id') not in in_memory:
+                    self.apply_rollup(self.normalize_record('finance', record), 1)
+
+    def rollup_fingerprint(self) -> Dict:
+        """Cheap summary of the ledger used to validate saved rollups"""
+        if 'finance' in self.partitions:
+            # 分区模式下未加载的月份不在内存中，改用各分区文件的修改时间
+            return {'partitions': self.partitions['finance'].fingerprint()}
+        records = self.financial_records
+        total = 0.0
+        for record in records:
+            entry = self.rollup_entry(record) if isinstance(record, dict) else None
+            if entry:
+                total += entry[1] if entry[0] == 'revenue' else -entry[1]
+        return {
+            'count': len(records),
+            'last_id': records[-1].get('id') if records and isinstance(records[-1], dict) else None,
+            'net': round(total, 2)
+        }
+
+    def load_rollups(self) -> bool:
+        """Load saved rollups if they still match the financial records"""
+        rollups_file = os.path.join(self.data_path, 'rollups.json')
+        if not os.path.exists(rollups_file):
+            return False
+        if 'finance' in self.partitions and self.journal_entries and 'finance' in self.journal_collections:
+            # 回放的journal操作未体现在分区文件的修改时间中，指纹无法判断
+            return False
+        try:
+            with open(rollups_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('fingerprint') != self.rollup_fingerprint():
+                print("ℹ️ Saved rollups are out of date, rebuilding")
+                return False
+            self.rollups = {granularity: saved.get(granularity, {}) for granularity in self.ROLLUP_GRANULARITIES}
+            self.rollups_dirty = False
+            return True
+        except Exception as e:
+            print(f"Error loading rollups: {e}")
+            return False
+
+    def save_rollups(self):
+        """Persist the rollups next to the data files"""
+        with self.write_lock:
+            try:
+                data = {'fingerprint': self.rollup_fingerprint()}
+                data.update(self.rollups)
+                self.write_json_atomic(os.path.join(self.data_path, 'rollups.json'), data)
+                self.rollups_dirty = False
+            except Exception as e:
+                print(f"Error saving rollups: {e}")
+
+    def get_rollup(self, granularity: str, key: str) -> Dict:
+        """Revenue and cost of one bucket, e.g. ('day', '2025-06-22')"""
+        self.ensure_loaded('finance')
+        with self.data_lock.read():
+            bucket = self.rollups.get(granularity, {}).get(key, {})
+        return {'revenue': round(bucket.get('revenue', 0), 2), 'cost': round(bucket.get('cost', 0), 2)}
+
+    def get_rollup_range(self, granularity: str, start: str, end: str) -> List[tuple]:
+        """(bucket, revenue, cost) for every bucket from start to end inclusive, empty buckets included"""
+        if granularity == 'month':
+            current = datetime.datetime.strptime(start[:7], '%Y-%m')
+            last = datetime.datetime.strptime(end[:7], '%Y-%m')
+        elif granularity == 'day':
+            current = datetime.datetime.strptime(start[:10], '%Y-%m-%d')
+            last = datetime.datetime.strptime(end[:10], '%Y-%m-%d')
+            step = datetime.timedelta(days=1)
+        elif granularity == 'hour':
+            current = datetime.datetime.strptime(start[:13].replace(' ', 'T'), '%Y-%m-%dT%H')
+            last = datetime.datetime.strptime(end[:13].replace(' ', 'T'), '%Y-%m-%dT%H')
+            step = datetime.timedelta(hours=1)
+        else:
+            raise ValueError(f"Unsupported rollup granularity: {granularity}")
+
+        length = self.ROLLUP_GRANULARITIES[granularity]
+        result = []
+        self.ensure_loaded('finance')
+        with self.data_lock.read():
+            while current <= last:
+                key = current.strftime('%Y-%m-%dT%H')[:length]
+                totals = self.get_rollup(granularity, key)
+                result.append((key, totals['revenue'], totals['cost']))
+                if granularity == 'month':
+                    current = (current.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+                else:
+                    current += step
+        return result
+
+    def refresh_data(self) -> Dict[str, List[str]]:
+        """刷新数据：只重新读取存储中已变化的集合，返回 {'changed': [...], 'unchanged': [...]}"""
+        report = {'changed': [], 'unchanged': []}
         try:
-            self.orders = self.load_orders()
-            self.inventory = self.load_inventory() 
-            self.customers = self.load_customers()
-            self.meals = self.load_meals()
-            self.employees = self.load_employees()
-            self.financial_records = self.load_financial_records()
-            print("✅ Data refreshed successfully")
+            with self.write_lock:
+                # 先写出未保存的修改并合并journal，避免重新加载时丢失
+                self.sync()
+                changed = [name for name in self.COLLECTIONS
+                           if self.is_loaded(name) and self.collection_changed(name)]
+                for name in self.COLLECTIONS:
+                    if name in changed:
+                        self.reload_collection(name)
+                        report['changed'].append(name)
+                    elif self.is_loaded(name):
+                        report['unchanged'].append(name)
+                if {'inventory', 'meals'} & set(report['changed']):
+                    self.update_availability()
+            if report['changed']:
+                self.event_bus.publish('data_refreshed', {'collections': report['changed']})
+                print(f"✅ Data refreshed: {', '.join(report['changed'])} reloaded")
+            else:
+                print("✅ Data refreshed, nothing changed")
         except Exception as e:
             print(f"❌ 数据刷新失败: {e}")
+        return report
 
     def notify_modules_order_created(self, order_id: str):
-        """Notify modules that an order has been created"""
+        """Notify modules that an order has been created (delivered on the UI thread)"""
+        self.event_bus.publish('order_created', {'order_id': order_id})
+
+    # ==================== 配方与库存扣减 ====================
+    def load_recipes(self) -> List[Dict]:
+        """Recipe entries from recipes.json"""
+        recipes_file = os.path.join(self.data_path, 'recipes.json')
+        if os.path.exists(recipes_file):
+            try:
+                with open(recipes_file, 'r', encoding='utf-8') as f:
+                    recipes = json.load(f)
+                return recipes if isinstance(recipes, list) else []
+            except Exception as e:
+                print(f"Error loading recipes data: {e}")
+        return []
+
+    def invalidate_recipes(self, collection: str):
+        """Drop the compiled recipes when inventory items or meals change"""
+        if collection in ('inventory', 'meals'):
+            self.recipe_book = None
+            self.recipe_generation += 1
+
+    def get_recipe_book(self) -> RecipeBook:
+        """Recipes compiled against the current inventory items and meals"""
+        self.ensure_loaded('inventory')
+        self.ensure_loaded('meals')
+        recipes_file = os.path.join(self.data_path, 'recipes.json')
         try:
-            # Finance module
-            finance_module = self.modules.get('finance')
-            if finance_module and hasattr(finance_module, 'refresh_data'):
-                try:
-                    finance_module.refresh_data()
-                    print(f"✅ Notified finance module to refresh data")
-                except TclError:
-                    print(f"⚠️ Finance UI not active, skipping refresh")
-                except Exception as e:
-                    print(f"⚠️ Skipped finance refresh: {e}")
-
-            # Inventory module
-            inventory_module = self.modules.get('inventory')
-            if inventory_module and hasattr(inventory_module, 'refresh_data'):
-                try:
-                    inventory_module.refresh_data()
-                    print(f"✅ Notified inventory module to refresh data")
-                except TclError:
-                    print(f"⚠️ Inventory UI not active, skipping refresh")
-                except Exception as e:
-                    print(f"⚠️ Skipped inventory refresh: {e}")
-
-            # Charts module
-            charts_module = self.modules.get('charts')
-            if charts_module and hasattr(charts_module, 'refresh_charts'):
-                try:
-                    charts_module.refresh_charts()
-                    print(f"✅ Notified charts module to refresh data")
-                except TclError:
-                    print(f"⚠️ Charts UI not active, skipping refresh")
-                except Exception as e:
-                    print(f"⚠️ Skipped charts refresh: {e}")
-
-            # Sales module
-            sales_module = self.modules.get('sales')
-            if sales_module and hasattr(sales_module, 'refresh_data'):
+            state = self.file_signature(os.stat(recipes_file))
+        except OSError:
+            state = None
+        book = self.recipe_book
+        if book is not None and state == self.recipe_state:
+            return book
+        generation = self.recipe_generation
+        recipes = self.load_recipes()
+        with self.data_lock.read():
+            book = RecipeBook(self.get_collection('inventory'), self.get_collection('meals'), recipes)
+        if generation == self.recipe_generation:
+            # 编译期间库存条目或菜品被修改时不缓存，下次重新编译
+            self.recipe_book, self.recipe_state = book, state
+        return book
+
+    def stock_levels(self, book: RecipeBook) -> List[float]:
+        """Current stock of every inventory column of a recipe book"""
+        with self.data_lock.read():
+            items = self.id_indexes.get('inventory', {})
+            levels = []
+            for item_id in book.item_ids:
+                item = items.get(item_id)
                 try:
-                    sales_module.refresh_data()
-                    print(f"✅ Notified sales module to refresh data")
-                except TclError:
-                    print(f"⚠️ Sales UI not active, skipping refresh")
-                except Exception as e:
-                    print(f"⚠️ Skipped sales refresh: {e}")
+                    levels.append(float(item.get('current_stock') or 0) if item else 0.0)
+                except (TypeError, ValueError):
+                    levels.append(0.0)
+            return levels
+
+    def possible_servings(self) -> Dict[str, int]:
+        """{meal id: servings the current stock allows} for meals using stocked ingredients"""
+        book = self.get_recipe_book()
+        levels = self.stock_levels(book)
+        with self.servings_lock:
+            self.servings_table.update(book, levels)
+            return dict(self.servings_table.servings)
+
+    @staticmethod
+    def availability_entry(servings: Optional[int]) -> Dict:
+        """Availability of a meal from its possible servings (None: no stocked ingredient limits it)"""
+        return {'available': servings is None or servings > 0, 'servings': servings}
+
+    def menu_availability(self) -> Dict[str, Dict]:
+        """{meal id: {'available': bool, 'servings': int or None}} for every meal, from the cached servings"""
+        servings = self.possible_servings()
+        book = self.get_recipe_book()
+        return {meal_id: self.availability_entry(servings.get(meal_id)) for meal_id in book.meal_ids}
+
+    def update_availability(self):
+        """Recompute servings after a stock movement and push the meals whose availability changed"""
+        try:
+            book = self.get_recipe_book()
+            levels = self.stock_levels(book)
+            with self.servings_lock:
+                changed = self.servings_table.update(book, levels)
+                servings = self.servings_table.servings
+                payload = {meal_id: self.availability_entry(servings.get(meal_id)) for meal_id in changed}
         except Exception as e:
-            print(f"⚠️ Error notifying modules: {e}")
-        # End of notifications
+            print(f"⚠️ Menu availability not updated: {e}")
+            return
+        if payload:
+            self.event_bus.publish('availability_changed', {'meals': payload})
 
     def reduce_inventory_for_meal(self, meal: Dict, quantity: int) -> bool:
         """Reduce inventory for meal preparation"""
+        return self.reduce_inventory_for_basket([(meal, quantity)])
+
+    def reduce_inventory_for_basket(self, basket: List[tuple]) -> bool:
+        """Deduct the ingredients of (meal, quantity) pairs in one pass and record their cost"""
         try:
-            # 获取菜品的食材需求
-            ingredients = meal.get('ingredients', [])
-            if not ingredients:
-                print(f"⚠️ 菜品 {meal['name']} 没有配置食材信息")
-                return True  # 没有食材需求，直接返回成功
-            
-            # 定义每份菜品的标准食材用量
-            ingredient_consumption = {
-                'Tomato': 0.2,     # 200g per dish
-                'Beef': 0.15,      # 150g per dish
-                'Noodles': 0.1,    # 100g per dish
-                'Egg': 0.05,       # 50g per dish
-                'Rice': 0.08,      # 80g per dish
-                'Chicken': 0.15,   # 150g per dish
-                'Pork': 0.15,      # 150g per dish
-                'Fish': 0.2,       # 200g per dish
-                'Potato': 0.1,     # 100g per dish
-                'Onion': 0.05,     # 50g per dish
-                'Carrot': 0.05,    # 50g per dish
-                'Cabbage': 0.1,    # 100g per dish
-                'Oil': 0.02,       # 20ml per dish
-                'Salt': 0.005,     # 5g per dish
-                'Soy Sauce': 0.01, # 10ml per dish
-            }
-            
-            # 扣减库存
-            reduced_items = []
-            for ingredient_name in ingredients:
-                # 查找库存中对应的食材
-                for item in self.inventory:
-                    if item['name'].lower() == ingredient_name.lower():
-                        # 计算需要扣减的数量
-                        required_quantity = ingredient_consumption.get(ingredient_name, 0.1) * quantity
-                        
-                        # 扣减库存
-                        old_stock = item['current_stock']
-                        item['current_stock'] = max(0, item['current_stock'] - required_quantity)
-                        item['updated_at'] = datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
-                        
-                        reduced_items.append({
-                            'name': ingredient_name,
-                            'reduced': min(required_quantity, old_stock),
-                            'new_stock': item['current_stock']
-                        })
-                        
-                        print(f"✅ Reduced inventory: {ingredient_name} -{min(required_quantity, old_stock):.2f} (Remaining: {item['current_stock']:.2f})")
-                        break
+            book = self.get_recipe_book()
+            servings, meals = {}, {}
+            for meal, quantity in basket:
+                servings[meal['id']] = servings.get(meal['id'], 0) + quantity
+                meals[meal['id']] = meal
+            for meal_id, meal in meals.items():
+                if not book.vectors.get(meal_id):
+                    print(f"⚠️ 菜品 {meal['name']} 没有配置食材信息")
+            # 整个购物篮的用量：份数向量乘以配方矩阵
+            required = book.requirements(servings)
+            now = datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
             
-            # 保存库存变更
-            self.save_inventory()
-            
-            # 创建库存扣减的财务记录（成本记录）
-            total_cost = 0
-            for item_info in reduced_items:
-                for inv_item in self.inventory:
-                    if inv_item['name'] == item_info['name']:
-                        item_cost = item_info['reduced'] * inv_item.get('price', 0)
-                        total_cost += item_cost
-                        break
-            
-            if total_cost > 0:
-                cost_record = {
-                    'id': f"COST{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}",
-                    'type': 'cost',
-                    'amount': round(-total_cost, 2),  # negative for expense
-                    'description': f"Meal Cost - {meal['name']} x{quantity}",
-                    'meal_id': meal['id'],
-                    'date': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
-                    'create_time': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
-                }
-                self.financial_records.append(cost_record)
-                self.save_financial_records()
-                print(f"✅ Meal cost recorded: ¥{total_cost:.2f}")
+            # 扣减库存（在同一事务中提交，失败时整体回滚）
+            with self.transaction():
+                unit_costs = [0.0] * len(required)
+                for column, required_quantity in enumerate(required):
+                    if required_quantity <= 0:
+                        continue
+                    item = self.get_record('inventory', book.item_ids[column])
+                    if not item:
+                        continue
+                    old_stock = item['current_stock']
+                    new_stock = max(0, old_stock - required_quantity)
+                    self.update_record('inventory', item, {
+                        'current_stock': new_stock,
+                        'updated_at': now
+                    }, deltas={'current_stock': new_stock - old_stock})
+                    # 库存不足时只按实际扣减的部分计算成本
+                    reduced = min(required_quantity, old_stock)
+                    unit_costs[column] = item.get('price', 0) * reduced / required_quantity
+                    print(f"✅ Reduced inventory: {item['name']} -{reduced:.2f} (Remaining: {new_stock:.2f})")
+                
+                # 创建库存扣减的财务记录（每道菜一条成本记录）
+                for meal_id, total_cost in book.meal_costs(servings, unit_costs).items():
+                    if total_cost <= 0:
+                        continue
+                    meal = meals[meal_id]
+                    cost_record = {
+                        'id': self.new_id('COST'),
+                        'type': 'cost',
+                        'amount': round(-total_cost, 2),  # negative for expense
+                        'description': f"Meal Cost - {meal['name']} x{servings[meal_id]}",
+                        'meal_id': meal_id,
+                        'date': now,
+                        'create_time': now
+                    }
+                    self.insert_record('finance', cost_record)
+                    print(f"✅ Meal cost recorded: ¥{total_cost:.2f}")
             
             return True
             
@@ -536,5 +2358,41 @@ class DataManager:
             print(f"❌ Inventory reduction failed: {e}")
             return False
 
-# 创建全局数据管理器实例
-data_manager = DataManager()
+_shared_instance = None
+_shared_lock = Lock()
+
+
+def get_data_manager() -> DataManager:
+    """Shared DataManager, created on first use and reused when this file was imported under another module name"""
+    global _shared_instance
+    with _shared_lock:
+        if _shared_instance is not None:
+            return _shared_instance
+        import sys
+        for module_name in ('modern_system.modules.data_manager', 'modules.data_manager', 'data_manager'):
+            module = sys.modules.get(module_name)
+            instance = getattr(module, '_shared_instance', None)
+            if instance is None or module_name == __name__:
+                continue
+            try:
+                if os.path.samefile(module.__file__, __file__):
+                    _shared_instance = instance
+                    return instance
+            except (OSError, TypeError, AttributeError):
+                continue
+        _shared_instance = DataManager()
+        return _shared_instance
+
+
+class SharedDataManager:
+    """Stand-in for the shared DataManager that creates it on first attribute access"""
+
+    def __getattr__(self, name: str):
+        return getattr(get_data_manager(), name)
+
+    def __repr__(self) -> str:
+        return f"<SharedDataManager {_shared_instance!r}>"
+
+
+# 全局数据管理器（首次使用时才创建，导入本模块不会读取数据目录或启动后台线程）
+data_manager = SharedDataManager()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Event Bus
+Thread-safe publish/subscribe for data change notifications
+Events are queued from any thread and delivered on the Tk main loop, bursts
+are coalesced so every subscriber is called at most once per dispatch
+"""
+
+import datetime
+from collections import deque
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+from tkinter import TclError
+
+
+class Event:
+    """A typed event with its payload"""
+
+    __slots__ = ('type', 'payload', 'time')
+
+    def __init__(self, event_type: str, payload: Optional[Dict] = None):
+        self.type = event_type
+        self.payload = payload or {}
+        self.time = datetime.datetime.now()
+
+    def __repr__(self):
+        return f"Event({self.type!r}, {self.payload!r})"
+
+
+class EventBus:
+    """Queue events from any thread, dispatch them coalesced on the Tk thread"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._queue = deque()
+        self._subscribers = []
+        self._root = None
+        self._interval = 50
+
+    def subscribe(self, event_types, callback: Callable[[List[Event]], Any],
+                  visible: Optional[Callable[[], bool]] = None, name: str = '') -> Dict:
+        """Subscribe to one or several event types
+
+        callback receives the list of matching events of one dispatch. When
+        visible returns False the events are dropped for this subscriber.
+        """
+        if isinstance(event_types, str):
+            event_types = [event_types]
+        subscriber = {
+            'types': set(event_types),
+            'callback': callback,
+            'visible': visible,
+            'name': name or getattr(callback, '__name__', 'subscriber')
+        }
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Dict):
+        """Remove a subscription returned by subscribe()"""
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def publish(self, event_type: str, payload: Optional[Dict] = None):
+        """Queue an event, safe to call from any thread"""
+        with self._lock:
+            self._queue.append(Event(event_type, payload))
+            attached = self._root is not None
+        if not attached:
+            # 没有界面主循环时直接在当前线程分发
+            self.dispatch()
+
+    def attach(self, root, interval: int = 50):
+        """Start draining the queue on the Tk main loop every interval ms"""
+        self._root = root
+        self._interval = interval
+        root.after(interval, self._poll)
+
+    def detach(self):
+        """Stop dispatching on the Tk main loop"""
+        self._root = None
+
+    def _poll(self):
+        root = self._root
+        if root is None:
+            return
+        try:
+            self.dispatch()
+        finally:
+            try:
+                root.after(self._interval, self._poll)
+            except TclError:
+                self._root = None
+
+    def dispatch(self) -> int:
+        """Deliver all queued events, each subscriber is called once; returns the event count"""
+        with self._lock:
+            if not self._queue:
+                return 0
+            events = list(self._queue)
+            self._queue.clear()
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            matching = [event for event in events if event.type in subscriber['types']]
+            if not matching:
+                continue
+            try:
+                if subscriber['visible'] and not subscriber['visible']():
+                    continue
+                subscriber['callback'](matching)
+            except TclError:
+                print(f"⚠️ {subscriber['name']} UI not active, skipping refresh")
+            except Exception as e:
+                print(f"⚠️ Skipped {subscriber['name']} refresh: {e}")
+        return len(events)
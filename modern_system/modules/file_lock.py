@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File Lock
+Advisory cross-process locks for terminals sharing one data directory
+Each collection has a lock file that also stores its version number, readers
+take a shared lock and writers an exclusive one, so readers never block each other
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from threading import RLock
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Shared/exclusive advisory lock on a file holding a version counter"""
+
+    def __init__(self, lock_file: str, fsync: bool = True):
+        self.lock_file = lock_file
+        self.fsync = fsync
+        # flock锁属于文件描述符，同一进程内的线程再用RLock串行化
+        self._thread_lock = RLock()
+        self._fd = None
+        self._depth = 0
+
+    def _open(self):
+        if self._fd is None:
+            self._fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _lock(self, exclusive: bool):
+        fd = self._open()
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            return
+        # msvcrt没有共享锁，统一使用排他锁
+        while True:
+            try:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                time.sleep(0.01)
+
+    def _unlock(self):
+        if fcntl:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def hold(self, exclusive: bool = False):
+        """Hold the lock for the duration of the block (re-entrant within a thread)"""
+        with self._thread_lock:
+            if self._depth == 0:
+                self._lock(exclusive)
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._unlock()
+
+    def shared(self):
+        """Lock for reading, other readers may hold it at the same time"""
+        return self.hold(exclusive=False)
+
+    def exclusive(self):
+        """Lock for a read-modify-write"""
+        return self.hold(exclusive=True)
+
+    def read_version(self) -> int:
+        """Version number stored in the lock file, 0 if none yet"""
+        fd = self._open()
+        os.lseek(fd, 0, os.SEEK_SET)
+        try:
+            return int(os.read(fd, 32).decode('ascii').strip() or 0)
+        except ValueError:
+            return 0
+
+    def write_version(self, version: int):
+        """Store a new version number (hold the exclusive lock)"""
+        fd = self._open()
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, str(version).encode('ascii').ljust(20))
+        if self.fsync:
+            os.fsync(fd)
+
+    def close(self):
+        """Close the lock file"""
+        with self._thread_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
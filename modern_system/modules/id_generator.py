@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ID Generator
+Unique, time-ordered record ids for orders, financial records and customers
+Each process gets its own node number so several terminals never collide
+"""
+
+import json
+import os
+import time
+import random
+import datetime
+from threading import Lock
+
+
+class IdGenerator:
+    """Thread-safe generator of monotonic, sortable ids
+
+    Format: <prefix><YYYYmmddHHMMSS><millisecond:3><node:3><sequence:3>
+    e.g. ORD20250622150035123004001 - up to 1000 ids per millisecond per node.
+    """
+
+    SEQUENCE_LIMIT = 1000
+    NODE_LIMIT = 1000
+
+    def __init__(self, node: int = 0):
+        self.node = node % self.NODE_LIMIT
+        self._lock = Lock()
+        self._last_ms = 0
+        self._sequence = 0
+
+    def next_id(self, prefix: str = '') -> str:
+        """Generate the next id with the given prefix"""
+        with self._lock:
+            now_ms = int(time.time() * 1000)
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                # 同一毫秒内（或时钟回拨）递增序号，保证单调
+                self._sequence += 1
+                if self._sequence >= self.SEQUENCE_LIMIT:
+                    self._last_ms += 1
+                    self._sequence = 0
+            ms, sequence = self._last_ms, self._sequence
+        stamp = datetime.datetime.fromtimestamp(ms / 1000).strftime('%Y%m%d%H%M%S')
+        return f"{prefix}{stamp}{ms % 1000:03d}{self.node:03d}{sequence:03d}"
+
+
+def allocate_node_id(state_file: str, timeout: float = 2.0) -> int:
+    """Hand out a node number per process from a shared counter file
+
+    The counter is guarded by a lock file created with O_EXCL, which works on
+    every platform. Falls back to a random node if the lock cannot be taken.
+    """
+    lock_file = f"{state_file}.lock"
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                # 清理崩溃进程遗留的锁文件
+                if time.time() - os.path.getmtime(lock_file) > 10:
+                    os.remove(lock_file)
+                    continue
+            except OSError:
+                pass
+            if time.time() > deadline:
+                print("⚠️ ID node lock busy, using a random node number")
+                return random.randrange(IdGenerator.NODE_LIMIT)
+            time.sleep(0.01)
+        except OSError as e:
+            print(f"⚠️ Cannot allocate ID node ({e}), using a random node number")
+            return random.randrange(IdGenerator.NODE_LIMIT)
+
+    try:
+        counter = 0
+        if os.path.exists(state_file):
+            try:
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    counter = int(json.load(f).get('next_node', 0))
+            except (ValueError, TypeError, AttributeError):
+                counter = 0
+        temp_file = f"{state_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'next_node': (counter + 1) % IdGenerator.NODE_LIMIT}, f)
+        os.replace(temp_file, state_file)
+        return counter % IdGenerator.NODE_LIMIT
+    except OSError as e:
+        print(f"⚠️ Cannot allocate ID node ({e}), using a random node number")
+        return random.randrange(IdGenerator.NODE_LIMIT)
+    finally:
+        os.close(fd)
+        try:
+            os.remove(lock_file)
+        except OSError:
+            pass
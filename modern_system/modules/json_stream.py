@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON Stream
+Incremental reader for the JSON array data files
+Elements are decoded one at a time from fixed-size chunks, so memory stays
+bounded by the chunk size plus the largest single record
+"""
+
+import json
+from typing import Any, IO, Iterator
+
+_SKIP = ' \t\r\n,'
+_decode = json.JSONDecoder().raw_decode
+
+
+def iter_json_array(f: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the elements of the JSON array in a text file one by one"""
+    buffer, pos, eof = '', 0, False
+
+    def more() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        # 丢弃已解析的部分，缓冲区不随文件增长
+        buffer, pos = buffer[pos:] + chunk, 0
+        return True
+
+    # 跳过开头的空白，找到数组起始的 '['
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n\ufeff':
+            pos += 1
+        if pos < len(buffer) or not more():
+            break
+    if pos >= len(buffer):
+        return
+    if buffer[pos] != '[':
+        raise ValueError("JSON data file does not contain an array")
+    pos += 1
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _SKIP:
+            pos += 1
+        if pos >= len(buffer):
+            if more():
+                continue
+            raise ValueError("Unexpected end of JSON array")
+        if buffer[pos] == ']':
+            return
+        try:
+            value, end = _decode(buffer, pos)
+        except json.JSONDecodeError:
+            # 元素跨越了块边界，读入下一块后重试
+            if more():
+                continue
+            raise
+        if end == len(buffer) and not eof and more():
+            # 数字等标量可能在块末尾被截断，带上后续内容重新解析
+            continue
+        pos = end
+        yield value
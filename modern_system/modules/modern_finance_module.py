@@ -22,13 +22,17 @@ except ImportError:
     except ImportError:
         # Mock data manager
         class MockDataManager:
-            def get_finance_records(self):
+            def get_finance_records(self, start=None, end=None):
                 return []
             def register_module(self, module_type, instance):
                 pass
         data_manager = MockDataManager()
 
 class ModernFinanceModule:
+    # Months of financial records listed and totalled when finance is stored in monthly partitions,
+    # older months stay on disk; whole-file storage lists the full history
+    HISTORY_MONTHS = 12
+
     def __init__(self, parent_frame, title_frame, order_module=None, employee_module=None):
         self.parent_frame = parent_frame
         self.title_frame = title_frame
@@ -283,8 +287,14 @@ class ModernFinanceModule:
     def load_finance_records(self):
         """Load financial records from data manager."""
         try:
-            # 获取数据管理器中的财务记录
-            raw_records = data_manager.get_financial_records() or []
+            if hasattr(data_manager, 'is_partitioned') and data_manager.is_partitioned('finance'):
+                # 按月分区时只读取最近 HISTORY_MONTHS 个月的财务记录，更早的月份不会被加载
+                since = datetime.date.today().replace(day=1)
+                for _ in range(self.HISTORY_MONTHS - 1):
+                    since = (since - datetime.timedelta(days=1)).replace(day=1)
+                raw_records = data_manager.get_financial_records(start=since.strftime('%Y-%m-%d')) or []
+            else:
+                raw_records = data_manager.get_financial_records() or []
             
             # 转换记录格式以匹配财务模块期望的格式
             converted_records = []
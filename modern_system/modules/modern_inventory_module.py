@@ -70,8 +70,9 @@ class ModernInventoryModule:
           # UI component references
         self.inventory_tree = None
         self.stats_labels = {}
-        self.recipes = []
         self.possible_meals_frame = None
+        self.meal_cards = {}            # 菜品名称 -> (卡片, 份数标签)
+        self.no_meals_label = None
     
     def load_inventory_data(self):
         """Load inventory data from the data management center"""
@@ -916,104 +917,26 @@ class ModernInventoryModule:
              print(f"❌ Inventory module data refresh failed: {e}")
 
     # --- Meal Possibility Calculation ---
-    def load_recipe_data(self):
-        """Load recipe data from data manager"""
-        try:
-            # Load JSON recipes and merge with meal definitions
-            json_recipes = data_manager.load_data('recipes') or []
-            meal_defs = {m['name']: m for m in data_manager.load_data('meals')}
-            merged = []
-            for r in json_recipes:
-                ingredients = r.get('ingredients')
-                # normalize ingredients list to dict
-                if isinstance(ingredients, list):
-                    ing_map = {ing.get('ingredient_name','').lower(): ing.get('quantity_per_serving',0) for ing in ingredients}
-                else:
-                    ing_map = {k.lower(): v for k,v in (ingredients or {}).items()}
-                merged.append({
-                    'meal_id': r.get('meal_id'),
-                    'meal_name': r.get('meal_name'),
-                    'ingredients': ing_map,
-                    'category': meal_defs.get(r.get('meal_name'),'Other').get('category', 'Other') if isinstance(meal_defs.get(r.get('meal_name')), dict) else 'Other'
-                })
-            # Add fallback recipes for meals without explicit recipes
-            for name, m in meal_defs.items():
-                if not any(r['meal_name'] == name for r in merged):
-                    merged.append({
-                        'meal_id': m['id'],
-                        'meal_name': name,
-                        'ingredients': {ing.lower():1 for ing in m.get('ingredients',[])},
-                        'category': m.get('category','Other')
-                    })
-            self.recipes = merged
-            if not self.recipes:
-                self.recipes = self.get_default_recipes()
-        except Exception as e:
-            print(f"Error loading recipe data: {e}")
-            self.recipes = self.get_default_recipes()
-
-    def get_default_recipes(self):
-        """Returns a default list of recipes if the data file is unavailable."""
-        return [
-             {"name": "Tomato Beef Noodles", "ingredients": {"Tomato": 0.2, "Beef": 0.15, "Noodles": 1}},
-             {"name": "Egg Fried Rice", "ingredients": {"Egg": 2, "Rice": 0.3}},
-             {"name": "Beef Burger", "ingredients": {"Beef": 0.2, "Bread": 1, "Lettuce": 0.05}},
-             {"name": "French Fries", "ingredients": {"Potato": 0.3}},
-             {"name": "Salmon Set Meal", "ingredients": {"Salmon": 0.2, "Rice": 0.15}},
-             {"name": "Homestyle Chicken Rice", "ingredients": {"Chicken": 0.2, "Rice": 0.15}},
-             {"name": "Seafood Fried Rice", "ingredients": {"Shrimp": 0.1, "Rice": 0.15, "Egg": 1}},
-             {"name": "Classic Beef Rice", "ingredients": {"Beef": 0.2, "Rice": 0.15}},
-             {"name": "Vegetable Set Meal", "ingredients": {"Broccoli": 0.1, "Carrot": 0.1, "Rice": 0.15}},
-             {"name": "Spicy Tofu", "ingredients": {"Tofu": 0.3, "Chili": 0.05}}
-         ]
-
     def calculate_possible_meals(self):
         """Based on current inventory, calculate how many of each meal can be made."""
-        if not self.inventory_data:
+        if not self.inventory_data or not hasattr(data_manager, 'possible_servings'):
             return {}
         
-        # Load recipes if not already loaded
-        if not self.recipes:
-            self.load_recipe_data()
-        
-        # Create inventory map, support singular and plural names
-        inventory_map = {}
-        for item in self.inventory_data:
-            name = item['name'].lower()
-            inventory_map[name] = item['current_stock']
-            # 支持去除复数 's' 后的名称匹配
-            if name.endswith('s'):
-                inventory_map[name[:-1]] = item['current_stock']
+        # 与下单扣减库存共用同一份编译后的配方
+        try:
+            book = data_manager.get_recipe_book()
+            servings = data_manager.possible_servings()
+        except Exception as e:
+            print(f"Error loading recipe data: {e}")
+            return {}
 
         possible_meals = {}
-        
-        for recipe in self.recipes:
-            # Use meal_name key from recipe, fallback to name
-            meal_name = recipe.get("meal_name") or recipe.get("name")
-            ingredients = recipe.get("ingredients")
-            # Normalize ingredients into dict: handle list or dict format
-            if isinstance(ingredients, list):
-                ingredients_dict = {ing.get('ingredient_name', '').lower(): ing.get('quantity_per_serving', 0) for ing in ingredients}
-            else:
-                ingredients_dict = {k.lower(): v for k, v in (ingredients or {}).items()}
-
-            if not meal_name or not ingredients_dict:
-                continue
-            
-            can_make = float('inf')
-            for ingredient, required_amount in ingredients_dict.items():
-                stock = inventory_map.get(ingredient, 0)
-                if stock < required_amount:
-                    can_make = 0
-                    break
-                # Determine integer possible servings
-                can_make = min(can_make, int(stock // required_amount))
-            
+        for meal_id, count in servings.items():
             # Only add if at least one serving
-            if can_make and can_make != float('inf'):
-                possible_meals[meal_name] = {
-                    "possible_servings": int(can_make),
-                    "recipe": ingredients_dict
+            if count > 0:
+                possible_meals[book.names[meal_id]] = {
+                    "possible_servings": count,
+                    "recipe": book.ingredients[meal_id]
                 }
         
         return possible_meals
@@ -1049,6 +972,8 @@ class ModernInventoryModule:
         
         # Create the scrollable frame
         self.possible_meals_frame = tk.Frame(self.meals_canvas, bg=self.colors['surface'])
+        self.meal_cards = {}
+        self.no_meals_label = None
         self.canvas_frame_id = self.meals_canvas.create_window((0, 0), window=self.possible_meals_frame, anchor="nw")
         
         # Bind events
@@ -1125,33 +1050,51 @@ class ModernInventoryModule:
                 self.meals_canvas.xview_scroll(delta, "units")
 
     def refresh_possible_meals(self):
-        """Refresh the display of meals that can be made."""
+        """Refresh the display of meals that can be made, updating existing cards in place."""
         if not hasattr(self, 'possible_meals_frame') or not self.possible_meals_frame:
             return
 
-        # Clear previous cards
-        for widget in self.possible_meals_frame.winfo_children():
-            widget.destroy()
-
         possible_meals = self.calculate_possible_meals()
+
+        # Remove cards of meals that can no longer be made
+        layout_changed = False
+        for meal_name in [name for name in self.meal_cards if name not in possible_meals]:
+            card, _ = self.meal_cards.pop(meal_name)
+            card.destroy()
+            layout_changed = True
+
         if not possible_meals:
-            tk.Label(
-                self.possible_meals_frame,
-                text="Not enough ingredients to make any dishes.",
-                font=self.fonts['body'], bg=self.colors['surface'], fg=self.colors['text_secondary']
-            ).pack(pady=10)
-            # Update canvas scroll region
-            self.update_scroll_region()
+            if self.no_meals_label is None:
+                self.no_meals_label = tk.Label(
+                    self.possible_meals_frame,
+                    text="Not enough ingredients to make any dishes.",
+                    font=self.fonts['body'], bg=self.colors['surface'], fg=self.colors['text_secondary']
+                )
+                self.no_meals_label.pack(pady=10)
+                # Update canvas scroll region
+                self.update_scroll_region()
             return
-
-        # Display all cards in a single horizontal row for scrolling
-        col = 0
-        for meal_name, meal_info in possible_meals.items():
-            self.create_meal_card(self.possible_meals_frame, meal_name, meal_info, 0, col)
-            col += 1
+        if self.no_meals_label is not None:
+            self.no_meals_label.destroy()
+            self.no_meals_label = None
+
+        # Only cards whose servings changed are touched, new meals get a new card
+        for col, (meal_name, meal_info) in enumerate(possible_meals.items()):
+            entry = self.meal_cards.get(meal_name)
+            if entry is None:
+                self.meal_cards[meal_name] = self.create_meal_card(self.possible_meals_frame, meal_name, meal_info, 0, col)
+                layout_changed = True
+                continue
+            card, servings_label = entry
+            text = f"Can make {meal_info['possible_servings']} servings"
+            if servings_label.cget('text') != text:
+                servings_label.config(text=text)
+            if layout_changed and int(card.grid_info().get('column', col)) != col:
+                card.grid_configure(column=col)
         
         # Schedule scroll region update after UI renders
-        self.possible_meals_frame.after(50, self.update_scroll_region)
+        if layout_changed:
+            self.possible_meals_frame.after(50, self.update_scroll_region)
     
     def update_scroll_region(self):
         """Update the canvas scroll region and ensure proper scrolling."""
@@ -1220,9 +1163,11 @@ class ModernInventoryModule:
         name_label.pack(pady=(0,5), padx=5, fill='x')
         
         # Servings info
-        tk.Label(card, text=f"Can make {servings} servings", 
+        servings_label = tk.Label(card, text=f"Can make {servings} servings", 
                 font=('Segoe UI', 11, 'bold'), bg=self.colors['background'], 
-                fg=self.colors['success']).pack(pady=(0,15))
+                fg=self.colors['success'])
+        servings_label.pack(pady=(0,15))
+        return card, servings_label
 
     def show_recipe_detail_dialog(self, meal_name, recipe, possible_servings):
         """Show a dialog with recipe details."""
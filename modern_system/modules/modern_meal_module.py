@@ -93,7 +93,7 @@ class ModernMealModule:
                     "price": meal.get('price', 0.0),
                     "cost": meal.get('cost', 0.0),
                     "description": meal.get('description', 'No description'),
-                    "ingredients": meal.get('ingredients', []),
+                    "ingredients": list(meal.get('ingredients', [])),
                     "cooking_time": meal.get('cooking_time', 15),
                     "calories": meal.get('calories', 200),
                     "is_spicy": meal.get('is_spicy', False),
@@ -936,7 +936,7 @@ class MealDialog:
         self.image_var = tk.StringVar(self.dialog, value=meal_data['image'] if meal_data else "🍽️")
         
         # Ingredient list
-        self.ingredients = meal_data['ingredients'].copy() if meal_data else []
+        self.ingredients = list(meal_data['ingredients']) if meal_data else []
         
         # Create interface
         self.create_dialog_ui()
@@ -32,6 +32,13 @@ except ImportError:
         data_manager = MockDataManager()
 
 class ModernOrderModule:
+    # 订单列表虚拟化：只为可见区域创建卡片，滚动时复用，订单按页向数据管理器请求
+    ORDER_PAGE_SIZE = 50
+    ORDER_CARD_HEIGHT = 330         # header, customer, meal lines, totals and one note line
+    ORDER_ROW_HEIGHT = 340          # card plus spacing
+    ORDER_CARD_MEAL_LINES = 2
+    ORDER_CARD_NOTE_CHARS = 60      # longer notes are cut to one line, the full note is in the details
+    
     def __init__(self, parent_frame, title_frame, inventory_module=None, customer_module=None):
         self.parent_frame = parent_frame
         self.title_frame = title_frame
@@ -76,60 +83,42 @@ class ModernOrderModule:
         }
         
         # Order data - get from data management center
-        self.order_data = self.load_order_data()
+        self.order_data = []
+        self.reload_orders()
         
         # Interface state variables
         self.selected_order = None
         self.current_filter = "All"
         self.search_keyword = ""
         self.stats_frame = None
-        self.orders_container = None
+        self.orders_canvas = None
+        self.order_cards = []           # 复用的卡片池
+        self.order_pages = {}           # 页号 -> 已格式化的订单
+        self.filtered_orders = None     # 在内存中筛选的订单（示例数据或搜索），None 表示按页读取
+        self.order_total = 0
+        self.render_pending = False
     
-    def load_order_data(self):
-        """Load order data from data management center"""
+    def raw_order_statuses(self, status):
+        """Stored statuses shown under a display status ('Received' is shown as 'Pending')"""
+        return ['Pending', 'Received', None] if status == 'Pending' else [status]
+
+    def load_order_data(self, status=None):
+        """Load order data from data management center, optionally only one status"""
         try:
-            orders = data_manager.get_orders()
+            if status and hasattr(data_manager, 'query_orders'):
+                # Use the status index so only matching orders are loaded
+                orders = data_manager.query_orders(status=self.raw_order_statuses(status))
+            else:
+                orders = data_manager.get_orders()
             # Convert data format to adapt to existing interface
-            formatted_orders = []
-            for order in orders:
-                # Process meal data: support 'items' or legacy fields
-                meals = []
-                items = order.get('items', [])
-                # Legacy format: single meal fields
-                if not items and order.get('meal_name'):
-                    items = [{
-                        'name': order.get('meal_name', ''),
-                        'price': order.get('price', 0),
-                        'quantity': order.get('quantity', 1)
-                    }]
-                for item in items:
-                    meal = {
-                        "name": item.get('name', item.get('product_id', 'Unknown Dish')),
-                        "price": item.get('price', 0),
-                        "quantity": item.get('quantity', 1)
-                    }
-                    meals.append(meal)
-                
-                # Normalize status: treat 'Received' as 'Pending'
-                raw_status = order.get('status', 'Pending')
-                norm_status = 'Pending' if raw_status == 'Received' else raw_status
-                formatted_order = {
-                    "id": order.get('id', ''),
-                    "customer": order.get('customer_name', order.get('table_number', 'Unknown Customer')),
-                    "phone": order.get('customer_phone', order.get('phone', '')),
-                    "address": order.get('delivery_address', order.get('address', 'Dine-in')),
-                    "meals": meals,
-                    "total": order.get('total_amount', order.get('total', 0)),
-                    "create_time": order.get('create_time', '').replace('T', ' ')[:16] if 'T' in order.get('create_time', '') else order.get('create_time', ''),
-                    "status": norm_status,
-                    "type": order.get('order_type', order.get('type', 'Takeout')),
-                    "payment": order.get('payment_method', order.get('payment', 'Cash')),
-                    "note": order.get('note', '')
-                }
-                formatted_orders.append(formatted_order)
+            formatted_orders = [self.format_order(order) for order in orders]
+            
+            if status:
+                return formatted_orders
             
             # If no data or too little data, use default sample data
-            if len(formatted_orders) < 3:
+            self.using_sample_data = len(formatted_orders) < 3
+            if self.using_sample_data:
                 print("Order data is limited, adding sample data...")
                 formatted_orders.extend(self.get_default_order_data())
             
@@ -138,6 +127,57 @@ class ModernOrderModule:
             print(f"Failed to load order data: {e}")
             return self.get_default_order_data()
     
+    def reload_orders(self):
+        """Reload the orders behind the list: paged from the data manager, or all of them for sample data"""
+        if hasattr(data_manager, 'query_orders_page') and hasattr(data_manager, 'count_orders_by_status'):
+            try:
+                self.using_sample_data = sum(data_manager.count_orders_by_status().values()) < 3
+            except Exception as e:
+                print(f"Failed to count orders: {e}")
+                self.using_sample_data = True
+            if not self.using_sample_data:
+                # 订单按页读取，模块中不保留全部订单
+                self.order_data = []
+                return
+        self.order_data = self.load_order_data()
+
+    def format_order(self, order):
+        """Convert a data manager order to the format used by the order list and exports"""
+        # Process meal data: support 'items' or legacy fields
+        meals = []
+        items = order.get('items', [])
+        # Legacy format: single meal fields
+        if not items and order.get('meal_name'):
+            items = [{
+                'name': order.get('meal_name', ''),
+                'price': order.get('price', 0),
+                'quantity': order.get('quantity', 1)
+            }]
+        for item in items:
+            meal = {
+                "name": item.get('name', item.get('product_id', 'Unknown Dish')),
+                "price": item.get('price', 0),
+                "quantity": item.get('quantity', 1)
+            }
+            meals.append(meal)
+        
+        # Normalize status: treat 'Received' as 'Pending'
+        raw_status = order.get('status', 'Pending')
+        norm_status = 'Pending' if raw_status == 'Received' else raw_status
+        return {
+            "id": order.get('id', ''),
+            "customer": order.get('customer_name', order.get('table_number', 'Unknown Customer')),
+            "phone": order.get('customer_phone', order.get('phone', '')),
+            "address": order.get('delivery_address', order.get('address', 'Dine-in')),
+            "meals": meals,
+            "total": order.get('total_amount', order.get('total', 0)),
+            "create_time": order.get('create_time', '').replace('T', ' ')[:16] if 'T' in order.get('create_time', '') else order.get('create_time', ''),
+            "status": norm_status,
+            "type": order.get('order_type', order.get('type', 'Takeout')),
+            "payment": order.get('payment_method', order.get('payment', 'Cash')),
+            "note": order.get('note', '')
+        }
+
     def get_default_order_data(self):
         """Get default order data"""
         return [
@@ -241,11 +281,11 @@ class ModernOrderModule:
         
         return card_frame
     
-    def create_order_card(self, parent, order):
-        """Create order card"""
+    def create_order_card(self, parent):
+        """Create an empty order card; the list reuses it for whichever order scrolls into view"""
         card_frame = tk.Frame(parent, bg=self.colors['card'], relief='flat', bd=1,
                              highlightbackground=self.colors['border'], highlightthickness=1)
-        card_frame.pack(fill='x', padx=5, pady=5)
+        card = {'frame': card_frame, 'order': None}
         
         # Card header
         header_frame = tk.Frame(card_frame, bg=self.colors['card'], height=50)
@@ -256,81 +296,110 @@ class ModernOrderModule:
         order_info_frame = tk.Frame(header_frame, bg=self.colors['card'])
         order_info_frame.pack(side='left', fill='y')
         
-        order_id_label = tk.Label(order_info_frame, text=f"#{order['id']}", 
-                                 font=('Microsoft YaHei UI', 14, 'bold'),
-                                 bg=self.colors['card'], fg=self.colors['primary'])
-        order_id_label.pack(anchor='w')
+        card['id'] = tk.Label(order_info_frame, font=('Microsoft YaHei UI', 14, 'bold'),
+                              bg=self.colors['card'], fg=self.colors['primary'])
+        card['id'].pack(anchor='w')
         
-        time_label = tk.Label(order_info_frame, text=order['create_time'], 
-                             font=('Microsoft YaHei UI', 10),
-                             bg=self.colors['card'], fg=self.colors['text_light'])
-        time_label.pack(anchor='w')
+        card['time'] = tk.Label(order_info_frame, font=('Microsoft YaHei UI', 10),
+                                bg=self.colors['card'], fg=self.colors['text_light'])
+        card['time'].pack(anchor='w')
         
         # Status label
-        status_color = self.status_colors.get(order['status'], self.colors['info'])
-        status_frame = tk.Frame(header_frame, bg=status_color, padx=10, pady=5)
-        status_frame.pack(side='right', pady=5)
+        card['status_frame'] = tk.Frame(header_frame, bg=self.colors['info'], padx=10, pady=5)
+        card['status_frame'].pack(side='right', pady=5)
         
-        status_label = tk.Label(status_frame, text=order['status'], 
-                               font=('Microsoft YaHei UI', 10, 'bold'),
-                               bg=status_color, fg=self.colors['white'])
-        status_label.pack()
+        card['status'] = tk.Label(card['status_frame'], font=('Microsoft YaHei UI', 10, 'bold'),
+                                  bg=self.colors['info'], fg=self.colors['white'])
+        card['status'].pack()
         
         # Customer information
         customer_frame = tk.Frame(card_frame, bg=self.colors['card'])
         customer_frame.pack(fill='x', padx=15, pady=5)
         
-        customer_label = tk.Label(customer_frame, text=f"👤 {order['customer']} | 📞 {order['phone']}", 
-                                 font=('Microsoft YaHei UI', 11),
-                                 bg=self.colors['card'], fg=self.colors['text'])
-        customer_label.pack(anchor='w')
+        card['customer'] = tk.Label(customer_frame, font=('Microsoft YaHei UI', 11),
+                                    bg=self.colors['card'], fg=self.colors['text'])
+        card['customer'].pack(anchor='w')
         
-        address_label = tk.Label(customer_frame, text=f"📍 {order['address']}", 
-                                font=('Microsoft YaHei UI', 10),
-                                bg=self.colors['card'], fg=self.colors['text_light'])
-        address_label.pack(anchor='w')
+        card['address'] = tk.Label(customer_frame, font=('Microsoft YaHei UI', 10),
+                                   bg=self.colors['card'], fg=self.colors['text_light'])
+        card['address'].pack(anchor='w')
         
-        # Meal information
+        # Meal information (fixed number of lines, the card has a fixed height)
         meals_frame = tk.Frame(card_frame, bg=self.colors['background'], padx=10, pady=8)
         meals_frame.pack(fill='x', padx=15, pady=5)
         
-        for meal in order['meals']:
-            meal_item = tk.Label(meals_frame, 
-                               text=f"🍽️ {meal['name']} × {meal['quantity']} = ¥{meal['price'] * meal['quantity']:.2f}", 
-                               font=('Microsoft YaHei UI', 10),
-                               bg=self.colors['background'], fg=self.colors['text'],
-                               anchor='w')
+        card['meals'] = []
+        for _ in range(self.ORDER_CARD_MEAL_LINES):
+            meal_item = tk.Label(meals_frame, font=('Microsoft YaHei UI', 10),
+                                 bg=self.colors['background'], fg=self.colors['text'],
+                                 anchor='w')
             meal_item.pack(fill='x', pady=2)
+            card['meals'].append(meal_item)
         
         # Order total and action buttons
         bottom_frame = tk.Frame(card_frame, bg=self.colors['card'])
         bottom_frame.pack(fill='x', padx=15, pady=(5, 15))
         
         # Total
-        total_label = tk.Label(bottom_frame, text=f"Total: ¥{order['total']:.2f}", 
-                              font=('Microsoft YaHei UI', 12, 'bold'),
-                              bg=self.colors['card'], fg=self.colors['primary'])
-        total_label.pack(side='left')
+        card['total'] = tk.Label(bottom_frame, font=('Microsoft YaHei UI', 12, 'bold'),
+                                 bg=self.colors['card'], fg=self.colors['primary'])
+        card['total'].pack(side='left')
         
         # Payment method and type
-        payment_label = tk.Label(bottom_frame, text=f"{order['payment']} | {order['type']}", 
-                               font=('Microsoft YaHei UI', 9),
-                               bg=self.colors['card'], fg=self.colors['text_light'])
-        payment_label.pack(side='left', padx=(20, 0))
+        card['payment'] = tk.Label(bottom_frame, font=('Microsoft YaHei UI', 9),
+                                   bg=self.colors['card'], fg=self.colors['text_light'])
+        card['payment'].pack(side='left', padx=(20, 0))
         
         # Action buttons
-        actions_frame = tk.Frame(bottom_frame, bg=self.colors['card'])
-        actions_frame.pack(side='right')
+        card['actions'] = tk.Frame(bottom_frame, bg=self.colors['card'])
+        card['actions'].pack(side='right')
 
         # View details button
-        detail_btn = tk.Button(actions_frame, text="View Details",
-                              font=('Microsoft YaHei UI', 9),
-                              bg=self.colors['info'], fg=self.colors['white'],
-                              bd=0, padx=15, pady=5, cursor='hand2',
-                              command=lambda o=order: self.show_order_detail(o))
-        detail_btn.pack(side='right', padx=5)
+        card['detail'] = tk.Button(card['actions'], text="View Details",
+                                   font=('Microsoft YaHei UI', 9),
+                                   bg=self.colors['info'], fg=self.colors['white'],
+                                   bd=0, padx=15, pady=5, cursor='hand2')
+        card['detail'].pack(side='right', padx=5)
+        
+        # Note information
+        card['note_frame'] = tk.Frame(card_frame, bg=self.colors['light'], padx=10, pady=5)
+        card['note'] = tk.Label(card['note_frame'], font=('Microsoft YaHei UI', 9),
+                                bg=self.colors['light'], fg=self.colors['text'])
+        card['note'].pack(anchor='w')
+        
+        return card
+
+    def fill_order_card(self, card, order):
+        """Show an order on a (reused) order card"""
+        card['order'] = order
+        card['id'].config(text=f"#{order['id']}")
+        card['time'].config(text=order['create_time'])
+        
+        status_color = self.status_colors.get(order['status'], self.colors['info'])
+        card['status_frame'].config(bg=status_color)
+        card['status'].config(text=order['status'], bg=status_color)
+        
+        card['customer'].config(text=f"👤 {order['customer']} | 📞 {order['phone']}")
+        card['address'].config(text=f"📍 {order['address']}")
+        
+        meals = order['meals']
+        lines = [f"🍽️ {meal['name']} × {meal['quantity']} = ¥{meal['price'] * meal['quantity']:.2f}" for meal in meals]
+        if len(lines) > self.ORDER_CARD_MEAL_LINES:
+            # 超出的菜品合并为一行，完整内容见详情
+            hidden = len(lines) - self.ORDER_CARD_MEAL_LINES + 1
+            lines = lines[:self.ORDER_CARD_MEAL_LINES - 1] + [f"… {hidden} more dishes"]
+        for index, meal_item in enumerate(card['meals']):
+            meal_item.config(text=lines[index] if index < len(lines) else "")
+        
+        card['total'].config(text=f"Total: ¥{order['total']:.2f}")
+        card['payment'].config(text=f"{order['payment']} | {order['type']}")
+        card['detail'].config(command=lambda o=order: self.show_order_detail(o))
 
         # Dynamic add status action buttons
+        for widget in card['actions'].winfo_children():
+            if widget is not card['detail']:
+                widget.destroy()
+        actions_frame = card['actions']
         order_status = order.get('status', 'Unknown')
         order_type = order.get('type', 'Takeout')
 
@@ -364,18 +433,17 @@ class ModernOrderModule:
         elif order_status == 'Completed':
             self.add_action_button(actions_frame, "Archive", self.colors['info'],
                                    lambda o=order: self.update_order_status(o['id'], 'Archived'))
+        self.bind_order_scroll(card['actions'])
         
         # Note information
         if order.get('note'):
-            note_frame = tk.Frame(card_frame, bg=self.colors['light'], padx=10, pady=5)
-            note_frame.pack(fill='x', padx=15, pady=(0, 15))
-            
-            note_label = tk.Label(note_frame, text=f"📝 Note: {order['note']}", 
-                                 font=('Microsoft YaHei UI', 9),
-                                 bg=self.colors['light'], fg=self.colors['text'])
-            note_label.pack(anchor='w')
-        
-        return card_frame
+            note = " ".join(str(order['note']).split())
+            if len(note) > self.ORDER_CARD_NOTE_CHARS:
+                note = note[:self.ORDER_CARD_NOTE_CHARS - 1] + "…"
+            card['note'].config(text=f"📝 Note: {note}")
+            card['note_frame'].pack(fill='x', padx=15, pady=(0, 15))
+        else:
+            card['note_frame'].pack_forget()
 
     def add_action_button(self, parent, text, color, command):
         """Helper function, used to create standardized action buttons"""
@@ -483,6 +551,8 @@ Order Status: {order['status']}"""
         """Filter orders"""
         self.current_filter = status
         self.refresh_order_list()
+        if self.orders_canvas:
+            self.orders_canvas.yview_moveto(0)
         
         # Update filter button status display
         self.update_filter_buttons()
@@ -490,14 +560,13 @@ Order Status: {order['status']}"""
     def refresh_data(self):
         """Reload data from database and refresh entire UI"""
         # 1. Reload latest data from database
-        self.order_data = self.load_order_data()
-        
-        # 2. Update statistics card
-        self.update_statistics()
+        self.reload_orders()
         
-        # 3. Refresh order list
-        if hasattr(self, 'orders_container'):
+        # 2. Refresh order list (also updates the statistics cards)
+        if self.orders_canvas:
             self.refresh_order_list()
+        else:
+            self.update_statistics()
     
     def update_statistics(self):
         """Update statistics information"""
@@ -510,10 +579,17 @@ Order Status: {order['status']}"""
         
         # Count orders by status
         status_counts = {status: 0 for status in self.status_colors}
-        for order in self.order_data:
-            status = order.get('status', 'Unknown')
-            if status in status_counts:
-                status_counts[status] += 1
+        if hasattr(data_manager, 'count_orders_by_status') and not getattr(self, 'using_sample_data', False):
+            # Counts come straight from the status index
+            for raw_status, count in data_manager.count_orders_by_status().items():
+                status = 'Pending' if raw_status in ('Received', None) else raw_status
+                if status in status_counts:
+                    status_counts[status] += count
+        else:
+            for order in self.order_data:
+                status = order.get('status', 'Unknown')
+                if status in status_counts:
+                    status_counts[status] += 1
         # Debug: print status counts
         print(f"[Debug] Order statistics counts: {status_counts}")
         
@@ -750,42 +826,147 @@ Order Status: {order['status']}"""
         """Handle data change notification"""
         if event_type in ['order_added', 'order_updated']:
             # Refresh order data
-            self.order_data = self.load_order_data()
+            self.reload_orders()
             # If current displaying order interface, refresh display
-            if hasattr(self, 'order_list_frame'):
+            if self.orders_canvas:
                 self.refresh_order_list()
     
     def refresh_order_list(self):
-        """Refresh order list"""
-        # Reload order data
-        self.order_data = self.load_order_data()
-        
-        # Clear container (if exists)
-        if hasattr(self, 'orders_container') and self.orders_container:
-            for widget in self.orders_container.winfo_children():
-                widget.destroy()
-        
-        # Filter and search orders
-        filtered_orders = self.order_data
-        
-        # Apply status filter
-        if self.current_filter != "All":
-            filtered_orders = [order for order in self.order_data if order['status'] == self.current_filter]
-        
-        # Apply search
-        if hasattr(self, 'search_keyword') and self.search_keyword:
-            filtered_orders = [order for order in filtered_orders 
-                              if self.search_keyword.lower() in order.get('customer', '').lower() 
-                              or self.search_keyword in str(order['id'])
-                              or self.search_keyword.lower() in order.get('phone', '').lower()]
+        """Refresh order list: recount the filtered orders and rebind the visible cards"""
+        self.order_pages = {}
+        self.filtered_orders = None
+        search = getattr(self, 'search_keyword', '')
+        if getattr(self, 'using_sample_data', False) or not hasattr(data_manager, 'query_orders_page'):
+            # Sample data is filtered in memory
+            if not self.order_data:
+                self.order_data = self.load_order_data()
+            if self.current_filter == "All":
+                filtered_orders = self.order_data
+            else:
+                filtered_orders = [order for order in self.order_data if order['status'] == self.current_filter]
+            
+            # Apply search
+            if search:
+                filtered_orders = [order for order in filtered_orders 
+                                  if search.lower() in order.get('customer', '').lower() 
+                                  or search in str(order['id'])
+                                  or search.lower() in order.get('phone', '').lower()]
+            # 与分页查询一致，最新的订单在前
+            self.filtered_orders = sorted(filtered_orders, key=lambda order: order.get('create_time', ''), reverse=True)
+            self.order_total = len(filtered_orders)
+        else:
+            # Only the number of matching orders is needed up front, pages are read while scrolling
+            try:
+                _, self.order_total = data_manager.query_orders_page(0, 0, status=self.order_list_status(),
+                                                                     search=search or None)
+            except Exception as e:
+                print(f"Failed to count orders: {e}")
+                self.order_total = 0
         
-        # Create order card
-        if hasattr(self, 'orders_container') and self.orders_container:
-            for order in filtered_orders:
-                self.create_order_card(self.orders_container, order)
+        if self.orders_canvas and self.orders_canvas.winfo_exists():
+            for card in self.order_cards:
+                card['order'] = None
+            self.update_order_scrollregion()
+            self.render_order_cards()
         
         # Update statistics information
         self.update_statistics()
+
+    def order_list_status(self):
+        """Stored statuses of the current filter, None for all orders"""
+        return None if self.current_filter == "All" else self.raw_order_statuses(self.current_filter)
+
+    def load_order_page(self, page):
+        """Formatted orders of one page of the current list"""
+        offset = page * self.ORDER_PAGE_SIZE
+        if self.filtered_orders is not None:
+            return self.filtered_orders[offset:offset + self.ORDER_PAGE_SIZE]
+        try:
+            orders, _ = data_manager.query_orders_page(offset, self.ORDER_PAGE_SIZE, status=self.order_list_status(),
+                                                       search=getattr(self, 'search_keyword', '') or None)
+        except Exception as e:
+            print(f"Failed to load order page {page}: {e}")
+            return []
+        return [self.format_order(order) for order in orders]
+
+    def get_order_at(self, index):
+        """Order at a list position, reading its page on first use"""
+        page, position = divmod(index, self.ORDER_PAGE_SIZE)
+        orders = self.order_pages.get(page)
+        if orders is None:
+            orders = self.order_pages[page] = self.load_order_page(page)
+        return orders[position] if position < len(orders) else None
+
+    def update_order_scrollregion(self):
+        """Size the scroll area for all orders of the list, whether or not their cards exist"""
+        canvas = self.orders_canvas
+        height = self.order_total * self.ORDER_ROW_HEIGHT + 10
+        canvas.configure(scrollregion=(0, 0, max(canvas.winfo_width(), 1), height))
+        canvas.itemconfigure(self.empty_order_text, state='hidden' if self.order_total else 'normal')
+
+    def schedule_order_render(self):
+        """Rebind the visible cards once the current scroll or resize events are handled"""
+        if not self.render_pending and self.orders_canvas:
+            self.render_pending = True
+            self.orders_canvas.after_idle(self.render_order_cards)
+
+    def render_order_cards(self):
+        """Place pooled cards on the orders inside the viewport, creating cards only when the pool is too small"""
+        self.render_pending = False
+        canvas = self.orders_canvas
+        try:
+            if not canvas or not canvas.winfo_exists():
+                return
+            width = max(canvas.winfo_width() - 10, 200)
+            first = max(0, int(canvas.canvasy(0) // self.ORDER_ROW_HEIGHT))
+            count = max(canvas.winfo_height(), self.ORDER_ROW_HEIGHT) // self.ORDER_ROW_HEIGHT + 2
+            while len(self.order_cards) < count:
+                card = self.create_order_card(canvas)
+                card['item'] = canvas.create_window(5, 0, window=card['frame'], anchor='nw',
+                                                    width=width, height=self.ORDER_CARD_HEIGHT, state='hidden')
+                self.bind_order_scroll(card['frame'])
+                self.order_cards.append(card)
+            
+            for slot, card in enumerate(self.order_cards):
+                index = first + slot
+                order = self.get_order_at(index) if slot < count and index < self.order_total else None
+                if order is None:
+                    canvas.itemconfigure(card['item'], state='hidden')
+                    continue
+                if card['order'] is not order:
+                    self.fill_order_card(card, order)
+                canvas.coords(card['item'], 5, index * self.ORDER_ROW_HEIGHT + 5)
+                canvas.itemconfigure(card['item'], width=width, state='normal')
+            
+            # 只保留可见区域附近的页
+            first_page = first // self.ORDER_PAGE_SIZE
+            last_page = (first + count) // self.ORDER_PAGE_SIZE
+            for page in [p for p in self.order_pages if p < first_page - 1 or p > last_page + 1]:
+                del self.order_pages[page]
+        except tk.TclError:
+            pass  # Widget may have been destroyed, ignore error
+
+    def bind_order_scroll(self, widget):
+        """Scroll the order list with the mouse wheel over a widget and its children"""
+        widget.bind("<MouseWheel>", self.on_order_mousewheel)
+        widget.bind("<Button-4>", self.on_order_mousewheel)
+        widget.bind("<Button-5>", self.on_order_mousewheel)
+        for child in widget.winfo_children():
+            self.bind_order_scroll(child)
+
+    def on_order_mousewheel(self, event):
+        """Mouse wheel over the order list"""
+        try:
+            if self.orders_canvas and self.orders_canvas.winfo_exists():
+                if event.num == 4:
+                    delta = -1
+                elif event.num == 5:
+                    delta = 1
+                else:
+                    delta = int(-1*(event.delta/120))
+                self.orders_canvas.yview_scroll(delta, "units")
+        except tk.TclError:
+            pass  # Widget may have been destroyed, ignore error
     
     def update_title_frame(self):
         """Update title frame but keep breadcrumb navigation"""
@@ -915,40 +1096,39 @@ Order Status: {order['status']}"""
                     pass
     
     def create_order_list(self, parent):
-        """Create order list"""
+        """Create order list (a virtualized canvas, see render_order_cards)"""
         # Order list container
         list_frame = tk.Frame(parent, bg=self.colors['background'])
         list_frame.pack(fill='both', expand=True)
         
         # Scroll area
-        canvas = tk.Canvas(list_frame, bg=self.colors['background'], highlightthickness=0)
+        canvas = tk.Canvas(list_frame, bg=self.colors['background'], highlightthickness=0,
+                           yscrollincrement=40)
         scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=canvas.yview)
-        self.orders_container = tk.Frame(canvas, bg=self.colors['background'])
         
-        self.orders_container.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            self.schedule_order_render()
         
-        canvas.create_window((0, 0), window=self.orders_container, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        def on_resize(event):
+            self.update_order_scrollregion()
+            self.schedule_order_render()
+        
+        canvas.configure(yscrollcommand=on_scroll)
+        canvas.bind("<Configure>", on_resize)
         
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
-        # Initial display
-        self.refresh_order_list()
+        self.orders_canvas = canvas
+        self.order_cards = []
+        self.order_pages = {}
+        self.empty_order_text = canvas.create_text(20, 20, text="No orders", anchor='nw', state='hidden',
+                                                   font=('Microsoft YaHei UI', 12),
+                                                   fill=self.colors['text_light'])
         
         # Bind mouse wheel events
-        def on_mousewheel(event):
-            try:
-                if canvas.winfo_exists():
-                    canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-            except tk.TclError:
-                pass  # Widget may have been destroyed, ignore error
-        
-        canvas.bind("<MouseWheel>", on_mousewheel)
-        self.orders_container.bind("<MouseWheel>", on_mousewheel)
+        self.bind_order_scroll(canvas)
 
     def export_orders(self):
         """Export order data"""
@@ -1095,7 +1275,7 @@ Order Status: {order['status']}"""
                 cell.alignment = header_alignment
             
             # Get order data
-            orders = self.get_filtered_orders(status_filter)
+            orders = self.iter_export_orders(status_filter)
             
             # Add data
             for order in orders:
@@ -1150,7 +1330,7 @@ Order Status: {order['status']}"""
                 writer.writeheader()
                 
                 # Get order data
-                orders = self.get_filtered_orders(status_filter)
+                orders = self.iter_export_orders(status_filter)
                 
                 for order in orders:
                     # Process meal information
@@ -1202,7 +1382,7 @@ Order Status: {order['status']}"""
             story.append(Spacer(1, 20))
             
             # Get order data
-            orders = self.get_filtered_orders(status_filter)
+            orders = self.iter_export_orders(status_filter)
             
             # Create table data
             table_data = [["Order Number", "Customer Name", "Contact Phone", "Delivery Address", "Meal", "Total Amount", "Order Status", "Order Time"]]
@@ -1255,5 +1435,16 @@ Order Status: {order['status']}"""
         """Get filtered order data"""
         if status_filter == "All":
             return self.order_data
+        elif hasattr(data_manager, 'query_orders') and not getattr(self, 'using_sample_data', False):
+            return self.load_order_data(status_filter)
         else:
             return [order for order in self.order_data if order.get('status') == status_filter]
+
+    def iter_export_orders(self, status_filter: str):
+        """Orders to export, streamed from the data manager so long histories are not held in memory"""
+        if getattr(self, 'using_sample_data', False) or not hasattr(data_manager, 'iter_orders'):
+            yield from self.get_filtered_orders(status_filter)
+            return
+        status = None if status_filter == "All" else self.raw_order_statuses(status_filter)
+        for order in data_manager.iter_orders(status=status):
+            yield self.format_order(order)
@@ -34,6 +34,8 @@ except ImportError:
                 return []
             def add_order(self, order_data):
                 return f"ORD{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
+            def create_orders_batch(self, orders_data):
+                return [self.add_order(order_data) for order_data in orders_data]
             def register_module(self, module_type, instance):
                 pass
         data_manager = MockDataManager()
@@ -92,6 +94,10 @@ class ModernSalesModule:
         self.main_frame = None
         self.table_var = None  # Lazy initialization
         
+        # Meal cards are built once per grid and reused across category switches
+        self.meal_cards = {}            # 菜品编号 -> {'card', 'button', 'stock', 'entry'}
+        self.availability = {}          # 菜品编号 -> {'available', 'servings'}，来自数据层缓存
+        
     def load_meals_data(self):
         """Load meal data - only show available meals"""
         try:
@@ -111,10 +117,10 @@ class ModernSalesModule:
                 elif isinstance(is_available, int):
                     is_available = is_available == 1
                 
-                # Check if there is enough inventory for the meal
-                has_inventory = self.check_meal_inventory(meal)
-                
-                if is_available and has_inventory:
+                # 库存不足的菜品仍然显示，卡片按可售状态切换
+                if is_available:
+                    # 数据层返回只读快照记录，补全字段前先复制一份
+                    meal = dict(meal)
                     # Add default icons and descriptions for meals from the database, and ensure compatibility with all UI fields
                     # name field
                     if 'name' not in meal:
@@ -155,7 +161,7 @@ class ModernSalesModule:
                     
                     available_meals.append(meal)
             
-            print(f"✅ Sales module loaded {len(available_meals)} available and in-stock meals")
+            print(f"✅ Sales module loaded {len(available_meals)} available meals")
             return available_meals
             
         except Exception as e:
@@ -314,14 +320,12 @@ class ModernSalesModule:
         scrollbar.pack(side="right", fill="y")
         
         # Display meals
+        self.meal_cards = {}
+        self.availability = self.load_availability()
         self.display_meals()
         
     def display_meals(self):
-        """Display meals"""
-        # Clear existing meals
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        
+        """Display meals of the current category, reusing cards that were already built"""
         # Filter meals
         if self.current_category == "All":
             filtered_meals = self.meals_data
@@ -329,17 +333,16 @@ class ModernSalesModule:
             filtered_meals = [meal for meal in self.meals_data 
                             if meal.get('category') == self.current_category]
         
-        # Create meal cards (3-column layout)
-        row = 0
-        col = 0
-        for meal in filtered_meals:
-            meal_card = self.create_meal_card(self.scrollable_frame, meal)
-            meal_card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-            
-            col += 1
-            if col >= 3:  # 3 per row
-                col = 0
-                row += 1
+        # Show meal cards (3-column layout), hide the ones of other categories
+        shown = set()
+        for index, meal in enumerate(filtered_meals):
+            widgets = self.meal_cards.get(meal['id'])
+            meal_card = widgets['card'] if widgets else self.create_meal_card(self.scrollable_frame, meal)
+            meal_card.grid(row=index // 3, column=index % 3, padx=10, pady=10, sticky="nsew")
+            shown.add(meal['id'])
+        for meal_id, widgets in self.meal_cards.items():
+            if meal_id not in shown:
+                widgets['card'].grid_remove()
         
         # Configure column weights
         for i in range(3):
@@ -354,7 +357,7 @@ class ModernSalesModule:
         icon_label = tk.Label(card, text=meal.get('image', '🍽️'), 
                              font=('Segoe UI Emoji', 32),
                              bg=self.colors['background'])
-        icon_label.pack(pady=(15, 5))
+        icon_label.pack(pady=(10, 5))
         # Meal name
         name_label = tk.Label(card, text=meal.get('name', ''), 
                              font=self.fonts['heading'],
@@ -373,6 +376,10 @@ class ModernSalesModule:
                              justify='left',
                              height=1)
         desc_label.pack()
+        # Servings left (filled in by apply_availability)
+        stock_label = tk.Label(card, text="", font=self.fonts['small'],
+                               bg=self.colors['background'], fg=self.colors['text_secondary'])
+        stock_label.pack()
         # Price
         price = meal.get('price', 0)
         bottom_frame = tk.Frame(card, bg=self.colors['background'])
@@ -387,8 +394,55 @@ class ModernSalesModule:
                             bg=self.colors['primary'], fg="white", bd=0, padx=10, pady=3,
                             cursor="hand2", command=lambda m=meal: self.add_to_cart(m))
         add_btn.pack(side="right", padx=(0, 10))
+        self.meal_cards[meal.get('id')] = {'card': card, 'button': add_btn, 'stock': stock_label, 'entry': None}
+        self.apply_availability(meal.get('id'), self.availability.get(meal.get('id')))
         return card
 
+    def load_availability(self):
+        """Availability of every meal from the data manager's cache"""
+        if not hasattr(data_manager, 'menu_availability'):
+            return {}
+        try:
+            return data_manager.menu_availability()
+        except Exception as e:
+            print(f"Could not load menu availability: {e}")
+            return {}
+
+    def apply_availability(self, meal_id, entry):
+        """Toggle a meal card between orderable and sold out"""
+        widgets = self.meal_cards.get(meal_id)
+        entry = entry or {'available': True, 'servings': None}
+        if not widgets or widgets['entry'] == entry:
+            return
+        widgets['entry'] = entry
+        servings = entry.get('servings')
+        if entry.get('available'):
+            widgets['button'].config(state='normal', text="Add to Cart", bg=self.colors['primary'], cursor="hand2")
+            widgets['stock'].config(text="" if servings is None else f"{servings} left",
+                                    fg=self.colors['warning'] if servings is not None and servings <= 5 else self.colors['text_secondary'])
+        else:
+            widgets['button'].config(state='disabled', text="Sold Out", bg=self.colors['border'], cursor="")
+            widgets['stock'].config(text="Out of stock", fg=self.colors['danger'])
+
+    def refresh_availability(self, events=None):
+        """Toggle the cards named in pushed availability events (called by data manager); reload all without events"""
+        if events is None:
+            changed = self.load_availability()
+        else:
+            changed = {}
+            for event in events:
+                changed.update((event.payload or {}).get('meals', {}))
+        try:
+            for meal_id, entry in changed.items():
+                if self.availability.get(meal_id) != entry:
+                    self.apply_availability(meal_id, entry)
+        except tk.TclError:
+            print("⚠️ Sales module UI not active, skipping availability update")
+        if events is None:
+            self.availability = changed
+        else:
+            self.availability.update(changed)
+
     def create_cart_area(self, parent):
         """Create the shopping cart area"""
         cart_frame = tk.Frame(parent, bg=self.colors['surface'], width=350)
@@ -485,6 +539,9 @@ class ModernSalesModule:
         
     def add_to_cart(self, meal):
         """Add a meal to the shopping cart"""
+        if not self.check_meal_inventory(meal):
+            messagebox.showwarning("Sold Out", f"Not enough ingredients left for {meal['name']}.", parent=self.parent_frame)
+            return
         # Check if it already exists
         for item in self.cart_items:
             if item['id'] == meal['id']:
@@ -515,6 +572,9 @@ class ModernSalesModule:
         """Update meal quantity"""
         for item in self.cart_items:
             if item['id'] == meal_id:
+                if change > 0 and not self.check_meal_inventory({'id': meal_id}):
+                    messagebox.showwarning("Sold Out", f"Not enough ingredients left for {item['name']}.", parent=self.parent_frame)
+                    return
                 item['quantity'] += change
                 if item['quantity'] <= 0:
                     self.remove_from_cart(meal_id)
@@ -753,25 +813,28 @@ class ModernSalesModule:
             
             # On success
             if random.random() > 0.1: # 90% success rate
-                created_order_ids = []
-                
-                # Create separate order for each cart item
-                for cart_item in self.cart_items:
-                    order_data = {
-                        "meal_id": cart_item['id'],
-                        "customer_id": 'GUEST',
-                        "quantity": cart_item['quantity'],
-                        "note": f"Table: {self.current_table}, Payment: {payment_method}",
-                        "status": "Received"
-                    }
-                    # Use data_manager to add the order
-                    order_id = data_manager.add_order(order_data)
-                    if order_id:
-                        created_order_ids.append(order_id)
-                        print(f"✅ Created order {order_id} for {cart_item['name']} x{cart_item['quantity']}")
+                # One order per cart item, created, persisted and notified as a single checkout
+                orders_data = [{
+                    "meal_id": cart_item['id'],
+                    "customer_id": 'GUEST',
+                    "quantity": cart_item['quantity'],
+                    "note": f"Table: {self.current_table}, Payment: {payment_method}",
+                    "status": "Received"
+                } for cart_item in self.cart_items]
+                try:
+                    created_order_ids = data_manager.create_orders_batch(orders_data)
+                except Exception as e:
+                    print(f"❌ Failed to create orders: {e}")
+                    created_order_ids = []
+                if not created_order_ids:
+                    # 订单未写入（批量创建已整体回滚），不能按支付成功处理
+                    dialog.after(0, self._handle_payment_error, dialog, "Order could not be saved", overlay, progress)
+                    return
+                for order_id, cart_item in zip(created_order_ids, self.cart_items):
+                    print(f"✅ Created order {order_id} for {cart_item['name']} x{cart_item['quantity']}")
                 
                 # Update UI on the main thread with all order IDs
-                combined_order_id = ", ".join(created_order_ids) if created_order_ids else "UNKNOWN"
+                combined_order_id = ", ".join(created_order_ids)
                 dialog.after(0, self._handle_payment_success, dialog, combined_order_id, payment_method, overlay, progress)
             # On failure
             else:
@@ -928,6 +991,11 @@ class ModernSalesModule:
         print("Sales module: Refreshing meals data...")
         self.meals_data = self.load_meals_data()
         self.categories = list(set(meal.get('category', 'Other') for meal in self.meals_data))
+        # 菜品信息可能已改变，重建卡片
+        for widgets in self.meal_cards.values():
+            widgets['card'].destroy()
+        self.meal_cards = {}
+        self.availability = self.load_availability()
         self.display_meals()
         
     def refresh_data(self):
@@ -941,17 +1009,13 @@ class ModernSalesModule:
             print(f"❌ Sales module data refresh failed: {e}")
 
     def check_meal_inventory(self, meal):
-        """Check if there is enough inventory to make a meal."""
-        # If inventory module is not available, assume there is enough stock
-        if not self.inventory_module or not hasattr(self.inventory_module, 'get_inventory_status_for_meal'):
+        """Check if there is enough inventory for one more serving of a meal (counting the cart)."""
+        entry = self.availability.get(meal.get('id'))
+        if not entry:
+            # Meals whose ingredients are not tracked in stock can always be ordered
             return True
-            
-        try:
-            # Check inventory status for the given meal
-            # This requires the inventory module to have a specific method.
-            is_sufficient, _ = self.inventory_module.get_inventory_status_for_meal(meal['name'])
-            return is_sufficient
-        except Exception as e:
-            # If there's an error (e.g., recipe not found), assume it's not available
-            print(f"Could not check inventory for {meal.get('name', 'Unknown Meal')}: {e}")
+        if not entry.get('available'):
             return False
+        servings = entry.get('servings')
+        in_cart = sum(item['quantity'] for item in self.cart_items if item['id'] == meal.get('id'))
+        return servings is None or in_cart < servings
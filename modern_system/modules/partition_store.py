@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Partition Store
+Month partitions for time-ordered collections (orders, finance)
+<collection>/YYYY-MM.json holds the records of one month, records without a
+usable date live in <collection>/undated.json. Old months are moved to
+<collection>/archive/YYYY-MM.json.gz and stay readable from there
+"""
+
+import datetime
+import gzip
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from .json_stream import iter_json_array
+except ImportError:
+    from json_stream import iter_json_array
+
+UNDATED = 'undated'
+_MONTH = re.compile(r'^\d{4}-\d{2}$')
+
+
+def month_key(value: Any) -> Optional[str]:
+    """YYYY-MM of an ISO date/time string, None if it has none"""
+    text = str(value or '')[:7]
+    return text if _MONTH.match(text) else None
+
+
+def shift_month(month: str, delta: int) -> str:
+    """The month delta months after (or before) a YYYY-MM month"""
+    year, number = divmod(int(month[:4]) * 12 + int(month[5:7]) - 1 + delta, 12)
+    return f"{year:04d}-{number + 1:02d}"
+
+
+def current_month() -> str:
+    """YYYY-MM of today"""
+    return datetime.date.today().strftime('%Y-%m')
+
+
+def in_month_range(month: str, start: Any = None, end: Any = None) -> bool:
+    """Whether a partition may hold records dated start <= date < end (undated ones always may)"""
+    if month == UNDATED:
+        return True
+    first = month_key(start) if start else None
+    last = month_key(end) if end else None
+    return not ((first and month < first) or (last and month > last))
+
+
+def partition_of(record: Dict, fields: Iterable[str]) -> str:
+    """Partition of a record: the month of its first date field, or UNDATED"""
+    for field in fields:
+        month = month_key(record.get(field))
+        if month:
+            return month
+    return UNDATED
+
+
+class PartitionStore:
+    """Monthly JSON files of one collection with a gzip archive tier"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.archive_directory = os.path.join(directory, 'archive')
+        self._files = None              # 月份 -> 文件路径（热数据优先于归档）
+
+    def exists(self) -> bool:
+        """Whether the collection has been partitioned"""
+        return os.path.isdir(self.directory)
+
+    def hot_path(self, month: str) -> str:
+        return os.path.join(self.directory, f"{month}.json")
+
+    def archive_path(self, month: str) -> str:
+        return os.path.join(self.archive_directory, f"{month}.json.gz")
+
+    def files(self) -> Dict[str, str]:
+        """Month -> file of every partition, scanned once and then kept up to date"""
+        if self._files is None:
+            files = {}
+            for directory, suffix in ((self.archive_directory, '.json.gz'), (self.directory, '.json')):
+                if not os.path.isdir(directory):
+                    continue
+                for filename in os.listdir(directory):
+                    month = filename[:-len(suffix)]
+                    if filename.endswith(suffix) and (month == UNDATED or _MONTH.match(month)):
+                        files[month] = os.path.join(directory, filename)
+            self._files = files
+        return self._files
+
+    def months(self, start: Any = None, end: Any = None) -> List[str]:
+        """Stored months overlapping start <= date < end (undated records always included)"""
+        return [month for month in sorted(self.files()) if in_month_range(month, start, end)]
+
+    def signature(self, month: str) -> Optional[tuple]:
+        """(mtime, size, inode) of a month's file as it is on disk now, None if it has none"""
+        for path in (self.hot_path(month), self.archive_path(month)):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            return stat.st_mtime_ns, stat.st_size, stat.st_ino
+        return None
+
+    def fingerprint(self) -> Dict[str, int]:
+        """Month -> modification time of every partition, archiving keeps the time"""
+        result = {}
+        for month in sorted(self.files()):
+            signature = self.signature(month)
+            if signature:
+                result[month] = signature[0]
+        return result
+
+    def read(self, month: str) -> Tuple[List[Dict], Optional[tuple]]:
+        """Records of a month and the signature of the file they came from"""
+        path = self.files().get(month)
+        if not path:
+            return [], None
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as f:
+            raw = f.read()
+        records = json.loads(raw.decode('utf-8'))
+        return [r for r in records if isinstance(r, dict)], self.signature(month)
+
+    def iter_records(self, month: str) -> Iterator[Dict]:
+        """Stream the records of a month from its file without reading it whole"""
+        path = self.files().get(month)
+        if not path:
+            return
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for record in iter_json_array(f):
+                if isinstance(record, dict):
+                    yield record
+
+    def write(self, month: str, records: List[Dict], fsync: bool = False) -> tuple:
+        """Atomically write a month as hot JSON (replacing any archived copy), returns its signature"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.hot_path(month)
+        temp_file = f"{path}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_file, path)
+        if os.path.exists(self.archive_path(month)):
+            # 改动过的归档月份重新成为热数据，下次归档时再压缩
+            os.remove(self.archive_path(month))
+        self.files()[month] = path
+        return self.signature(month)
+
+    def remove(self, month: str):
+        """Delete a month that no longer has records"""
+        for path in (self.hot_path(month), self.archive_path(month)):
+            if os.path.exists(path):
+                os.remove(path)
+        self.files().pop(month, None)
+
+    def archive(self, before: str) -> List[str]:
+        """Compress hot months older than before (YYYY-MM) into the archive tier"""
+        archived = []
+        for month, path in sorted(self.files().items()):
+            if month == UNDATED or month >= before or path.endswith('.gz'):
+                continue
+            os.makedirs(self.archive_directory, exist_ok=True)
+            target = self.archive_path(month)
+            stat = os.stat(path)
+            with open(path, 'rb') as source, gzip.open(f"{target}.tmp", 'wb') as f:
+                f.write(source.read())
+            # 保留修改时间，依赖它的汇总指纹在归档后仍然有效
+            os.utime(f"{target}.tmp", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.replace(f"{target}.tmp", target)
+            os.remove(path)
+            self.files()[month] = target
+            archived.append(month)
+        return archived
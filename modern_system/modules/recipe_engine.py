@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recipe Engine
+Recipes compiled against the inventory for stock deduction and servings
+Every meal id maps to a vector of (inventory column, quantity per serving),
+built once from recipes.json, or from the meal's own ingredient list when it
+has no recipe. A whole basket is one pass over the meal x ingredient matrix,
+vectorized with NumPy when it is installed and plain loops otherwise
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 没有配方的菜品按食材名称使用的每份标准用量
+DEFAULT_CONSUMPTION = {
+    'tomato': 0.2,      # 200g per dish
+    'beef': 0.15,       # 150g per dish
+    'noodles': 0.1,     # 100g per dish
+    'egg': 0.05,        # 50g per dish
+    'rice': 0.08,       # 80g per dish
+    'chicken': 0.15,    # 150g per dish
+    'pork': 0.15,       # 150g per dish
+    'fish': 0.2,        # 200g per dish
+    'potato': 0.1,      # 100g per dish
+    'onion': 0.05,      # 50g per dish
+    'carrot': 0.05,     # 50g per dish
+    'cabbage': 0.1,     # 100g per dish
+    'oil': 0.02,        # 20ml per dish
+    'salt': 0.005,      # 5g per dish
+    'soy sauce': 0.01,  # 10ml per dish
+}
+DEFAULT_QUANTITY = 0.1
+
+
+def ingredient_keys(name: Any) -> List[str]:
+    """Lookup keys of an ingredient name: the normalized name, then its singular forms"""
+    key = str(name or '').strip().lower()
+    keys = [key]
+    if key.endswith('es'):
+        keys.append(key[:-2])
+    if key.endswith('s'):
+        keys.append(key[:-1])
+    return keys
+
+
+def recipe_ingredients(recipe: Dict) -> List[Tuple[str, float]]:
+    """(ingredient name, quantity per serving) pairs of a recipes.json entry (list or dict form)"""
+    ingredients = recipe.get('ingredients')
+    if isinstance(ingredients, dict):
+        pairs = ingredients.items()
+    else:
+        pairs = ((i.get('ingredient_name'), i.get('quantity_per_serving', 0))
+                 for i in ingredients or [] if isinstance(i, dict))
+    result = []
+    for name, quantity in pairs:
+        try:
+            quantity = float(quantity or 0)
+        except (TypeError, ValueError):
+            continue
+        if name and quantity > 0:
+            result.append((str(name), quantity))
+    return result
+
+
+class RecipeBook:
+    """Meal -> inventory consumption vectors compiled from recipes, meals and inventory
+
+    Columns are inventory items in item_ids order; stock levels are passed in by
+    the caller, so the book stays valid while only stock changes.
+    """
+
+    def __init__(self, inventory: Iterable[Dict], meals: Iterable[Dict], recipes: Iterable[Dict]):
+        self.item_ids = []
+        self.lookup = {}                # 食材键 -> 列号
+        self.meal_ids = []
+        self.rows = {}                  # 菜品编号 -> 行号
+        self.names = {}                 # 菜品编号 -> 名称
+        self.vectors = {}               # 菜品编号 -> ((列号, 每份用量), ...)
+        self.ingredients = {}           # 菜品编号 -> {食材名称: 每份用量}，包含库存中没有的食材
+        self.dependents = {}            # 列号 -> 用到该食材的菜品编号（反向索引）
+        self.matrix = None
+        self.compile_items(inventory)
+        self.compile_meals(meals, recipes)
+
+    def compile_items(self, inventory: Iterable[Dict]):
+        """Assign a column to every inventory item, exact names win over singular forms"""
+        items = [item for item in inventory if isinstance(item, dict) and item.get('id')]
+        self.item_ids = [item['id'] for item in items]
+        for depth in range(3):
+            for column, item in enumerate(items):
+                keys = ingredient_keys(item.get('name'))
+                if depth < len(keys):
+                    self.lookup.setdefault(keys[depth], column)
+
+    def column(self, ingredient: str) -> Optional[int]:
+        """Inventory column of an ingredient name, None if it is not kept in stock"""
+        for key in ingredient_keys(ingredient):
+            if key in self.lookup:
+                return self.lookup[key]
+        return None
+
+    def compile_meals(self, meals: Iterable[Dict], recipes: Iterable[Dict]):
+        """Build the consumption vector of every meal and recipe"""
+        menu = {meal['id']: meal for meal in meals if isinstance(meal, dict) and meal.get('id')}
+        by_meal = {}
+        for recipe in recipes:
+            if not isinstance(recipe, dict) or not recipe.get('meal_id'):
+                continue
+            meal = menu.get(recipe['meal_id'])
+            if meal and meal.get('name') and recipe.get('meal_name') and \
+                    ingredient_keys(meal['name'])[0] != ingredient_keys(recipe['meal_name'])[0]:
+                # 配方编号指向了另一道菜，沿用菜单中的食材列表
+                print(f"⚠️ Recipe {recipe['meal_id']} is for {recipe['meal_name']}, "
+                      f"menu has {meal['name']}; using the menu ingredients")
+                continue
+            by_meal[recipe['meal_id']] = (recipe.get('meal_name'), recipe_ingredients(recipe))
+
+        for meal_id, meal in menu.items():
+            if meal_id not in by_meal:
+                pairs = [(str(name), DEFAULT_CONSUMPTION.get(ingredient_keys(name)[0], DEFAULT_QUANTITY))
+                         for name in meal.get('ingredients') or [] if name]
+                by_meal[meal_id] = (meal.get('name'), pairs)
+            else:
+                by_meal[meal_id] = (meal.get('name') or by_meal[meal_id][0], by_meal[meal_id][1])
+
+        for meal_id, (name, pairs) in by_meal.items():
+            ingredients, vector = {}, {}
+            for ingredient, quantity in pairs:
+                ingredients[ingredient] = ingredients.get(ingredient, 0) + quantity
+                column = self.column(ingredient)
+                if column is not None:
+                    vector[column] = vector.get(column, 0) + quantity
+            self.rows[meal_id] = len(self.meal_ids)
+            self.meal_ids.append(meal_id)
+            self.names[meal_id] = name or meal_id
+            self.ingredients[meal_id] = ingredients
+            self.vectors[meal_id] = tuple(sorted(vector.items()))
+            for column in vector:
+                self.dependents.setdefault(column, []).append(meal_id)
+
+        if np is not None:
+            self.matrix = np.zeros((len(self.meal_ids), len(self.item_ids)))
+            for meal_id, vector in self.vectors.items():
+                for column, quantity in vector:
+                    self.matrix[self.rows[meal_id], column] = quantity
+
+    # ==================== 计算 ====================
+    def counts(self, basket: Dict[str, float]):
+        """Servings per matrix row of a {meal id: servings} basket, unknown meals ignored"""
+        rows = [0.0] * len(self.meal_ids)
+        for meal_id, servings in basket.items():
+            row = self.rows.get(meal_id)
+            if row is not None:
+                rows[row] += servings
+        return rows
+
+    def requirements(self, basket: Dict[str, float]) -> List[float]:
+        """Total quantity per inventory column needed for a basket"""
+        counts = self.counts(basket)
+        if np is not None:
+            return (np.asarray(counts) @ self.matrix).tolist() if self.item_ids else []
+        totals = [0.0] * len(self.item_ids)
+        for meal_id, row in self.rows.items():
+            if counts[row]:
+                for column, quantity in self.vectors[meal_id]:
+                    totals[column] += quantity * counts[row]
+        return totals
+
+    def meal_costs(self, basket: Dict[str, float], unit_costs: Sequence[float]) -> Dict[str, float]:
+        """{meal id: cost of its servings in the basket} given a cost per unit of every column"""
+        counts = self.counts(basket)
+        if np is not None:
+            costs = (self.matrix @ np.asarray(unit_costs, dtype=float)) * np.asarray(counts) \
+                if self.item_ids else np.zeros(len(counts))
+            return {meal_id: float(costs[row]) for meal_id, row in self.rows.items() if counts[row]}
+        return {meal_id: counts[row] * sum(quantity * unit_costs[column] for column, quantity in self.vectors[meal_id])
+                for meal_id, row in self.rows.items() if counts[row]}
+
+    def servings(self, stock: Sequence[float], meal_ids: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """{meal id: whole servings the stock allows}, meals using no stocked ingredient are left out
+
+        meal_ids limits the computation to those meals (walking their vectors only).
+        """
+        if meal_ids is not None:
+            return {meal_id: self.meal_servings(meal_id, stock) for meal_id in meal_ids if self.vectors.get(meal_id)}
+        if np is not None:
+            if not self.meal_ids or not self.item_ids:
+                return {}
+            available = np.maximum(np.asarray(stock, dtype=float), 0)
+            used = self.matrix > 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # 容差避免 0.6 / 0.2 这类浮点误差少算一份
+                ratios = np.where(used, np.floor(available / self.matrix + 1e-9), np.inf)
+            possible = ratios.min(axis=1)
+            return {meal_id: int(possible[row]) for meal_id, row in self.rows.items() if used[row].any()}
+        return {meal_id: self.meal_servings(meal_id, stock) for meal_id, vector in self.vectors.items() if vector}
+
+    def meal_servings(self, meal_id: str, stock: Sequence[float]) -> int:
+        """Whole servings of one meal the stock allows"""
+        return int(min(max(stock[column], 0) / quantity + 1e-9 for column, quantity in self.vectors[meal_id]))
+
+    def same_layout(self, other: Optional['RecipeBook']) -> bool:
+        """Whether another book has the same columns and vectors (servings computed with it stay valid)"""
+        return other is self or (other is not None and other.item_ids == self.item_ids and other.vectors == self.vectors)
+
+
+class ServingsTable:
+    """Possible servings per meal, cached and updated for the meals whose ingredients changed"""
+
+    def __init__(self):
+        self.book = None
+        self.stock = []
+        self.servings = {}
+
+    def update(self, book: RecipeBook, stock: Sequence[float]) -> Set[str]:
+        """Bring the table up to date with the current stock levels, returns the meals whose servings changed"""
+        stock = list(stock)
+        if not book.same_layout(self.book):
+            # 配方或库存条目变化，全部重新计算，所有菜品都视为已变化
+            changed = set(self.servings) | set(book.meal_ids)
+            self.servings = book.servings(stock)
+        else:
+            # 只重新计算库存发生变化的食材所影响的菜品
+            affected = set()
+            for column, (old, new) in enumerate(zip(self.stock, stock)):
+                if old != new:
+                    affected.update(book.dependents.get(column, ()))
+            changed = set()
+            for meal_id, servings in book.servings(stock, affected).items():
+                if self.servings.get(meal_id) != servings:
+                    self.servings[meal_id] = servings
+                    changed.add(meal_id)
+        self.book, self.stock = book, stock
+        return changed
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Read-Write Lock
+Many threads may read shared data at once while a single writer mutates it
+Writers are preferred so a steady stream of readers cannot starve them
+"""
+
+from contextlib import contextmanager
+from threading import Condition, Lock, get_ident
+
+
+class ReadWriteLock:
+    """Re-entrant reader-writer lock; the writing thread may also take the read lock"""
+
+    def __init__(self):
+        self._cond = Condition(Lock())
+        self._readers = {}          # 线程ID -> 读锁重入次数
+        self._writer = None
+        self._writer_depth = 0
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        """Block until no writer holds or waits for the lock"""
+        me = get_ident()
+        with self._cond:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers[me] = 1
+
+    def release_read(self):
+        me = get_ident()
+        with self._cond:
+            depth = self._readers[me] - 1
+            if depth:
+                self._readers[me] = depth
+                return
+            del self._readers[me]
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        """Block until every reader and any other writer has released the lock"""
+        me = get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if me in self._readers:
+                # 读锁升级为写锁会与其他读者互相等待
+                raise RuntimeError("Cannot upgrade a read lock to a write lock")
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._writer_depth -= 1
+            if self._writer_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        """Hold the lock for reading"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """Hold the lock for writing"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
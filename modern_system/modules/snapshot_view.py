@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Snapshot Views
+Immutable, versioned views of DataManager collections
+A view is published once per change of its collection and handed out without
+copying, so UI code can iterate, slice and filter it while writes continue
+"""
+
+import copy
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, List, Optional
+
+
+class FrozenRecord(dict):
+    """Read-only record inside a snapshot (still a dict for isinstance checks and JSON)"""
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Snapshot records are read-only, change data through DataManager")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def copy(self) -> Dict:
+        """Mutable deep copy of the record"""
+        return thaw(self)
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return dict, (thaw(self),)
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of a record value: dicts become FrozenRecord, lists become tuples"""
+    if isinstance(value, FrozenRecord):
+        return value
+    if isinstance(value, dict):
+        return FrozenRecord((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable copy of a frozen value"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return copy.copy(value)
+
+
+class SnapshotView(Sequence):
+    """Immutable sequence of frozen records from one version of a collection
+
+    Slices share the underlying tuple, so slicing is O(1).
+    """
+
+    __slots__ = ('_records', '_start', '_stop', 'name', 'version')
+
+    def __init__(self, records: tuple, version: int = 0, name: str = '',
+                 start: int = 0, stop: Optional[int] = None):
+        self._records = records
+        self._start = start
+        self._stop = len(records) if stop is None else stop
+        self.name = name
+        self.version = version
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return SnapshotView(self._records, self.version, self.name,
+                                    self._start + start, self._start + max(start, stop))
+            return SnapshotView(tuple(self[i] for i in range(start, stop, step)), self.version, self.name)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("snapshot index out of range")
+        return self._records[self._start + index]
+
+    def __iter__(self):
+        if self._start == 0 and self._stop == len(self._records):
+            return iter(self._records)
+        return (self._records[i] for i in range(self._start, self._stop))
+
+    def __repr__(self):
+        return f"SnapshotView({self.name!r}, version={self.version}, records={len(self)})"
+
+    def filter(self, predicate: Callable[[Dict], bool]) -> 'SnapshotView':
+        """Records matching a predicate, as a view of the same version"""
+        return SnapshotView(tuple(record for record in self if predicate(record)), self.version, self.name)
+
+    def where(self, **fields) -> 'SnapshotView':
+        """Records whose fields equal the given values, e.g. view.where(status='Completed')"""
+        items = fields.items()
+        return self.filter(lambda record: all(record.get(key) == value for key, value in items))
+
+    def copy(self) -> List[Dict]:
+        """Mutable list of mutable record copies (for legacy code that edits results)"""
+        return [thaw(record) for record in self]
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite Storage Engine
+Persists DataManager collections to a local SQLite database (WAL mode)
+Each collection is a table with indexed key columns plus the full record as JSON
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+from threading import Lock
+
+try:
+    from .data_journal import apply_update
+    from .partition_store import PartitionStore
+except ImportError:
+    from data_journal import apply_update
+    from partition_store import PartitionStore
+
+# 集合名称 -> (表名, 索引列 -> 记录字段)
+TABLES = {
+    'orders': ('orders', {'order_date': 'order_date', 'status': 'status',
+                          'customer_id': 'customer_id', 'meal_id': 'meal_id'}),
+    'finance': ('finance', {'date': 'date', 'type': 'type', 'order_id': 'order_id'}),
+    'inventory': ('inventory', {'name': 'name', 'category': 'category'}),
+    'customers': ('customers', {'name': 'name', 'phone': 'phone'}),
+    'meals': ('meals', {'name': 'name', 'category': 'category'}),
+    'employees': ('employees', {'name': 'name', 'department': 'department'})
+}
+
+# 需要建立索引的列（id 不设唯一约束，历史数据中存在同秒生成的重复编号）
+INDEXED_COLUMNS = {
+    'orders': ['id', 'order_date', 'status', 'customer_id'],
+    'finance': ['id', 'date', 'type', 'order_id'],
+    'inventory': ['id', 'name'],
+    'customers': ['id', 'name'],
+    'meals': ['id', 'name'],
+    'employees': ['id']
+}
+
+# 订单日期排序键，与 DataManager 的日期索引一致：order_date 缺失时用 create_time，空格换成 T
+ORDER_DATE_KEY = "REPLACE(COALESCE(NULLIF(order_date, ''), json_extract(data, '$.create_time'), ''), ' ', 'T')"
+
+# 订单搜索匹配的字段，与 DataManager.order_matches 一致
+ORDER_SEARCH_FIELDS = (
+    "id",
+    "COALESCE(json_extract(data, '$.customer_name'), json_extract(data, '$.table_number'))",
+    "COALESCE(json_extract(data, '$.customer_phone'), json_extract(data, '$.phone'))"
+)
+
+# 表达式索引，按日期排序和按状态分页时使用
+EXPRESSION_INDEXES = {
+    'idx_orders_date_key': f'orders ({ORDER_DATE_KEY}, seq)',
+    'idx_orders_status_date_key': f'orders (status, {ORDER_DATE_KEY}, seq)'
+}
+
+# JSON数据文件，供迁移使用
+JSON_FILES = {
+    'orders': 'orders.json',
+    'finance': 'finance.json',
+    'inventory': 'inventory.json',
+    'customers': 'customers.json',
+    'meals': 'meals.json',
+    'employees': 'employees.json'
+}
+
+
+class SqliteStorage:
+    """SQLite backend used by DataManager when backend is 'sqlite'"""
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._lock = Lock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.create_tables()
+
+    def create_tables(self):
+        """Create tables and indexes if they do not exist"""
+        with self._lock, self.conn:
+            for name, (table, columns) in TABLES.items():
+                column_sql = ''.join(f', {column} TEXT' for column in columns)
+                self.conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS {table} '
+                    f'(seq INTEGER PRIMARY KEY, id TEXT{column_sql}, data TEXT NOT NULL)')
+                for column in INDEXED_COLUMNS[name]:
+                    self.conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})')
+            for index, target in EXPRESSION_INDEXES.items():
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {target}')
+
+    def _row_values(self, name: str, record: Dict) -> tuple:
+        """Build the column values for a record"""
+        columns = TABLES[name][1]
+        values = [record.get('id')]
+        for field in columns.values():
+            value = record.get(field)
+            values.append(None if value is None else str(value))
+        values.append(json.dumps(record, ensure_ascii=False))
+        return tuple(values)
+
+    def _insert_sql(self, name: str) -> str:
+        """Insert statement for a collection"""
+        table, columns = TABLES[name]
+        names = ['id'] + list(columns) + ['data']
+        placeholders = ', '.join('?' for _ in names)
+        return f'INSERT INTO {table} ({", ".join(names)}) VALUES ({placeholders})'
+
+    def _update_sql(self, name: str) -> str:
+        """Update statement addressing a row by its seq"""
+        table, columns = TABLES[name]
+        assignments = ', '.join(f'{column} = ?' for column in ['id'] + list(columns) + ['data'])
+        return f'UPDATE {table} SET {assignments} WHERE seq = ?'
+
+    def is_empty(self) -> bool:
+        """Whether no collection holds any rows yet"""
+        with self._lock:
+            for table, _ in TABLES.values():
+                if self.conn.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone():
+                    return False
+            return True
+
+    def data_version(self) -> int:
+        """Counter that changes whenever another connection commits to the database"""
+        with self._lock:
+            return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def load(self, name: str) -> List[Dict]:
+        """Load all records of a collection in insertion order"""
+        table = TABLES[name][0]
+        with self._lock:
+            rows = self.conn.execute(f'SELECT data FROM {table} ORDER BY seq').fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_records(self, name: str, chunk_size: int = 500) -> Iterator[Dict]:
+        """Stream the records of a collection in insertion order, chunk_size rows at a time
+
+        Uses its own connection, so the shared one is not held while the caller
+        consumes the records; in WAL mode it reads a consistent snapshot.
+        """
+        table = TABLES[name][0]
+        conn = sqlite3.connect(self.db_file)
+        try:
+            cursor = conn.execute(f'SELECT data FROM {table} ORDER BY seq')
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield json.loads(row[0])
+        finally:
+            conn.close()
+
+    def apply_ops(self, ops: List[Dict]):
+        """Apply journal-style record operations in a single transaction"""
+        with self._lock, self.conn:
+            for op in ops:
+                name = op.get('collection')
+                if name not in TABLES:
+                    continue
+                table = TABLES[name][0]
+                kind = op.get('op')
+                if kind == 'insert':
+                    self.conn.execute(self._insert_sql(name), self._row_values(name, op['record']))
+                    continue
+                # 与内存中的行为一致：只作用于第一条匹配的记录
+                row = self.conn.execute(f'SELECT seq, data FROM {table} WHERE id = ? ORDER BY seq LIMIT 1',
+                                        (op['id'],)).fetchone()
+                if not row:
+                    continue
+                if kind == 'update':
+                    # 其他终端可能已修改该行，带增量的字段在当前值上累加
+                    record = json.loads(row[1])
+                    apply_update(record, op, rebase=True)
+                    self.conn.execute(self._update_sql(name), self._row_values(name, record) + (row[0],))
+                elif kind == 'delete':
+                    self.conn.execute(f'DELETE FROM {table} WHERE seq = ?', (row[0],))
+
+    def replace_all(self, name: str, records: List[Dict]):
+        """Replace the whole content of a collection"""
+        table = TABLES[name][0]
+        with self._lock, self.conn:
+            self.conn.execute(f'DELETE FROM {table}')
+            self.conn.executemany(self._insert_sql(name),
+                                  [self._row_values(name, r) for r in records if isinstance(r, dict)])
+
+    @staticmethod
+    def _order_filter(start: Optional[str] = None, end: Optional[str] = None, status: Any = None,
+                      customer_id: Optional[str] = None, search: Optional[str] = None) -> tuple:
+        """WHERE clause and parameters of an order query, status may be one status or several (None too)"""
+        clauses, params = [], []
+        if start:
+            clauses.append(f'{ORDER_DATE_KEY} >= ?')
+            params.append(str(start).replace(' ', 'T'))
+        if end:
+            clauses.append(f'{ORDER_DATE_KEY} < ?')
+            params.append(str(end).replace(' ', 'T'))
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(dict.fromkeys(status))
+            named = [str(s) for s in statuses if s is not None]
+            alternatives = []
+            if named:
+                alternatives.append(f"status IN ({', '.join('?' for _ in named)})")
+                params.extend(named)
+            if None in statuses:
+                alternatives.append('status IS NULL')
+            clauses.append(f"({' OR '.join(alternatives)})" if alternatives else '0')
+        if customer_id is not None:
+            clauses.append('customer_id = ?')
+            params.append(customer_id)
+        if search:
+            # 与内存中的搜索一致：忽略大小写的子串匹配
+            clauses.append(f"({' OR '.join(f'instr(lower({field}), ?) > 0' for field in ORDER_SEARCH_FIELDS)})")
+            params.extend([search.lower()] * len(ORDER_SEARCH_FIELDS))
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+    def query_orders(self, start: Optional[str] = None, end: Optional[str] = None,
+                     status: Any = None, customer_id: Optional[str] = None) -> List[Dict]:
+        """Orders with start <= order date < end, matching status and customer, by date (through the indexes)"""
+        where, params = self._order_filter(start, end, status, customer_id)
+        with self._lock:
+            rows = self.conn.execute(f'SELECT data FROM orders{where} ORDER BY {ORDER_DATE_KEY}, seq',
+                                     params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def query_orders_page(self, offset: int = 0, limit: int = 50, status: Any = None,
+                          newest_first: bool = True, search: Optional[str] = None) -> tuple:
+        """(one page of orders by date, number of matching orders)"""
+        where, params = self._order_filter(status=status, search=search)
+        direction = 'DESC' if newest_first else 'ASC'
+        with self._lock:
+            total = self.conn.execute(f'SELECT COUNT(*) FROM orders{where}', params).fetchone()[0]
+            rows = self.conn.execute(
+                f'SELECT data FROM orders{where} ORDER BY {ORDER_DATE_KEY} {direction}, seq {direction} '
+                f'LIMIT ? OFFSET ?', params + [max(0, limit), max(0, offset)]).fetchall()
+        return [json.loads(row[0]) for row in rows], total
+
+    def count_orders_by_status(self) -> Dict[str, int]:
+        """Number of orders per status"""
+        with self._lock:
+            rows = self.conn.execute('SELECT status, COUNT(*) FROM orders GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        """Checkpoint the WAL and close the connection"""
+        with self._lock:
+            try:
+                self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            except sqlite3.Error:
+                pass
+            self.conn.close()
+
+
+def migrate_json_to_sqlite(data_path: str, db_file: str, storage: Optional[SqliteStorage] = None) -> Dict[str, int]:
+    """One-shot import of the JSON data files into the SQLite database"""
+    own_storage = storage is None
+    if own_storage:
+        storage = SqliteStorage(db_file)
+    counts = {}
+    try:
+        for name, filename in JSON_FILES.items():
+            file_path = os.path.join(data_path, filename)
+            partitions = PartitionStore(os.path.splitext(file_path)[0])
+            records = []
+            if partitions.exists():
+                # 已按月分区存储的集合
+                for month in partitions.months():
+                    records.extend(partitions.read(month)[0])
+            elif os.path.exists(file_path):
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        records = json.load(f)
+                except Exception as e:
+                    print(f"Error reading {filename}: {e}")
+                    continue
+            storage.replace_all(name, records)
+            counts[name] = len(records)
+            print(f"✅ Migrated {len(records)} {name} records")
+    finally:
+        if own_storage:
+            storage.close()
+    return counts
+
+
+if __name__ == '__main__':
+    # 用法: python sqlite_storage.py [数据目录] [数据库文件]
+    default_data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else default_data_path
+    database = sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_dir, 'foodservice.db')
+    migrate_json_to_sqlite(data_dir, database)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ID generator tests
+Ids from several threads and several nodes never collide and sort by creation time
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from id_generator import IdGenerator
+
+
+class IdGeneratorTest(unittest.TestCase):
+    COUNT = 3000
+
+    def generate(self, generator, results):
+        results.extend(generator.next_id('ORD') for _ in range(self.COUNT))
+
+    def test_threads_and_nodes_unique_and_sorted(self):
+        generators = [IdGenerator(1), IdGenerator(2)]
+        batches = [[] for _ in range(4)]
+        threads = [threading.Thread(target=self.generate, args=(generators[i % 2], batch))
+                   for i, batch in enumerate(batches)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        all_ids = [record_id for batch in batches for record_id in batch]
+        self.assertEqual(len(set(all_ids)), len(all_ids))
+        for batch in batches:
+            # 每个线程拿到的编号按生成顺序递增
+            self.assertEqual(batch, sorted(batch))
+        for node in (1, 2):
+            ids = [record_id for batch in batches[node - 1::2] for record_id in batch]
+            self.assertTrue(all(record_id[-6:-3] == f"{node:03d}" for record_id in ids))
+
+    def test_sequence_overflow_stays_sorted(self):
+        generator = IdGenerator(7)
+        ids = [generator.next_id('FIN') for _ in range(IdGenerator.SEQUENCE_LIMIT * 3)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Order index tests
+Duplicate ids hand the index over in insertion order, customer buckets follow deletes,
+status updates keep an order's place among orders of the same date
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from data_manager import DataManager
+
+
+class OrderIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        config = {'write_behind': False, 'journal_fsync': False, 'node_id': 1}
+        with open(os.path.join(self.data_path, 'storage_config.json'), 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        self.manager = DataManager(self.data_path)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.data_path, ignore_errors=True)
+
+    def make_order(self, day, customer_id='CUST1', status='pending'):
+        return {'id': 'ORD1', 'customer_id': customer_id, 'status': status,
+                'order_date': f'2026-01-{day:02d}T12:00:00'}
+
+    def test_duplicate_id_successor(self):
+        first, second, third = (self.make_order(day) for day in (1, 2, 3))
+        for order in (first, second, third):
+            self.manager.insert_record('orders', order)
+        index = self.manager.id_indexes['orders']
+        self.assertIs(index['ORD1'], first)
+
+        # 删除被遮蔽的记录不改变索引
+        self.manager.delete_record('orders', second)
+        self.assertIs(index['ORD1'], first)
+        self.manager.delete_record('orders', first)
+        self.assertIs(index['ORD1'], third)
+        self.manager.delete_record('orders', third)
+        self.assertNotIn('ORD1', index)
+        self.assertEqual(self.manager.index_duplicates['orders'], {})
+
+    def test_customer_bucket(self):
+        orders = [self.make_order(day, customer_id='CUST2') for day in (1, 2, 3)]
+        for order in orders:
+            self.manager.insert_record('orders', order)
+        self.manager.delete_record('orders', orders[1])
+        self.assertEqual(self.manager.query_orders(customer_id='CUST2'), [orders[0], orders[2]])
+        for order in (orders[0], orders[2]):
+            self.manager.delete_record('orders', order)
+        self.assertNotIn('CUST2', self.manager.orders_by_customer)
+
+    def test_status_update_keeps_position(self):
+        orders = [dict(self.make_order(1), id=f'ORD{n}') for n in range(3)]
+        for order in orders:
+            self.manager.insert_record('orders', order)
+        self.assertTrue(self.manager.update_order_status('ORD0', 'completed'))
+        # 同一时间下单的订单保持插入顺序，状态更新不把订单排到最新
+        self.assertEqual([o['id'] for o in self.manager.query_orders()], ['ORD0', 'ORD1', 'ORD2'])
+        self.assertEqual([o['id'] for o in self.manager.query_orders(status='completed')], ['ORD0'])
+
+
+if __name__ == '__main__':
+    unittest.main()
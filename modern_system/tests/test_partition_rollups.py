@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Partitioned rollup tests
+Rollups rebuilt on a partitioned cold start cover every month without loading old partitions
+"""
+
+import datetime
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from data_manager import DataManager
+from partition_store import shift_month, current_month, UNDATED
+
+
+class PartitionRollupTest(unittest.TestCase):
+    MONTHS = 8
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        config = {'partitioned': True, 'hot_months': 1, 'write_behind': False,
+                  'journal_fsync': False, 'node_id': 1}
+        with open(os.path.join(self.data_path, 'storage_config.json'), 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        self.expected = {}
+        records = []
+        for offset in range(self.MONTHS):
+            month = shift_month(current_month(), -offset)
+            self.expected[month] = (100.0 * (offset + 1), 10.0 * (offset + 1))
+            records.append({'id': f'FIN{offset}R', 'type': 'revenue', 'amount': 100.0 * (offset + 1),
+                            'date': f'{month}-03T12:00:00'})
+            records.append({'id': f'FIN{offset}C', 'type': 'cost', 'amount': -10.0 * (offset + 1),
+                            'date': f'{month}-04T12:00:00'})
+        with open(os.path.join(self.data_path, 'finance.json'), 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+        self.manager = None
+
+    def tearDown(self):
+        if self.manager:
+            self.manager.close()
+        shutil.rmtree(self.data_path, ignore_errors=True)
+
+    def test_cold_start_rollups_cover_unloaded_months(self):
+        self.manager = DataManager(self.data_path)
+        first = shift_month(current_month(), -(self.MONTHS - 1))
+        rollup = self.manager.get_rollup_range('month', first, current_month())
+        self.assertEqual({month: (revenue, cost) for month, revenue, cost in rollup}, self.expected)
+        # 只有热月份被载入内存
+        self.assertEqual(set(self.manager.loaded_months['finance']) - {UNDATED}, {current_month()})
+        self.assertEqual(len(self.manager.financial_records), 2)
+
+    def test_new_record_after_cold_start(self):
+        self.manager = DataManager(self.data_path)
+        self.manager.add_finance_record({'type': 'revenue', 'amount': 5.0,
+                                         'date': datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')})
+        totals = self.manager.get_rollup('month', current_month())
+        self.assertEqual(totals['revenue'], self.expected[current_month()][0] + 5.0)
+        self.assertEqual(set(self.manager.loaded_months['finance']) - {UNDATED}, {current_month()})
+
+
+if __name__ == '__main__':
+    unittest.main()
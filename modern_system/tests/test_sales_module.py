@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sales module tests
+Meals read through the data manager are snapshot records and must load without the sample fallback
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+import data_manager as data_manager_module
+import modern_sales_module
+from data_manager import DataManager
+from modern_sales_module import ModernSalesModule
+
+MEALS_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'meals.json')
+
+
+class SalesModuleMealsTest(unittest.TestCase):
+    def setUp(self):
+        # 在临时目录中使用真实菜品数据的副本，不触碰 data/ 也不创建全局实例
+        self.data_path = tempfile.mkdtemp()
+        config = {'write_behind': False, 'journal_fsync': False, 'node_id': 1}
+        with open(os.path.join(self.data_path, 'storage_config.json'), 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        shutil.copy(MEALS_FILE, os.path.join(self.data_path, 'meals.json'))
+        self.manager = DataManager(self.data_path)
+        patcher = mock.patch.object(modern_sales_module, 'data_manager', self.manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.data_path, ignore_errors=True)
+        self.assertIsNone(data_manager_module._shared_instance)
+
+    def test_loads_real_meals(self):
+        meals = self.manager.load_data('meals')
+        self.assertTrue(meals, "data/meals.json has no meals")
+
+        sales = ModernSalesModule(None, None)
+        # meals.json 中的菜品都已上架，不应回退到示例数据
+        self.assertEqual([meal['id'] for meal in sales.meals_data], [meal['id'] for meal in meals])
+        for meal in sales.meals_data:
+            self.assertTrue(meal['image'])
+            self.assertTrue(meal['description'])
+            meal['name'] = meal['name']   # 销售模块拿到的是可修改的副本
+
+    def test_snapshot_records_untouched(self):
+        ModernSalesModule(None, None)
+        for meal in self.manager.load_data('meals'):
+            with self.assertRaises(TypeError):
+                meal['image'] = '🍽️'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared commit tests
+A multi-collection transaction interrupted part-way is completed from shared_commit.json
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from data_manager import DataManager
+
+
+class SharedCommitTest(unittest.TestCase):
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        config = {'shared': True, 'write_behind': False, 'journal_fsync': False, 'node_id': 1}
+        with open(os.path.join(self.data_path, 'storage_config.json'), 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.close()
+        shutil.rmtree(self.data_path, ignore_errors=True)
+
+    def open_manager(self):
+        manager = DataManager(self.data_path)
+        self.managers.append(manager)
+        return manager
+
+    def commit_customer_and_employee(self, manager):
+        with manager.transaction():
+            manager.insert_record('customers', {'id': 'CUST900', 'name': 'Shared Customer'})
+            manager.insert_record('employees', {'id': 'EMP900', 'name': 'Shared Employee'})
+
+    def test_commit_writes_all_collections(self):
+        self.commit_customer_and_employee(self.open_manager())
+        other = self.open_manager()
+        self.assertIsNotNone(other.get_record('customers', 'CUST900'))
+        self.assertIsNotNone(other.get_record('employees', 'EMP900'))
+        self.assertFalse(os.path.exists(os.path.join(self.data_path, 'shared_commit.json')))
+
+    def test_interrupted_commit_is_completed_on_open(self):
+        manager = self.open_manager()
+        write_snapshot = manager.write_snapshot
+
+        def fail_on_employees(name, *args, **kwargs):
+            if name == 'employees':
+                raise OSError("disk full")
+            return write_snapshot(name, *args, **kwargs)
+
+        manager.write_snapshot = fail_on_employees
+        self.commit_customer_and_employee(manager)
+        # customers 已写出、employees 未写出，提交记录保留
+        self.assertTrue(os.path.exists(os.path.join(self.data_path, 'shared_commit.json')))
+        manager.write_snapshot = write_snapshot
+
+        other = self.open_manager()
+        self.assertIsNotNone(other.get_record('customers', 'CUST900'))
+        self.assertIsNotNone(other.get_record('employees', 'EMP900'))
+        self.assertFalse(os.path.exists(os.path.join(self.data_path, 'shared_commit.json')))
+        with open(os.path.join(self.data_path, 'customers.json'), encoding='utf-8') as f:
+            self.assertEqual([c['id'] for c in json.load(f)].count('CUST900'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
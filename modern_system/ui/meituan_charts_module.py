@@ -19,11 +19,17 @@ except ImportError:
         # Mock data manager
         class MockDataManager:
             def get_dashboard_stats(self):
-                return {'today_revenue': 2580, 'today_orders': 25, 'low_stock_count': 3, 'total_customers': 156}
+                return {'today_sales': 2580, 'order_count': 25, 'low_stock_count': 3, 'customer_count': 156}
             def get_daily_revenue(self, date_str):
                 return 1000 + int(date_str.split('-')[2]) * 100 # Mock data
-            def get_orders(self):
+            def get_rollup_range(self, granularity, start, end):
                 return []
+            def get_orders(self, start=None, end=None):
+                return []
+            def column_query(self, collection, query, *args, **kwargs):
+                return None
+            def get_record(self, collection, record_id):
+                return None
         data_manager = MockDataManager()
 
 class ModernChartsModule:
@@ -87,6 +93,8 @@ class ModernChartsModule:
         charts_container = tk.Frame(self.main_frame, bg=self.colors['background'])
         charts_container.pack(fill="both", expand=True)
         
+        self.create_summary_cards(charts_container)
+        
         top_frame = tk.Frame(charts_container, bg=self.colors['background'])
         top_frame.pack(fill="x", expand=True, pady=(0, 10))
 
@@ -103,6 +111,25 @@ class ModernChartsModule:
         bottom_frame.pack(fill="both", expand=True, pady=(10, 0))
         self.create_revenue_chart(bottom_frame)
         
+    def create_summary_cards(self, parent):
+        """Create the row of today's key figures."""
+        summary_frame = tk.Frame(parent, bg=self.colors['background'])
+        summary_frame.pack(fill="x", pady=(0, 10))
+        
+        # Aggregates are maintained by the data manager, no records are scanned here
+        stats = data_manager.get_dashboard_stats()
+        cards = [
+            ("Today's Sales", f"${stats.get('today_sales', 0):,.2f}", self.colors['primary']),
+            ("Today's Orders", str(stats.get('order_count', 0)), self.colors['success']),
+            ("Low Stock Items", str(stats.get('low_stock_count', 0)), self.colors['warning']),
+            ("Customers", str(stats.get('customer_count', 0)), self.colors['info'])
+        ]
+        for i, (label, value, color) in enumerate(cards):
+            card = tk.Frame(summary_frame, bg=self.colors['surface'])
+            card.pack(side="left", fill="x", expand=True, padx=(0 if i == 0 else 10, 0))
+            tk.Label(card, text=value, font=self.fonts['heading'], bg=self.colors['surface'], fg=color).pack(pady=(10, 0))
+            tk.Label(card, text=label, font=self.fonts['small'], bg=self.colors['surface'], fg=self.colors['text_secondary']).pack(pady=(0, 10))
+
     def create_sales_chart(self, parent):
         """Create the sales trend chart."""
         tk.Label(parent, text="Weekly Sales Trend", font=self.fonts['heading'], bg=self.colors['surface'], fg=self.colors['text_primary']).pack(pady=10, padx=20, anchor='w')
@@ -175,22 +202,15 @@ class ModernChartsModule:
             tk.Label(month_frame, text=month, font=self.fonts['body'], bg=self.colors['surface'], fg=self.colors['text_primary']).pack(side="bottom", pady=5)
     
     def get_real_sales_data(self):
-        """Get sales data for the last 7 days from financial records."""
+        """Get sales data for the last 7 days from the daily revenue rollups."""
         try:
             today = datetime.datetime.now()
-            daily_revenue = { (today - datetime.timedelta(days=i)).strftime('%Y-%m-%d'): 0 for i in range(7) }
-
-            finance_records = data_manager.get_finance_records()
-            for record in finance_records:
-                if record.get('type') == 'Income' and record.get('date') in daily_revenue:
-                    daily_revenue[record['date']] += record.get('amount', 0)
+            start = today - datetime.timedelta(days=6)
+            rollup = data_manager.get_rollup_range('day', start.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'))
             
             chart_data = []
-            for i in range(6, -1, -1):
-                date = today - datetime.timedelta(days=i)
-                date_str = date.strftime('%Y-%m-%d')
-                revenue = daily_revenue.get(date_str, 0)
-                weekday = date.strftime('%A')
+            for day_key, revenue, _ in rollup:
+                weekday = datetime.datetime.strptime(day_key, '%Y-%m-%d').strftime('%A')
                 chart_data.append((weekday, f"${revenue:,.2f}", revenue))
             return chart_data
         except Exception as e:
@@ -201,15 +221,23 @@ class ModernChartsModule:
     def get_real_product_data(self):
         """Get hot product data from the data manager."""
         try:
-            orders = data_manager.get_orders()
             product_sales = {}
             total_items = 0
-            for order in orders:
-                for item in order.get('items', []):
-                    name = item.get('name')
-                    quantity = item.get('quantity', 1)
-                    product_sales[name] = product_sales.get(name, 0) + quantity
-                    total_items += quantity
+            # All-time quantity per meal from the columnar order store
+            meal_quantities = data_manager.column_query('orders', 'group_by', 'meal', 'quantity') or {}
+            for meal_id, quantity in meal_quantities.items():
+                meal = data_manager.get_record('meals', meal_id)
+                name = meal.get('name', meal_id) if meal else meal_id
+                product_sales[name] = product_sales.get(name, 0) + quantity
+                total_items += quantity
+            if not product_sales:
+                # Orders that list their dishes under 'items'
+                for order in data_manager.get_orders():
+                    for item in order.get('items', []):
+                        name = item.get('name')
+                        quantity = item.get('quantity', 1)
+                        product_sales[name] = product_sales.get(name, 0) + quantity
+                        total_items += quantity
             
             if not product_sales: return []
             
@@ -225,52 +253,24 @@ class ModernChartsModule:
             print(f"Error getting product data: {e}")
             return [("Beef Noodles", 50, 40), ("Fried Rice", 30, 24), ("Burger", 20, 16), ("Fries", 15, 12), ("Coke", 10, 8)]
 
+    def first_chart_month(self):
+        """First day of the month five months ago, start of the six-month charts."""
+        first_month = datetime.date.today().replace(day=1)
+        for _ in range(5):
+            first_month = (first_month - datetime.timedelta(days=1)).replace(day=1)
+        return first_month
+
     def get_real_revenue_data(self):
-        """Get monthly revenue data for the last 6 months from financial records."""
+        """Get monthly revenue data for the last 6 months from the monthly revenue rollups."""
         try:
             today = datetime.date.today()
-            
-            # Correctly determine the last 6 months
-            first_month = (today.replace(day=1) - datetime.timedelta(days=5*30)).replace(day=1)
-            monthly_revenue = {}
-            current_month = first_month
-            for _ in range(12): # Iterate over a year to be safe
-                if current_month > today:
-                    break
-                month_key = current_month.strftime('%Y-%m')
-                monthly_revenue[month_key] = 0
-                next_month = (current_month.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
-                current_month = next_month
-
-            finance_records = data_manager.get_finance_records()
-            for record in finance_records:
-                if record.get('type') == 'Income':
-                    record_date_str = record.get('date')
-                    if record_date_str:
-                        try:
-                            # 处理不同的日期格式
-                            if 'T' in record_date_str:
-                                # ISO格式: 2025-06-22T14:39:22
-                                record_month_key = datetime.datetime.strptime(record_date_str.split('T')[0], '%Y-%m-%d').strftime('%Y-%m')
-                            else:
-                                # 简单格式: 2025-06-22
-                                record_month_key = datetime.datetime.strptime(record_date_str, '%Y-%m-%d').strftime('%Y-%m')
-                            
-                            if record_month_key in monthly_revenue:
-                                monthly_revenue[record_month_key] += record.get('amount', 0)
-                        except ValueError as ve:
-                            print(f"⚠️ 日期格式解析失败: {record_date_str} - {ve}")
-                            continue
-
-            # Get the last 6 months from the calculated data
-            sorted_months = sorted(monthly_revenue.keys())[-6:]
+            first_month = self.first_chart_month()
+            rollup = data_manager.get_rollup_range('month', first_month.strftime('%Y-%m'), today.strftime('%Y-%m'))
             
             chart_data = []
-            for month_key in sorted_months:
+            for month_key, revenue, _ in rollup:
                 month_name = datetime.datetime.strptime(month_key, '%Y-%m').strftime('%b')
-                revenue = monthly_revenue.get(month_key, 0)
                 chart_data.append((month_name, revenue))
-
             return chart_data
         except Exception as e:
             print(f"Error getting revenue data: {e}")
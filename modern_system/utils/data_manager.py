@@ -8,10 +8,18 @@ Implements data interaction between orders, inventory, finance and other modules
 import json
 import os
 import datetime
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple
 from threading import Lock
 import uuid
 
+try:
+    from ..modules.id_generator import IdGenerator, allocate_node_id
+except ImportError:
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'modules'))
+    from id_generator import IdGenerator, allocate_node_id
+
 class DataManager:
     """Data Management Center Singleton Class"""
     
@@ -31,9 +39,14 @@ class DataManager:
         
         self._initialized = True
         self.data_dir = self._get_data_dir()
+        # 与 modules/data_manager 共用节点计数文件，各进程生成的编号互不冲突
+        self.id_generator = IdGenerator(allocate_node_id(os.path.join(self.data_dir, 'id_node.json')))
         self.modules = {}
         self.registered_modules = {}  # Store registered module instances
         self.event_listeners = {}
+        # Read cache: data type -> ((mtime_ns, size, inode), read-only records)
+        self._cache = {}
+        self._cache_lock = Lock()
         
         # Initialize data files
         self.data_files = {
@@ -95,6 +108,11 @@ class DataManager:
             if not os.path.exists(file_path):
                 with open(file_path, 'w', encoding='utf-8') as f:
                     json.dump(default_data[data_type], f, ensure_ascii=False, indent=2)
+
+    def new_id(self, prefix: str) -> str:
+        """Generate a unique, time-ordered record id"""
+        return self.id_generator.next_id(prefix)
+
     def register_module(self, module_type: str, instance):
         """Register module"""
         self.modules[module_type] = instance
@@ -130,18 +148,70 @@ class DataManager:
                 except Exception as e:
                     print(f"Event handling error {event_type}: {e}")
     
-    def load_data(self, data_type: str) -> List[Dict]:
-        """Load data"""
+    @staticmethod
+    def _file_signature(file_path: str) -> Optional[Tuple[int, int, int]]:
+        """(mtime, size, inode) of a data file, changes whenever any process rewrites it"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    @staticmethod
+    def _freeze(value: Any) -> Any:
+        """Read-only copy of a loaded JSON value: dicts become mapping proxies, lists become tuples"""
+        if isinstance(value, dict):
+            return MappingProxyType({key: DataManager._freeze(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return tuple(DataManager._freeze(item) for item in value)
+        return value
+
+    @staticmethod
+    def _copy_record(record: Any) -> Any:
+        """Mutable copy of a cached record, nested containers are rebuilt and scalars shared"""
+        if isinstance(record, (dict, MappingProxyType)):
+            return {key: DataManager._copy_record(value) for key, value in record.items()}
+        if isinstance(record, (list, tuple)):
+            return [DataManager._copy_record(item) for item in record]
+        return record
+
+    def load_view(self, data_type: str) -> Tuple:
+        """Load data as a deeply read-only view shared between callers, no I/O while the file is unchanged"""
         if data_type not in self.data_files:
-            return []
+            return ()
         
         file_path = os.path.join(self.data_dir, self.data_files[data_type])
+        signature = self._file_signature(file_path)
+        with self._cache_lock:
+            cached = self._cache.get(data_type)
+            if cached and signature is not None and cached[0] == signature:
+                return cached[1]
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                data = json.load(f)
         except Exception as e:
             print(f"Failed to load data {data_type}: {e}")
-            return []
+            return ()
+        if not isinstance(data, list):
+            data = [data]
+        view = tuple(self._freeze(record) for record in data)
+        with self._cache_lock:
+            # 读取期间文件被改写时不缓存，下次重新读取
+            if signature is not None and self._file_signature(file_path) == signature:
+                self._cache[data_type] = (signature, view)
+        return view
+
+    def load_data(self, data_type: str) -> List[Dict]:
+        """Load data as mutable records, copied from the cached view on every call (read-only callers use load_view)"""
+        return [self._copy_record(record) for record in self.load_view(data_type)]
+
+    def invalidate_cache(self, data_type: Optional[str] = None):
+        """Drop cached data of one or all data types"""
+        with self._cache_lock:
+            if data_type is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(data_type, None)
     
     def save_data(self, data_type: str, data: List[Dict]):
         """Save data"""
@@ -156,21 +226,23 @@ class DataManager:
         except Exception as e:
             print(f"Failed to save data {data_type}: {e}")
             return False
+        finally:
+            self.invalidate_cache(data_type)
     
     # Order related methods
     def get_orders(self, status_filter: Optional[str] = None) -> List[Dict]:
         """Get order list"""
-        orders = self.load_data('orders')
         if status_filter:
-            orders = [order for order in orders if order.get('status') == status_filter]
-        return orders
+            return [self._copy_record(order) for order in self.load_view('orders')
+                    if order.get('status') == status_filter]
+        return self.load_data('orders')
     
     def add_order(self, order_data: Dict) -> str:
         """Add order"""
         orders = self.load_data('orders')
         
         # Generate order ID
-        order_id = f"ORD{datetime.datetime.now().strftime('%Y%m%d')}{len(orders)+1:04d}"
+        order_id = self.new_id('ORD')
         order_data['id'] = order_id
         order_data['create_time'] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
@@ -295,7 +367,7 @@ class DataManager:
     def add_inventory_item(self, item_data: Dict) -> bool:
         """Add a new item to inventory"""
         inventory = self.load_data('inventory')
-        item_data['id'] = f"INV{int(datetime.datetime.now().timestamp())}"
+        item_data['id'] = self.new_id('INV')
         inventory.append(item_data)
         return self.save_data('inventory', inventory)
     
@@ -316,7 +388,7 @@ class DataManager:
     def add_customer(self, customer_data: Dict) -> bool:
         """Add a new customer"""
         customers = self.load_data('customers')
-        customer_data['id'] = f"CUST{int(datetime.datetime.now().timestamp())}"
+        customer_data['id'] = self.new_id('CUST')
         customers.append(customer_data)
         return self.save_data('customers', customers)
     
@@ -346,7 +418,7 @@ class DataManager:
     def add_finance_record(self, record_data: Dict) -> bool:
         """Add a new finance record"""
         finance_records = self.load_data('finance')
-        record_data['id'] = f"FIN{int(datetime.datetime.now().timestamp())}"
+        record_data['id'] = self.new_id('FIN')
         finance_records.append(record_data)
         return self.save_data('finance', finance_records)
     
@@ -371,21 +443,24 @@ class DataManager:
     # Statistics related methods
     def get_low_stock_items(self) -> List[Dict]:
         """Get items with low stock"""
-        inventory = self.load_data('inventory')
-        return [item for item in inventory if item.get('quantity', 0) <= item.get('min_stock', 0)]
+        return [self._copy_record(item) for item in self._low_stock_view()]
+
+    def _low_stock_view(self) -> List:
+        """Low stock items as read-only cached records"""
+        return [item for item in self.load_view('inventory') if item.get('quantity', 0) <= item.get('min_stock', 0)]
     
     def get_daily_revenue(self, date: str = None) -> float:
         """Get daily revenue"""
         if date is None:
             date = datetime.datetime.now().strftime('%Y-%m-%d')
         
-        orders = self.load_data('orders')
+        orders = self.load_view('orders')
         total = sum(o.get('total_amount', 0) for o in orders if o.get('create_time', '').startswith(date))
         return total
     
     def get_dashboard_stats(self) -> Dict:
         """Get key statistics for the dashboard"""
-        orders = self.load_data('orders')
+        orders = self.load_view('orders')
         today_str = datetime.datetime.now().strftime('%Y-%m-%d')
         
         today_orders = [o for o in orders if o.get('create_time', '').startswith(today_str)]
@@ -393,8 +468,8 @@ class DataManager:
         stats = {
             "today_revenue": sum(o.get('total_amount', 0) for o in today_orders),
             "today_orders": len(today_orders),
-            "total_customers": len(self.load_data('customers')),
-            "low_stock_items": len(self.get_low_stock_items())
+            "total_customers": len(self.load_view('customers')),
+            "low_stock_items": len(self._low_stock_view())
         }
         return stats
 